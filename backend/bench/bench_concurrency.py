@@ -0,0 +1,133 @@
+"""
+Mede requisições por segundo em `/travel/assigned/` e `/ambulance/` com 1 a 64 clientes simultâneos.
+
+O app roda no mesmo processo (httpx + ASGITransport) sobre um SQLite temporário. `--latency-ms`
+atrasa cada consulta para simular a ida e volta de rede até o Postgres, que é onde uma consulta
+bloqueando o event loop mais pesa. O modo `inline` roda as consultas no próprio event loop (como
+antes do `AsyncRepository`) e o modo `executor` usa o pool de threads do banco.
+
+Uso (na pasta backend): python -m bench.bench_concurrency --latency-ms 2 --seconds 3
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+from pathlib import Path
+from statistics import quantiles
+from time import perf_counter, sleep
+
+DIRECTORY = tempfile.mkdtemp(prefix="bench_concurrency_")
+
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ["SQLITE_PATH"] = str(Path(DIRECTORY) / "bench.db")
+
+import httpx
+
+from src.main import app
+from src.DB import db, Migration, Executor
+from src.Model.User import User
+from src.Model.Travel import Travel
+from src.Model.Ambulance import Ambulance
+from src.Model.Equipment import Equipment
+from src.Schema.User.UserRoleEnum import UserRole
+from src.Service import SessionService
+from src.Utils.limiter import LIMITER
+
+CLIENTS = [1, 4, 16, 64]
+ENDPOINTS = ["/travel/assigned/", "/ambulance/"]
+
+class InlineExecutor:
+    """ Executa no event loop, sem thread, para comparar com o pool """
+
+    async def run(self, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+def seed(travels: int, ambulances: int) -> str:
+    Migration.initialize_db()
+
+    user = User.create(email="bench@mail.com", nome="Bench", senha="x", cpf="00000000000", telefone="000000000000", nascimento="1990-01-01", cargo=UserRole.DRIVER)
+
+    with db.atomic():
+        for i in range(travels):
+            Travel.create(inicio="2030-01-01 10:00:00", id_paciente=user.id, cpf_paciente="00000000000", lat_inicio=0, long_inicio=0, end_inicio="a", lat_fim=0, long_fim=0, end_fim="b")
+
+        for i in range(ambulances):
+            ambulance = Ambulance.create(status=0, placa=f"BEN{i:04d}", tipo=0)
+            Equipment.create(id_ambulancia=ambulance.id, equipamento="Maca", descricao="Maca retrátil")
+
+    (session, refresh) = SessionService.create_session_pair(user, "127.0.0.1")
+    db.close()
+
+    return SessionService.encode_jwt_token(session.str_id, session)
+
+def add_latency(latencyMs: float) -> None:
+    database = db.obj
+    execute_sql = database.execute_sql
+
+    def slow_execute_sql(*args, **kwargs):
+        sleep(latencyMs / 1000)
+        return execute_sql(*args, **kwargs)
+
+    database.execute_sql = slow_execute_sql
+
+async def load(client: httpx.AsyncClient, path: str, clients: int, seconds: float) -> dict[str, float]:
+    latencies: list[float] = []
+    errors = 0
+    deadline = perf_counter() + seconds
+
+    async def worker() -> None:
+        nonlocal errors
+        while perf_counter() < deadline:
+            start = perf_counter()
+            response = await client.get(path, params={"pageSize": 15})
+            latencies.append(perf_counter() - start)
+
+            if response.status_code != 200:
+                errors += 1
+
+    start = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    elapsed = perf_counter() - start
+
+    return {
+        "req/s": len(latencies) / elapsed,
+        "p95_ms": (quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]) * 1000,
+        "erros": errors
+    }
+
+async def run(token: str, seconds: float) -> None:
+    transport = httpx.ASGITransport(app=app, client=("127.0.0.1", 50000))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers={"Authorization": f"Bearer {token}"}) as client:
+        for mode in ("inline", "executor"):
+            executor_for = Executor.executor_for
+            if mode == "inline":
+                Executor.executor_for = lambda database: InlineExecutor()
+
+            for path in ENDPOINTS:
+                for clients in CLIENTS:
+                    LIMITER.reset()
+                    result = await load(client, path, clients, seconds)
+                    print(f"{mode:8} {path:18} clientes={clients:3} req/s={result['req/s']:8.0f} p95_ms={result['p95_ms']:8.1f} erros={result['erros']}")
+
+            Executor.executor_for = executor_for
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=2)
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--travels", type=int, default=15)
+    parser.add_argument("--ambulances", type=int, default=15)
+    args = parser.parse_args()
+
+    token = seed(args.travels, args.ambulances)
+
+    if args.latency_ms > 0:
+        add_latency(args.latency_ms)
+
+    asyncio.run(run(token, args.seconds))
+
+    Executor.shutdown_executors()
+
+if __name__ == "__main__":
+    main()
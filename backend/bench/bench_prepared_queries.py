@@ -0,0 +1,75 @@
+"""
+Mede o custo por chamada das buscas por ID montando a consulta do peewee a cada chamada
+e usando a `PreparedQuery` do repositório (SQL compilado uma vez).
+
+O banco é um SQLite em memória, então o tempo de execução da consulta é mínimo e a diferença
+é quase toda o custo em Python de montar e renderizar o SQL. A coluna "só compilar" mede
+apenas montar + renderizar, sem executar.
+
+Uso (na pasta backend): python -m bench.bench_prepared_queries --calls 20000
+"""
+import argparse
+from datetime import datetime, timezone
+from time import perf_counter
+
+from peewee import SqliteDatabase
+
+from src.DB import db
+from src.Model.User import User
+from src.Model.UserSession import Session
+from src.Repository import UserRepository, SessionRepository
+
+def seed() -> tuple[str, str]:
+    db.create_tables([User, Session])
+
+    user = User.create(email="bench@mail.com", nome="Bench", senha="x", cpf="00000000000", telefone="000000000000", nascimento="1990-01-01")
+    session = Session.create(usuario=user.id, ip="127.0.0.1")
+
+    return (user.id, session.id)
+
+def per_call_us(fn, calls: int) -> float:
+    for _ in range(min(calls, 500)):
+        fn()
+
+    start = perf_counter()
+    for _ in range(calls):
+        fn()
+
+    return (perf_counter() - start) / calls * 1_000_000
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    database = SqliteDatabase(":memory:")
+    db.initialize(database)
+
+    (userId, sessionId) = seed()
+    sqlContext = database.get_sql_context
+    now = datetime.now(timezone.utc)
+
+    cases = {
+        "usuário por id": (
+            lambda: User.select().where(User.id == userId).first(),
+            lambda: UserRepository.FIND_BY_ID.first(userId),
+            lambda: sqlContext().sql(User.select().where(User.id == userId).limit(1)).query()
+        ),
+        "sessão + usuário (auth)": (
+            lambda: Session.select(Session, User).join(User).where((Session.id == sessionId) & (Session.valido_ate > now)).first(),
+            lambda: SessionRepository.FIND_SESSION_WITH_USER_BY_ID.first(sessionId, now),
+            lambda: sqlContext().sql(Session.select(Session, User).join(User).where((Session.id == sessionId) & (Session.valido_ate > now)).limit(1)).query()
+        )
+    }
+
+    print(f"{'consulta':<26}{'peewee (µs)':>14}{'preparada (µs)':>16}{'só compilar (µs)':>19}{'ganho':>9}")
+
+    for (name, (peewee, prepared, compileOnly)) in cases.items():
+        peeweeUs = per_call_us(peewee, args.calls)
+        preparedUs = per_call_us(prepared, args.calls)
+        compileUs = per_call_us(compileOnly, args.calls)
+
+        print(f"{name:<26}{peeweeUs:>14.1f}{preparedUs:>16.1f}{compileUs:>19.1f}{peeweeUs / preparedUs:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Compara as escritas do repositório com `RETURNING` (um comando por escrita) e sem ele
+(a escrita seguida de um SELECT para ler a linha de volta, como era antes).
+
+Para cada operação mostra as consultas por chamada, contadas como no `X-DB-Queries`,
+e o tempo por chamada em um SQLite em arquivo temporário.
+
+Uso (na pasta backend): python -m bench.bench_returning --calls 2000
+"""
+import argparse
+import os
+import tempfile
+from datetime import date
+from time import perf_counter
+
+from peewee import SqliteDatabase
+
+from src.DB import db
+from src.DB.QueryCounter import begin_query_count, end_query_count, use_query_counter
+from src.DB.sqlite import SQLITE_RETURNING
+from src.Model.User import User
+from src.Model.Ambulance import Ambulance
+from src.Model.Equipment import Equipment
+from src.Repository import UserRepository, AmbulanceRepository
+
+def operations(calls: int) -> dict:
+    counter = iter(range(10 ** 9))
+
+    def new_user() -> User:
+        n = next(counter)
+        return User(email=f"bench{n}@mail.com", nome="Bench", senha="x", cpf=f"{n:011d}", telefone=f"{n:012d}", nascimento=date(1990, 1, 1))
+
+    with db.atomic():
+        userIds = [UserRepository.create(new_user()).id for _ in range(calls)]
+        ambulanceIds = [AmbulanceRepository.create_ambulance(Ambulance(status=0, placa=f"ABC{i:04d}", tipo=0)).id for i in range(calls)]
+
+    return {
+        "criar usuário": lambda i: UserRepository.create(new_user()),
+        "atualizar usuário": lambda i: UserRepository.update_user_by_id(userIds[i], nome=f"Bench {i}"),
+        "atualizar ambulância": lambda i: AmbulanceRepository.update_ambulance_ignore_none(ambulanceIds[i], status=1)
+    }
+
+def run(returning: bool, calls: int) -> dict[str, tuple[float, float]]:
+    """ Consultas e µs por chamada de cada operação em um banco novo """
+    directory = tempfile.mkdtemp()
+    database = use_query_counter(SqliteDatabase(os.path.join(directory, "bench.db"), returning_clause=returning))
+    db.initialize(database)
+    db.create_tables([User, Ambulance, Equipment])
+
+    results = {}
+
+    for (name, fn) in operations(calls).items():
+        (stats, token) = begin_query_count()
+        start = perf_counter()
+
+        try:
+            for i in range(calls):
+                fn(i)
+        finally:
+            end_query_count(token)
+
+        results[name] = (stats.count / calls, (perf_counter() - start) / calls * 1_000_000)
+
+    database.close()
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    if not SQLITE_RETURNING:
+        raise SystemExit("O SQLite desta instalação não tem RETURNING (precisa da versão 3.35 ou mais nova)")
+
+    select = run(False, args.calls)
+    returning = run(True, args.calls)
+
+    print(f"{'operação':<24}{'consultas antes':>17}{'com RETURNING':>15}{'antes (µs)':>12}{'depois (µs)':>13}")
+
+    for name in select:
+        (selectQueries, selectUs) = select[name]
+        (returningQueries, returningUs) = returning[name]
+
+        print(f"{name:<24}{selectQueries:>17.1f}{returningQueries:>15.1f}{selectUs:>12.1f}{returningUs:>13.1f}")
+
+if __name__ == "__main__":
+    main()
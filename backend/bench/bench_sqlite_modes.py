@@ -0,0 +1,115 @@
+"""
+Compara leituras/escritas por segundo do SQLite no modo padrão e no modo `tuned`.
+
+Cada operação simula uma requisição: pega uma conexão (do pool no modo tuned, nova no
+modo padrão), faz uma consulta e devolve a conexão, como o `DatabaseConnectionMiddleware`.
+
+Uso (na pasta backend): python -m bench.bench_sqlite_modes --readers 8 --writers 2 --seconds 5
+"""
+import argparse
+import random
+import tempfile
+import threading
+from pathlib import Path
+from time import perf_counter
+from types import SimpleNamespace
+
+from peewee import OperationalError
+
+from src.DB import db, db_replicas, sqlite
+from src.DB.Routing import read_only
+from src.Model.User import User
+from src.Model.UserSession import Session
+
+def make_connection(mode: str, path: Path) -> SimpleNamespace:
+    return SimpleNamespace(
+        sqliteMode=mode,
+        sqlitePath=str(path),
+        sqliteBusyTimeout=5000,
+        sqliteCacheSizeKb=65536,
+        sqliteMmapSize=268435456,
+        sqliteReadConnections=8,
+        sqliteWriteConnections=4
+    )
+
+def seed(users: int) -> list[str]:
+    with db.connection_context():
+        db.create_tables([User, Session])
+        rows = [User(email=f"bench{i}@mail.com", nome=f"Bench {i}", senha="x", cpf=f"{i:011d}", telefone=f"{i:012d}", nascimento="1990-01-01") for i in range(users)]
+        with db.atomic():
+            User.bulk_create(rows, batch_size=200)
+
+        return [row[0] for row in User.select(User.id).tuples()]
+
+def run(mode: str, readers: int, writers: int, seconds: float) -> dict[str, float]:
+    directory = tempfile.mkdtemp(prefix="bench_sqlite_")
+    database = sqlite.Database(make_connection(mode, Path(directory) / "bench.db"))
+
+    db.initialize(database.db)
+    db_replicas.initialize(database.replicas)
+
+    userIds = seed(500)
+
+    counts = {"leituras": 0, "escritas": 0, "erros": 0}
+    lock = threading.Lock()
+    deadline = perf_counter() + seconds
+
+    def reader() -> None:
+        done = 0
+        while perf_counter() < deadline:
+            with read_only():
+                with db.connection_context():
+                    User.select().where(User.id == random.choice(userIds)).first()
+            done += 1
+
+        with lock:
+            counts["leituras"] += done
+
+    def writer() -> None:
+        done = errors = 0
+        while perf_counter() < deadline:
+            try:
+                with db.connection_context():
+                    with db.atomic():
+                        Session.create(usuario=random.choice(userIds), ip="127.0.0.1")
+                done += 1
+            except OperationalError:
+                errors += 1
+
+        with lock:
+            counts["escritas"] += done
+            counts["erros"] += errors
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)] + [threading.Thread(target=writer) for _ in range(writers)]
+    start = perf_counter()
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    elapsed = perf_counter() - start
+
+    for pool in (database.db, database.read_db):
+        if pool is not None and hasattr(pool, "close_all"):
+            pool.close_all()
+
+    return {
+        "leituras/s": counts["leituras"] / elapsed,
+        "escritas/s": counts["escritas"] / elapsed,
+        "erros": counts["erros"]
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    for mode in ("default", "tuned"):
+        result = run(mode, args.readers, args.writers, args.seconds)
+        print(f"{mode:8} leituras/s={result['leituras/s']:10.0f} escritas/s={result['escritas/s']:8.0f} erros={result['erros']}")
+
+if __name__ == "__main__":
+    main()
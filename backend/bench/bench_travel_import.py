@@ -0,0 +1,75 @@
+"""
+Mede a importação de viagens em lote (`TravelService.import_travels`) a partir de um CSV gerado,
+lido em pedaços como o corpo de uma requisição, contra um SQLite em arquivo temporário.
+Uma em cada `--invalid-every` linhas tem um CPF inválido e deve voltar na lista de erros, as outras
+são de um dos `--patients` pacientes cadastrados antes da medição.
+
+Uso (na pasta backend): python -m bench.bench_travel_import --rows 10000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+from time import perf_counter
+
+from peewee import SqliteDatabase
+
+from src.DB import db
+from src.DB.sqlite import SQLITE_RETURNING
+from src.Model.User import User
+from src.Model.Driver import Driver
+from src.Model.Ambulance import Ambulance
+from src.Model.Travel import Travel
+from src.Service import TravelService
+
+FIELDS = ["inicio", "fim", "cpf_paciente", "estado_paciente", "observacoes", "lat_inicio", "long_inicio", "end_inicio", "lat_fim", "long_fim", "end_fim"]
+
+def csv_body(rows: int, invalidEvery: int, patients: int) -> bytes:
+    start = datetime(2025, 1, 1, 8, 0)
+    lines = [",".join(FIELDS)]
+
+    for i in range(rows):
+        inicio = start + timedelta(minutes=i)
+        cpf = "123" if invalidEvery and i % invalidEvery == invalidEvery - 1 else f"{i % patients:011d}"
+
+        lines.append(",".join([
+            inicio.isoformat(), (inicio + timedelta(hours=2)).isoformat(), cpf, str(i % 3), f"\"Agendamento {i}, retorno\"",
+            "-22.011433", "-47.913322", "\"Rua A, 100\"", "-21.996293", "-47.915033", "\"Hospital B\""
+        ]))
+
+    return "\n".join(lines).encode()
+
+async def chunks(body: bytes, size: int):
+    for i in range(0, len(body), size):
+        yield body[i:i + size]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--chunk-size", type=int, default=64 * 1024)
+    parser.add_argument("--invalid-every", type=int, default=100)
+    parser.add_argument("--patients", type=int, default=1000)
+    args = parser.parse_args()
+
+    database = SqliteDatabase(os.path.join(tempfile.mkdtemp(), "bench.db"), pragmas={"journal_mode": "wal", "foreign_keys": 1}, returning_clause=SQLITE_RETURNING)
+    db.initialize(database)
+    db.create_tables([User, Ambulance, Driver, Travel])
+
+    with database.atomic():
+        User.insert_many([
+            {"email": f"paciente{n}@mail.com", "nome": "Paciente", "senha": "x", "cpf": f"{n:011d}", "telefone": f"{n:012d}", "nascimento": date(1990, 1, 1)}
+            for n in range(args.patients)
+        ]).execute()
+
+    body = csv_body(args.rows, args.invalid_every, args.patients)
+
+    start = perf_counter()
+    result = asyncio.run(TravelService.import_travels(chunks(body, args.chunk_size), "text/csv"))
+    elapsed = perf_counter() - start
+
+    print(f"linhas: {args.rows}  importadas: {result.importadas}  rejeitadas: {result.rejeitadas}  lote: {TravelService.TRAVEL_IMPORT_BATCH_SIZE}")
+    print(f"tempo: {elapsed:.2f}s  ({args.rows / elapsed:,.0f} linhas/s, {len(body) / 1024:.0f} KiB)")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Response, status
 
 from src.Schema.Ambulance.AmbulanceCreateSchema import AmbulanceCreateSchema
 from src.Schema.Ambulance.AmbulanceResponseSchema import AmbulanceResponseSchema
@@ -10,8 +10,9 @@ from src.Schema.Equipment.EquipmentResponseSchema import EquipmentResponseSchema
 from src.Schema.Equipment.EquipmentUpdateSchema import EquipmentUpdateSchema
 
 from src.Service import AmbulanceService
+from src.DB.Pagination import set_next_cursor
 
-from src.Service.AmbulanceService import AMBULANCE_NOT_FOUND
+from src.Service.AmbulanceService import AMBULANCE_NOT_FOUND, EQUIPMENT_NOT_FOUND
 
 from src.Decorators import DriverDecorator
 
@@ -36,10 +37,10 @@ async def create_ambulance(user: DriverDecorator.GET_AUTHENTICATED_DRIVER_OR_HIG
         `AmbulanceResponseSchema`
     """
 
-    return AmbulanceService.create_ambulance(ambulance)
+    return await AmbulanceService.create_ambulance(ambulance)
 
 @AMBULANCE_ROUTER.get("/")
-async def get_ambulances(user: DriverDecorator.GET_AUTHENTICATED_DRIVER_OR_HIGHER, page: int = 0, pageSize: int = 30) -> list[AmbulanceFullResponseSchema]:
+async def get_ambulances(user: DriverDecorator.GET_AUTHENTICATED_DRIVER_OR_HIGHER, response: Response, page: int = 0, pageSize: int = 30, cursor: str | None = None) -> list[AmbulanceFullResponseSchema]:
     """
     Procura por todas as ambulâncias presentes no :
 
@@ -47,11 +48,15 @@ async def get_ambulances(user: DriverDecorator.GET_AUTHENTICATED_DRIVER_OR_HIGHE
     **parâmetro**: Query parameters: \n
         `page` \n
         `pageSize` \n
+        `cursor` valor do header `X-Next-Cursor` da página anterior, substitui `page` \n
     **retorno**: devolve: \n
-        `list[AmbulanceResponseSchema]`
+        `list[AmbulanceResponseSchema]` e o header `X-Next-Cursor` quando há próxima página
     """
 
-    return AmbulanceService.get_ambulances_by_page(page, pageSize)
+    (ambulances, nextCursor) = await AmbulanceService.get_ambulances_by_page(page, pageSize, cursor)
+    set_next_cursor(response, nextCursor)
+
+    return ambulances
 
 @AMBULANCE_ROUTER.get("/{ambulanceID}")
 async def get_ambulance_by_id(user: DriverDecorator.GET_AUTHENTICATED_DRIVER_OR_HIGHER, ambulanceID: UUID) -> AmbulanceFullResponseSchema:
@@ -65,7 +70,7 @@ async def get_ambulance_by_id(user: DriverDecorator.GET_AUTHENTICATED_DRIVER_OR_
         `AmbulanceResponseSchema`
     """
 
-    return AmbulanceService.get_ambulance_by_id(ambulanceID)
+    return await AmbulanceService.get_ambulance_by_id(ambulanceID)
 
 @AMBULANCE_ROUTER.patch("/{id}")
 async def update_ambulance(
@@ -81,7 +86,7 @@ async def update_ambulance(
         `AmbulanceResponseSchema`
     """
 
-    return AmbulanceService.update_ambulance_by_id(id, updateAmbulance)
+    return await AmbulanceService.update_ambulance_by_id(id, updateAmbulance)
 
 @AMBULANCE_ROUTER.post("/add-equipment/{id}")
 async def add_equipment_by_ambulance_id(
@@ -97,7 +102,7 @@ async def add_equipment_by_ambulance_id(
         `AmbulanceResponseSchema`
     """
 
-    return AmbulanceService.create_equipment_by_ambulance_id(id, equipment)
+    return await AmbulanceService.create_equipment_by_ambulance_id(id, equipment)
 
 @AMBULANCE_ROUTER.post("/update-equipment/{equipmentId}")
 async def update_equipment_by_id(
@@ -117,9 +122,18 @@ async def update_equipment_by_id(
         `EquipmentResponseSchema`
     """
 
-    return AmbulanceService.update_equipment_by_id(equipmentId, updateEquipment)
-
-@AMBULANCE_ROUTER.delete("/equipment/{equipmentId}", status_code=status.HTTP_204_NO_CONTENT)
+    return await AmbulanceService.update_equipment_by_id(equipmentId, updateEquipment)
+
+@AMBULANCE_ROUTER.delete("/equipment/{equipmentId}", status_code=status.HTTP_204_NO_CONTENT, responses={
+    status.HTTP_404_NOT_FOUND: {
+        "description": "O equipamento não foi encontrado",
+        "content": {
+            "application/json": {
+                "example": EQUIPMENT_NOT_FOUND.jsonObject
+            }
+        }
+    }
+})
 async def delete_equipment_by_id(
     user: DriverDecorator.GET_AUTHENTICATED_DRIVER_OR_HIGHER,
     equipmentId: UUID,
@@ -129,8 +143,8 @@ async def delete_equipment_by_id(
 
     **acesso**: `DRIVER_OR_HIGHER` \n
     **parâmetro**: Route parameter: \n
-        `id` : ID do equipamento que será atualizado \n
-    **retorno**: 204 NO CONTENT
+        `id` : ID do equipamento que será excluído \n
+    **retorno**: 204 NO CONTENT, 404 se o equipamento não existe
     """
 
-    return AmbulanceService.delete_equipment_by_id(equipmentId)
+    return await AmbulanceService.delete_equipment_by_id(equipmentId)
@@ -12,11 +12,12 @@ from src.Schema.Auth.RestorePasswordResponseSchema import RestorePasswordRespons
 from src.Schema.Auth.AuthRestorePasswordSchema import AuthRestorePasswordSchema
 from src.Schema.Auth.AuthSetRestorePasswordSchema import AuthSetRestorePasswordSchema
 
-from src.Service.SessionService import TOKEN_SCHEME
 from src.Service import SessionService, UserService
 
 from src.Decorators import UserDecorators
 
+from src.Utils.limiter import LIMITER, LOGIN_IP_LIMIT, REFRESH_IP_LIMIT, RESTORE_IP_LIMIT
+
 AUTH_ROUTER = APIRouter(
     prefix="/token",
     tags=[
@@ -27,7 +28,7 @@ AUTH_ROUTER = APIRouter(
 OAUTH2_FORM = Annotated[OAuth2PasswordRequestForm, Depends()]
 
 @AUTH_ROUTER.post("/revoke", status_code=status.HTTP_204_NO_CONTENT)
-async def revoke_token(user: UserDecorators.GET_AUTHENTICATED_USER, token: TOKEN_SCHEME, token_to_revoke: RevokeSessionSchema) -> None:
+async def revoke_token(session: UserDecorators.GET_AUTHENTICATED_SESSION, token_to_revoke: RevokeSessionSchema) -> None:
     """
     Revoga uma sessão de acesso pelo seu ID:
 
@@ -36,10 +37,10 @@ async def revoke_token(user: UserDecorators.GET_AUTHENTICATED_USER, token: TOKEN
         `RevokeSessionSchema` \n
     **retorno**: 204 No Content
     """
-    SessionService.revoke_session(token, token_to_revoke)
+    SessionService.revoke_session(session, token_to_revoke)
 
 @AUTH_ROUTER.get("/sessions")
-async def retrieve_sessions(user: UserDecorators.GET_AUTHENTICATED_USER, token: TOKEN_SCHEME) -> UserSessionListSchema:
+async def retrieve_sessions(user: UserDecorators.GET_AUTHENTICATED_FULL_USER) -> UserSessionListSchema:
     """
     Encontra todas sessões do usuário atual:
 
@@ -48,10 +49,10 @@ async def retrieve_sessions(user: UserDecorators.GET_AUTHENTICATED_USER, token:
     **retorno**: devolve: \n
         `UserSessionListSchema`
     """
-    return SessionService.get_user_sessions(token)
+    return SessionService.get_user_sessions(user)
 
-@AUTH_ROUTER.post("/", responses={
-    status.HTTP_200_OK: {
+@AUTH_ROUTER.post("/", status_code=status.HTTP_201_CREATED, responses={
+    status.HTTP_201_CREATED: {
         "description": "Token criado com sucesso",
         "content": {
             "application/json": {
@@ -60,6 +61,7 @@ async def retrieve_sessions(user: UserDecorators.GET_AUTHENTICATED_USER, token:
         }
     }
 })
+@LIMITER.limit(LOGIN_IP_LIMIT)
 async def generate_token(request: Request, formdata: OAUTH2_FORM) -> Response:
     """
     Cria uma nova sessão de autenticação de usuário:
@@ -82,7 +84,7 @@ async def generate_token(request: Request, formdata: OAUTH2_FORM) -> Response:
 
     # return TokenResponseSchema.model_validate({"access_token": token, "token_type": "bearer"})
 
-    return SessionService.generate_access_token(request, formdata)
+    return await SessionService.generate_access_token(request, formdata)
 
 @AUTH_ROUTER.post("/refresh-token", responses={
     status.HTTP_200_OK: {
@@ -94,6 +96,7 @@ async def generate_token(request: Request, formdata: OAUTH2_FORM) -> Response:
         }
     }
 })
+@LIMITER.limit(REFRESH_IP_LIMIT)
 async def refresh_token(request: Request) -> Response:
     """
     Realiza a atualização do token de acesso do atual usuário pelo seu refresh token:
@@ -119,7 +122,8 @@ async def logout(session: UserDecorators.GET_AUTHENTICATED_SESSION) -> Response:
     return SessionService.logout(session)
 
 @AUTH_ROUTER.post("/send-restore-password")
-async def send_restore_password(userRestore: AuthRestorePasswordSchema) -> RestorePasswordResponseSchema:
+@LIMITER.limit(RESTORE_IP_LIMIT)
+async def send_restore_password(request: Request, userRestore: AuthRestorePasswordSchema) -> RestorePasswordResponseSchema:
     """
     Envia um email com código único para fazer restore da senha :
 
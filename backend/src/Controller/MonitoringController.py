@@ -0,0 +1,77 @@
+from fastapi import APIRouter
+
+from src.Decorators import ManagerDecorator
+
+from src.Schema.Monitoring.CacheStatsSchema import CacheStatsSchema
+from src.Schema.Monitoring.SweepStatsSchema import SweepStatsSchema
+from src.Schema.Monitoring.PoolStatsSchema import PoolStatsSchema
+from src.Schema.Monitoring.ExecutorStatsSchema import ExecutorStatsSchema
+from src.Schema.Monitoring.SlowQuerySchema import SlowQuerySchema
+
+from src.Service import MonitoringService
+
+MONITORING_ROUTER = APIRouter(
+    prefix="/monitoring",
+    tags=["monitoring"]
+)
+
+@MONITORING_ROUTER.get("/session-cache")
+async def get_session_cache_stats(manager: ManagerDecorator.GET_AUTHENTICATED_MANAGER) -> CacheStatsSchema:
+    """
+    Retorna os contadores do cache de autenticação (hits, misses e evictions):
+
+    **acesso**: `MANAGER` \n
+    **parâmetro**: Sem parâmetros \n
+    **retorno**: devolve: \n
+        `CacheStatsSchema`
+    """
+    return MonitoringService.get_session_cache_stats()
+
+@MONITORING_ROUTER.get("/sweeper")
+async def get_last_sweep_stats(manager: ManagerDecorator.GET_AUTHENTICATED_MANAGER) -> list[SweepStatsSchema]:
+    """
+    Retorna o resultado da última varredura de registros expirados (linhas removidas e tempo por tabela):
+
+    **acesso**: `MANAGER` \n
+    **parâmetro**: Sem parâmetros \n
+    **retorno**: devolve: \n
+        `list[SweepStatsSchema]`
+    """
+    return MonitoringService.get_last_sweep_stats()
+
+@MONITORING_ROUTER.get("/db-pool")
+async def get_db_pool_stats(manager: ManagerDecorator.GET_AUTHENTICATED_MANAGER) -> PoolStatsSchema:
+    """
+    Retorna os contadores do pool de conexões do Postgres (em uso, aguardando e criadas):
+
+    **acesso**: `MANAGER` \n
+    **parâmetro**: Sem parâmetros \n
+    **retorno**: devolve: \n
+        `PoolStatsSchema`
+    """
+    return MonitoringService.get_db_pool_stats()
+
+@MONITORING_ROUTER.get("/db-executor")
+async def get_db_executor_stats(manager: ManagerDecorator.GET_AUTHENTICATED_MANAGER) -> list[ExecutorStatsSchema]:
+    """
+    Retorna os contadores dos pools de threads das consultas ao banco (em andamento, recusadas e concluídas):
+
+    **acesso**: `MANAGER` \n
+    **parâmetro**: Sem parâmetros \n
+    **retorno**: devolve: \n
+        `list[ExecutorStatsSchema]`
+    """
+    return MonitoringService.get_db_executor_stats()
+
+@MONITORING_ROUTER.get("/slow-queries")
+async def get_slow_queries(manager: ManagerDecorator.GET_AUTHENTICATED_MANAGER) -> list[SlowQuerySchema]:
+    """
+    Retorna as consultas ao banco mais lentas que `DB_SLOW_QUERY_MS`, da mais recente para a mais antiga
+    (SQL normalizado, parâmetros mascarados, função do repositório e plano de execução):
+
+    **acesso**: `MANAGER` \n
+    **parâmetro**: Sem parâmetros \n
+    **retorno**: devolve: \n
+        `list[SlowQuerySchema]`
+    """
+    return MonitoringService.get_slow_queries()
@@ -1,7 +1,14 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Query, Request, Response, status
 
 from src.Schema.Travel.TravelResponseSchema import TravelResponseSchema
+from src.Schema.Travel.TravelFullResponseSchema import TravelFullResponseSchema
 from src.Schema.Travel.TravelCreateSchema import TravelCreateSchema
+from src.Schema.Travel.TravelFilterSchema import TravelFilterSchema
+from src.Schema.Travel.TravelRoleEnum import TravelRole
+from src.Schema.Travel.TravelImportResponseSchema import TravelImportResponseSchema
+
+from typing import Annotated
+from datetime import datetime
 
 from uuid import UUID
 
@@ -12,6 +19,7 @@ from src.Error.User.NotUserResourceError import NotUserResource
 from src.Error.User.UserRBACError import UserRBACError
 
 from src.Service import TravelService
+from src.DB.Pagination import set_next_cursor
 from src.Schema.Travel.TravelRealizedEnum import TravelRealized
 
 TRAVEL_ROUTER = APIRouter(
@@ -36,11 +44,35 @@ async def post_travel(user: UserDecorators.GET_AUTHENTICATED_USER, travel: Trave
     **retorno**: devolve: \n
         `TravelResponseSchema`
     """
-    return TravelService.create_travel(travel, user)
+    return await TravelService.create_travel(travel, user)
+
+@TRAVEL_ROUTER.post("/import/", openapi_extra={
+    "requestBody": {
+        "required": True,
+        "content": {
+            "text/csv": {"schema": {"type": "string"}},
+            "application/x-ndjson": {"schema": {"type": "string"}}
+        }
+    }
+})
+async def import_travels(manager: ManagerDecorator.GET_AUTHENTICATED_MANAGER, request: Request) -> TravelImportResponseSchema:
+    """
+    Importa viagens agendadas em lote:
+
+    **acesso**: `MANAGER` \n
+    **parâmetro**: Body: \n
+        CSV com cabeçalho (`Content-Type: text/csv`) ou um JSON por linha (`Content-Type: application/x-ndjson`)
+        com os campos de `TravelCreateSchema`, o `cpf_paciente` precisa ser de um usuário cadastrado \n
+    **retorno**: devolve: \n
+        `TravelImportResponseSchema` com as linhas importadas e os erros de cada linha rejeitada
+    """
+    mediaType = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    return await TravelService.import_travels(request.stream(), mediaType)
 
 
 @TRAVEL_ROUTER.get("/")
-async def get_all_travels(user: ManagerDecorator.GET_AUTHENTICATED_MANAGER, page: int = 0, pageSize: int = 15) -> list[TravelResponseSchema]:
+async def get_all_travels(user: ManagerDecorator.GET_AUTHENTICATED_MANAGER, response: Response, page: int = 0, pageSize: int = 15, cursor: str | None = None) -> list[TravelResponseSchema]:
     """
     Encontra todas as viagens com paginação:
 
@@ -48,13 +80,28 @@ async def get_all_travels(user: ManagerDecorator.GET_AUTHENTICATED_MANAGER, page
     **parâmetro**: Query param: \n
         `page` \n
         `pageSize` \n
+        `cursor` valor do header `X-Next-Cursor` da página anterior, substitui `page` \n
     **retorno**: devolve: \n
-        `list[TravelResponseSchema]`
+        `list[TravelResponseSchema]` e o header `X-Next-Cursor` quando há próxima página
     """
-    return TravelService.find_all_travels(pageSize, page)
+    (travels, nextCursor) = await TravelService.find_all_travels(pageSize, page, cursor)
+    set_next_cursor(response, nextCursor)
+
+    return travels
 
 @TRAVEL_ROUTER.get("/assigned/")
-async def get_assigned_travels(user: UserDecorators.GET_AUTHENTICATED_USER, canceled: bool = False, page: int = 0, pageSize: int = 15) -> list[TravelResponseSchema]:
+async def get_assigned_travels(
+    user: UserDecorators.GET_AUTHENTICATED_USER,
+    response: Response,
+    canceled: bool = False,
+    page: int = 0,
+    pageSize: int = 15,
+    cursor: str | None = None,
+    realizado: Annotated[list[TravelRealized] | None, Query()] = None,
+    papel: TravelRole | None = None,
+    inicio_de: datetime | None = None,
+    inicio_ate: datetime | None = None
+) -> list[TravelResponseSchema]:
     """
     Encontra todas as viagens atreladas a o usuário com paginação:
 
@@ -63,10 +110,48 @@ async def get_assigned_travels(user: UserDecorators.GET_AUTHENTICATED_USER, canc
         `canceled` \n
         `page` \n
         `pageSize` \n
+        `cursor` valor do header `X-Next-Cursor` da página anterior, substitui `page` \n
+        `realizado` um ou mais estados (`?realizado=0&realizado=1`) \n
+        `papel` `paciente` ou `motorista`, sem ele os dois \n
+        `inicio_de` e `inicio_ate` janela de `inicio` (`inicio_ate` exclusivo) \n
+    **retorno**: devolve: \n
+        `list[TravelResponseSchema]` e o header `X-Next-Cursor` quando há próxima página
+    """
+    travelFilter = TravelFilterSchema(realizado=realizado, papel=papel, inicio_de=inicio_de, inicio_ate=inicio_ate)
+
+    (travels, nextCursor) = await TravelService.find_assigned_travels(user, page, pageSize, canceled, cursor, travelFilter)
+    set_next_cursor(response, nextCursor)
+
+    return travels
+
+@TRAVEL_ROUTER.get("/assigned/full/")
+async def get_assigned_travels_full(
+    user: UserDecorators.GET_AUTHENTICATED_USER,
+    response: Response,
+    canceled: bool = False,
+    page: int = 0,
+    pageSize: int = 15,
+    cursor: str | None = None,
+    realizado: Annotated[list[TravelRealized] | None, Query()] = None,
+    papel: TravelRole | None = None,
+    inicio_de: datetime | None = None,
+    inicio_ate: datetime | None = None
+) -> list[TravelFullResponseSchema]:
+    """
+    Encontra as viagens atreladas a o usuário com o motorista e a ambulância (com equipamentos) de cada uma:
+
+    **acesso**: `USER` \n
+    **parâmetro**: Query param: \n
+        os mesmos de `/travel/assigned/` \n
     **retorno**: devolve: \n
-        `list[TravelResponseSchema]`
+        `list[TravelFullResponseSchema]` e o header `X-Next-Cursor` quando há próxima página
     """
-    return TravelService.find_assigned_travels(user, page, pageSize, canceled)
+    travelFilter = TravelFilterSchema(realizado=realizado, papel=papel, inicio_de=inicio_de, inicio_ate=inicio_ate)
+
+    (travels, nextCursor) = await TravelService.find_assigned_travels_full(user, page, pageSize, canceled, cursor, travelFilter)
+    set_next_cursor(response, nextCursor)
+
+    return travels
 
 @TRAVEL_ROUTER.get("/{id}", responses={
     status.HTTP_404_NOT_FOUND: {
@@ -88,7 +173,37 @@ async def get_travel_by_id(user: UserDecorators.GET_AUTHENTICATED_USER, id: UUID
     **retorno**: devolve: \n
         `TravelResponseSchema`
     """
-    return TravelService.find_travel_by_id(id)
+    return await TravelService.find_travel_by_id(id)
+
+@TRAVEL_ROUTER.get("/{id}/full", responses={
+    status.HTTP_403_FORBIDDEN: {
+        "description": "Usuário não é o paciente nem o motorista da viagem",
+        "content": {
+            "application/json": {
+                "example": NOT_USER_RESOURCE.jsonObject
+            }
+        }
+    },
+    status.HTTP_404_NOT_FOUND: {
+        "description": "A viagem não foi encontrada",
+        "content": {
+            "application/json": {
+                "example": TRAVEL_NOT_FOUND.jsonObject
+            }
+        }
+    }
+})
+async def get_travel_full_by_id(user: UserDecorators.GET_AUTHENTICATED_USER, id: UUID) -> TravelFullResponseSchema:
+    """
+    Encontra uma viagem pelo seu ID com o motorista e a ambulância (com equipamentos):
+
+    **acesso**: `USER` paciente ou motorista da viagem, ou `MANAGER` \n
+    **parâmetro**: Route param: \n
+        `id` \n
+    **retorno**: devolve: \n
+        `TravelFullResponseSchema`
+    """
+    return await TravelService.find_travel_full_by_id(user, id)
 
 
 @TRAVEL_ROUTER.post("/cancel/{travelId}", responses={
@@ -111,7 +226,7 @@ async def cancel_travel(user: UserDecorators.GET_AUTHENTICATED_USER, travelId: U
     **retorno**: devolve: \n
         `TravelResponseSchema`
     """
-    return TravelService.cancel_travel_by_id(user, travelId)
+    return await TravelService.cancel_travel_by_id(user, travelId)
 
 @TRAVEL_ROUTER.post("/start/{id}", responses={
     status.HTTP_404_NOT_FOUND: {
@@ -133,7 +248,7 @@ async def start_travel(driver: DriverDecorator.GET_AUTHENTICATED_DRIVER, id: UUI
     **retorno**: devolve: \n
         `TravelResponseSchema`
     """
-    return TravelService.start_travel_by_id(driver, id)
+    return await TravelService.start_travel_by_id(driver, id)
 
 @TRAVEL_ROUTER.post("/end/{id}", responses={
     status.HTTP_404_NOT_FOUND: {
@@ -155,4 +270,4 @@ async def end_travel(user: DriverDecorator.GET_AUTHENTICATED_DRIVER, id: UUID) -
     **retorno**: devolve: \n
         `TravelResponseSchema`
     """
-    return TravelService.end_travel_by_id(user, id)
+    return await TravelService.end_travel_by_id(user, id)
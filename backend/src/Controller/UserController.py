@@ -8,12 +8,13 @@ from src.Schema.User.UserUpdateSchema import UserUpdateSchema
 from src.Schema.User.UserUpdateResponseSchema import UserUpdateResponseSchema
 from src.Schema.User.UserResponseFullSchema import UserResponseFullSchema
 
-from src.Decorators.UserDecorators import GET_AUTHENTICATED_USER
+from src.Decorators.UserDecorators import GET_AUTHENTICATED_USER, GET_AUTHENTICATED_FULL_USER
 from src.Decorators.DriverDecorator import GET_AUTHENTICATED_DRIVER, GET_AUTHENTICATED_DRIVER_OR_HIGHER
 
 from src.Error.Resource.NotFoundResourceError import NotFoundResource
 
 from src.Service import UserService
+from src.DB.Pagination import set_next_cursor
 
 from uuid import UUID
 
@@ -45,7 +46,7 @@ async def create_user(user: UserCreateSchema) -> UserResponseFullSchema:
     **retorno**: devolve: \n
         `UserResponseFullSchema`
     """
-    return UserService.create(user)
+    return await UserService.create(user)
 
 @USER_ROUTER.delete("/", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(user: GET_AUTHENTICATED_USER) -> None:
@@ -72,7 +73,7 @@ async def update_user(user: GET_AUTHENTICATED_USER, userUpdate: UserUpdateSchema
     return UserService.update_user(user, userUpdate)
 
 @USER_ROUTER.get("/")
-async def get_user(user: GET_AUTHENTICATED_USER) -> UserResponseFullSchema:
+async def get_user(user: GET_AUTHENTICATED_FULL_USER) -> UserResponseFullSchema:
     """
     Encontra as informações cadastrais de um usuário:
 
@@ -84,7 +85,7 @@ async def get_user(user: GET_AUTHENTICATED_USER) -> UserResponseFullSchema:
     return UserResponseFullSchema.model_validate(user)
 
 @USER_ROUTER.get("/getusers")
-async def get_users(user: GET_AUTHENTICATED_DRIVER_OR_HIGHER, page: int = 1, pagesize: int = 15) -> list[UserResponseSchema]:
+async def get_users(user: GET_AUTHENTICATED_DRIVER_OR_HIGHER, response: Response, page: int = 1, pagesize: int = 15, cursor: str | None = None) -> list[UserResponseSchema]:
     """
     Encontra todos usuários com paginação:
 
@@ -92,10 +93,14 @@ async def get_users(user: GET_AUTHENTICATED_DRIVER_OR_HIGHER, page: int = 1, pag
     **parâmetro**: Query params:\n
         `page` \n
         `pagesize` \n
+        `cursor` valor do header `X-Next-Cursor` da página anterior, substitui `page` \n
     **retorno**: devolve: \n
-        `list[UserResponseSchema]`
+        `list[UserResponseSchema]` e o header `X-Next-Cursor` quando há próxima página
     """
-    return UserService.find_all_page_dict(int(page), int(pagesize))
+    (users, nextCursor) = UserService.find_all_page_dict(int(page), int(pagesize), cursor)
+    set_next_cursor(response, nextCursor)
+
+    return users
 
 
 @USER_ROUTER.get("/{userId}", responses={
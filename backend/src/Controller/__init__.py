@@ -1,8 +1,9 @@
 from fastapi import FastAPI, status
 
 from src.Utils import env
+from src.Utils.limiter import LIMITER
 
-from src.Controller import AuthController, DriverController, TravelController, UserController, ManagerController, UpgradeTokenController, AmbulanceController
+from src.Controller import AuthController, DriverController, TravelController, UserController, ManagerController, UpgradeTokenController, AmbulanceController, MonitoringController
 
 app = None
 
@@ -16,7 +17,8 @@ def initialize_controller() -> FastAPI:
         UserController.USER_ROUTER,
         ManagerController.MANAGER_ROUTER,
         UpgradeTokenController.UPGRADE_TOKEN_ROUTER,
-        AmbulanceController.AMBULANCE_ROUTER
+        AmbulanceController.AMBULANCE_ROUTER,
+        MonitoringController.MONITORING_ROUTER
     ]
 
     __app__ = FastAPI(
@@ -50,6 +52,8 @@ def initialize_controller() -> FastAPI:
             }
         })
 
+    __app__.state.limiter = LIMITER
+
     for route in routers:
         __app__.include_router(route)
 
@@ -0,0 +1,234 @@
+import asyncio
+import heapq
+from contextvars import ContextVar, Token
+from threading import Lock
+from time import time
+
+from peewee import Database, Proxy, _ConnectionLocal, _ConnectionState
+from playhouse.pool import MaxConnectionsExceeded, PooledDatabase, PooledPostgresqlDatabase
+from fastapi import responses
+
+from src.DB.Routing import RoutingProxy, begin_routing, end_routing
+from src.Error.Server.ServerBusyError import ServerBusy
+
+from src.Logging import Logging, Level
+
+class RequestConnectionState:
+    """
+    Estado de conexão do peewee que separa as conexões por requisição.
+    Dentro de uma requisição (veja `DatabaseConnectionMiddleware`) usa o estado guardado
+    em uma ContextVar própria deste banco, fora dela (startup, tarefas em segundo plano, testes)
+    se comporta como o estado por thread padrão do peewee.
+    """
+
+    def __init__(self) -> None:
+        object.__setattr__(self, "_local", _ConnectionLocal())
+        object.__setattr__(self, "_request", ContextVar(f"request_db_state_{id(self)}", default=None))
+
+    def __current__(self) -> _ConnectionState:
+        return self._request.get() or self._local
+
+    def begin_request(self) -> Token:
+        """ Passa a usar um estado novo no contexto atual """
+        return self._request.set(_ConnectionState())
+
+    def end_request(self, token: Token) -> None:
+        self._request.reset(token)
+
+    def __getattr__(self, name: str):
+        return getattr(self.__current__(), name)
+
+    def __setattr__(self, name: str, value) -> None:
+        setattr(self.__current__(), name, value)
+
+    def reset(self) -> None:
+        self.__current__().reset()
+
+    def set_connection(self, conn) -> None:
+        self.__current__().set_connection(conn)
+
+def use_request_connection_state(database: Database) -> Database:
+    """ Faz o banco usar uma conexão por requisição """
+    database._state = RequestConnectionState()
+    return database
+
+def uses_request_connection_state(database: Database) -> bool:
+    return isinstance(database._state, RequestConnectionState)
+
+class MonitoredPooledPostgresqlDatabase(PooledPostgresqlDatabase):
+    """ Pool de conexões do Postgres que conta conexões criadas, esperas e timeouts,
+    guarda quando cada conexão voltou ao pool para fechar as ociosas e quais
+    prepared statements (veja `PreparedQuery`) cada conexão já tem """
+
+    def __init__(self, *args, **kwargs) -> None:
+        self.waiting = 0
+        self.created = 0
+        self.timeouts = 0
+        self.reaped = 0
+
+        self.__counters_lock__ = Lock()
+        self.__returned_at__: dict[int, float] = {}
+        self.__prepared__: dict[int, set[str]] = {}
+
+        super().__init__(*args, **kwargs)
+
+    def connect(self, reuse_if_open: bool = False) -> bool:
+        with self.__counters_lock__:
+            self.waiting += 1
+
+        try:
+            return super().connect(reuse_if_open)
+        except MaxConnectionsExceeded:
+            with self.__counters_lock__:
+                self.timeouts += 1
+            raise
+        finally:
+            with self.__counters_lock__:
+                self.waiting -= 1
+
+    def _connect(self):
+        with self._pool_lock:
+            available = {self.conn_key(conn) for (_, _, conn) in self._connections}
+            conn = super()._connect()
+
+            key = self.conn_key(conn)
+            self.__returned_at__.pop(key, None)
+
+            if key not in available:
+                # Conexão nova, um id reaproveitado não pode herdar os prepared statements da antiga
+                self.__prepared__.pop(key, None)
+                self.created += 1
+
+            return conn
+
+    def _close(self, conn, close_conn: bool = False) -> None:
+        with self._pool_lock:
+            super()._close(conn, close_conn)
+
+            key = self.conn_key(conn)
+            if close_conn:
+                self.__returned_at__.pop(key, None)
+                self.__prepared__.pop(key, None)
+            elif key not in self._in_use:
+                self.__returned_at__[key] = time()
+
+    def prepared_statements(self, conn) -> set[str]:
+        """ Nomes dos prepared statements da conexão, esquecidos quando ela é fechada """
+        with self._pool_lock:
+            return self.__prepared__.setdefault(self.conn_key(conn), set())
+
+    def close_idle_older_than(self, seconds: float) -> int:
+        """ Fecha as conexões disponíveis que estão paradas no pool há mais de `seconds` """
+        with self._pool_lock:
+            cutoff = time() - seconds
+            keep = []
+            closed = 0
+
+            for entry in self._connections:
+                conn = entry[2]
+                if self.__returned_at__.get(self.conn_key(conn), time()) < cutoff:
+                    self._close(conn, close_conn=True)
+                    closed += 1
+                else:
+                    keep.append(entry)
+
+            heapq.heapify(keep)
+            self._connections = keep
+            self.reaped += closed
+
+            return closed
+
+    def stats(self) -> dict[str, int]:
+        with self._pool_lock:
+            return {
+                "em_uso": len(self._in_use),
+                "disponiveis": len(self._connections),
+                "aguardando": self.waiting,
+                "criadas": self.created,
+                "maximo": self._max_connections or 0,
+                "timeouts": self.timeouts,
+                "fechadas_ociosas": self.reaped
+            }
+
+def pool_stats(database: Database) -> dict[str, int] | None:
+    """ Retorna os contadores do pool, ou None se o banco não usa pool """
+    if isinstance(database, MonitoredPooledPostgresqlDatabase):
+        return database.stats()
+
+    return None
+
+async def reap_idle_connections_forever(database: Database, idleTimeout: float) -> None:
+    """ Fecha periodicamente as conexões ociosas do pool """
+    if not isinstance(database, MonitoredPooledPostgresqlDatabase):
+        return
+
+    while True:
+        await asyncio.sleep(idleTimeout)
+
+        closed = database.close_idle_older_than(idleTimeout)
+        if closed:
+            Logging.log(f"{closed} conexões ociosas fechadas", Level.DEBUG)
+
+def connect_in_request(database: Database) -> None:
+    if not database.is_closed():
+        return
+
+    database.connect()
+
+class DatabaseConnectionMiddleware:
+    """
+    Abre uma conexão (ou pega uma do pool) no início de cada requisição HTTP e a devolve no fim.
+    Cada requisição usa uma réplica de leitura em rodízio, requisições GET e HEAD já começam
+    conectadas a ela e as demais ao principal. Os outros bancos conectam no primeiro uso.
+    A espera por uma conexão do pool acontece em uma thread para não travar o event loop.
+    """
+
+    READ_METHODS = ("GET", "HEAD")
+
+    def __init__(self, app, database: Proxy) -> None:
+        self.app = app
+        self.database = database
+
+    def __databases__(self) -> list[Database]:
+        if isinstance(self.database, RoutingProxy):
+            databases = self.database.databases()
+        else:
+            databases = [self.database.obj] if self.database.obj is not None else []
+
+        return [database for database in databases if uses_request_connection_state(database)]
+
+    async def __call__(self, scope, receive, send) -> None:
+        databases = self.__databases__()
+
+        if scope["type"] != "http" or not databases:
+            await self.app(scope, receive, send)
+            return
+
+        replica = self.database.replicas.choose() if isinstance(self.database, RoutingProxy) else None
+        client = scope.get("client")
+
+        routingToken = begin_routing(replica, client[0] if client else None)
+        stateTokens = [(database, database._state.begin_request()) for database in databases]
+
+        try:
+            current = replica if replica is not None and scope["method"] in self.READ_METHODS else databases[0]
+
+            try:
+                if isinstance(current, PooledDatabase):
+                    await asyncio.to_thread(connect_in_request, current)
+                elif current in databases:
+                    connect_in_request(current)
+            except MaxConnectionsExceeded:
+                error = ServerBusy()
+                await responses.JSONResponse(status_code=error.statusCode, content=error.jsonObject, headers=error.headers)(scope, receive, send)
+                return
+
+            await self.app(scope, receive, send)
+        finally:
+            for (database, token) in stateTokens:
+                if not database.is_closed():
+                    database.close()
+
+                database._state.end_request(token)
+
+            end_routing(routingToken)
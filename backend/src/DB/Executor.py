@@ -0,0 +1,100 @@
+from threading import Lock
+
+from peewee import BaseQuery, Database
+
+from typing import Any, Callable, TypeVar
+
+from src.DB import db
+from src.DB.Connection import uses_request_connection_state
+from src.Utils.executor import BoundedExecutor
+from src.Utils.env import get_env_var
+
+T = TypeVar("T")
+
+# Sem DB_WORKERS o número de threads acompanha o tamanho do pool do banco
+DB_WORKERS = int(get_env_var("DB_WORKERS", "0") or "0")
+DB_DEFAULT_WORKERS = 8
+DB_QUEUE_LIMIT = int(get_env_var("DB_QUEUE_LIMIT", "256") or "256")
+
+DATABASE_EXECUTORS: dict[int, BoundedExecutor] = {}
+DATABASE_EXECUTORS_LOCK = Lock()
+
+def workers_for(database: Database) -> int:
+    """ Threads para um banco: `DB_WORKERS`, o máximo de conexões do pool ou `DB_DEFAULT_WORKERS` """
+    if DB_WORKERS > 0:
+        return DB_WORKERS
+
+    return getattr(database, "_max_connections", None) or DB_DEFAULT_WORKERS
+
+def executor_for(database: Database) -> BoundedExecutor:
+    """ Pool de threads do banco, criado no primeiro uso """
+    key = id(database)
+
+    with DATABASE_EXECUTORS_LOCK:
+        executor = DATABASE_EXECUTORS.get(key)
+
+        if executor is None:
+            executor = BoundedExecutor(workers_for(database), DB_QUEUE_LIMIT, name=f"db-{type(database).__name__}-{len(DATABASE_EXECUTORS)}")
+            DATABASE_EXECUTORS[key] = executor
+
+        return executor
+
+def materialize(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """ Executa `fn` e carrega consultas preguiçosas do peewee na própria thread do banco """
+    result = fn(*args, **kwargs)
+
+    if isinstance(result, BaseQuery):
+        return list(result)
+
+    return result
+
+async def run_in_db(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Executa `fn` no pool de threads do banco atual sem bloquear o event loop.
+    O contexto é copiado, então a thread usa a mesma conexão da requisição e a mesma rota (leitura ou escrita).
+    """
+    database = db.current()
+
+    if database is None:
+        raise RuntimeError("Banco de dados não inicializado.")
+
+    return await executor_for(database).run(materialize, fn, *args, **kwargs)
+
+def detached(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Executa `fn` com conexões próprias, fora do estado de conexão da requisição que a pediu:
+    a do banco principal é aberta e fechada aqui, as das réplicas são fechadas no fim se forem usadas.
+    """
+    databases = [database for database in db.databases() if uses_request_connection_state(database)]
+    tokens = [(database, database._state.begin_request()) for database in databases]
+
+    try:
+        with db.obj.connection_context():
+            return materialize(fn, *args, **kwargs)
+    finally:
+        for (database, token) in tokens:
+            if not database.is_closed():
+                database.close()
+
+            database._state.end_request(token)
+
+async def run_in_db_detached(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """ Igual a `run_in_db` com as conexões de `detached`, para tarefas em segundo plano
+    que continuam depois do fim da requisição que as criou """
+    return await run_in_db(detached, fn, *args, **kwargs)
+
+def executor_stats() -> list[dict[str, int | str]]:
+    """ Retorna os contadores de cada pool de threads dos bancos """
+    with DATABASE_EXECUTORS_LOCK:
+        executors = list(DATABASE_EXECUTORS.values())
+
+    return [executor.stats() for executor in executors]
+
+def shutdown_executors() -> None:
+    """ Encerra os pools de threads dos bancos """
+    with DATABASE_EXECUTORS_LOCK:
+        executors = list(DATABASE_EXECUTORS.values())
+        DATABASE_EXECUTORS.clear()
+
+    for executor in executors:
+        executor.shutdown()
@@ -1,5 +1,8 @@
-from src.Model import User, Driver, Travel, UserSession, Ambulance, Equipment, Manager, UpgradeToken, RestorePassword
+from src.Model import User, Driver, Travel, UserSession, Ambulance, Equipment, Manager, UpgradeToken, RestorePassword, EmailOutbox, SchemaMigration
 from src.DB import db, is_pytest, Proxy
+from src.DB.Migrations import MIGRATION_RUNNER
+from src.Utils.env import get_env_var
+from playhouse.pool import PooledDatabase
 
 MODELS = [
     User.User,
@@ -10,19 +13,28 @@ MODELS = [
     Equipment.Equipment,
     Manager.Manager,
     UpgradeToken.UpgradeToken,
-    RestorePassword.RestorePassword
+    RestorePassword.RestorePassword,
+    EmailOutbox.EmailOutbox,
+    SchemaMigration.SchemaMigration
 ]
 
+# Com `false` as migrações precisam ser aplicadas com `python -m src.DB.Migrations migrate`
+MIGRATE_ON_STARTUP = (get_env_var("DB_MIGRATE_ON_STARTUP", "true") or "true").lower() == "true"
+
 def initialize_db() -> Proxy:
     db.connect()
 
-    if not is_pytest:
-        db.create_tables(MODELS)
+    if not is_pytest and MIGRATE_ON_STARTUP:
+        MIGRATION_RUNNER.migrate()
     
     return db
 
 def close_db() -> None:
-    db.close()
+    for database in db.databases():
+        database.close()
+
+        if isinstance(database, PooledDatabase):
+            database.close_all()
 
 def drop_test_db() -> None:
     if is_pytest:
@@ -0,0 +1,328 @@
+from peewee import Database, Field, ForeignKeyField, Model, PostgresqlDatabase
+from playhouse.migrate import SchemaMigrator
+
+from src.Model.Fields import UUIDKeyField, SQLITE_UTC_FORMAT, to_utc, to_uuid
+
+class Operation:
+    """
+    Uma alteração de esquema idempotente: rodar de novo em um banco que já tem a alteração não faz nada.
+    Operações não transacionais (como `CREATE INDEX CONCURRENTLY`) rodam fora de `db.atomic()`.
+    """
+
+    def is_transactional(self, database: Database) -> bool:
+        return True
+
+    def describe(self, database: Database) -> str:
+        raise NotImplementedError
+
+    def run(self, database: Database) -> None:
+        raise NotImplementedError
+
+def is_postgres(database: Database) -> bool:
+    return isinstance(database, PostgresqlDatabase)
+
+def quote(database: Database, name: str) -> str:
+    (start, end) = database.quote
+    return f"{start}{name}{end}"
+
+class CreateTables(Operation):
+    """ Cria as tabelas (e os índices declarados nos modelos) que ainda não existem """
+
+    def __init__(self, models: list[type[Model]]) -> None:
+        self.models = models
+
+    def describe(self, database: Database) -> str:
+        return "CREATE TABLE IF NOT EXISTS " + ", ".join(model._meta.table_name for model in self.models)
+
+    def run(self, database: Database) -> None:
+        database.create_tables(self.models, safe=True)
+
+class CreateIndex(Operation):
+    """
+    Cria um índice sem travar escritas na tabela: no Postgres usa `CREATE INDEX CONCURRENTLY`,
+    que não pode rodar dentro de uma transação. Um índice deixado inválido por um build
+    concorrente que falhou é removido e recriado.
+    """
+
+    def __init__(self, model: type[Model], fields: list[str], name: str | None = None, unique: bool = False, where: str | None = None) -> None:
+        self.model = model
+        self.fields = fields
+        self.unique = unique
+        self.where = where
+
+        self.table = model._meta.table_name
+        self.columns = [model._meta.fields[field].column_name for field in fields]
+        self.name = name or f"{self.table}_{'_'.join(self.columns)}"
+
+    def is_transactional(self, database: Database) -> bool:
+        return not is_postgres(database)
+
+    def sql(self, database: Database) -> str:
+        concurrently = " CONCURRENTLY" if is_postgres(database) else ""
+        unique = " UNIQUE" if self.unique else ""
+        columns = ", ".join(quote(database, column) for column in self.columns)
+        where = f" WHERE {self.where}" if self.where else ""
+
+        return f"CREATE{unique} INDEX{concurrently} IF NOT EXISTS {quote(database, self.name)} ON {quote(database, self.table)} ({columns}){where}"
+
+    def describe(self, database: Database) -> str:
+        return self.sql(database)
+
+    def run(self, database: Database) -> None:
+        if is_postgres(database):
+            invalid = database.execute_sql(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = %s AND NOT i.indisvalid",
+                (self.name,)
+            ).fetchone()
+
+            if invalid:
+                DropIndex(self.name).run(database)
+
+        database.execute_sql(self.sql(database))
+
+class DropIndex(Operation):
+    """ Remove um índice, no Postgres com `DROP INDEX CONCURRENTLY` """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def is_transactional(self, database: Database) -> bool:
+        return not is_postgres(database)
+
+    def sql(self, database: Database) -> str:
+        concurrently = " CONCURRENTLY" if is_postgres(database) else ""
+        return f"DROP INDEX{concurrently} IF EXISTS {quote(database, self.name)}"
+
+    def describe(self, database: Database) -> str:
+        return self.sql(database)
+
+    def run(self, database: Database) -> None:
+        database.execute_sql(self.sql(database))
+
+class AddColumn(Operation):
+    """ Adiciona uma coluna com o `playhouse.migrate`, se ela ainda não existir """
+
+    def __init__(self, model: type[Model], name: str, field: Field) -> None:
+        self.model = model
+        self.name = name
+        self.field = field
+
+        self.table = model._meta.table_name
+
+    def describe(self, database: Database) -> str:
+        return f"ALTER TABLE {quote(database, self.table)} ADD COLUMN {quote(database, self.name)} ({type(self.field).__name__})"
+
+    def run(self, database: Database) -> None:
+        if self.name in {column.name for column in database.get_columns(self.table)}:
+            return
+
+        SchemaMigrator.from_database(database).add_column(self.table, self.name, self.field).run()
+
+class RunSQL(Operation):
+    """ SQL livre, precisa ser idempotente por conta própria (IF EXISTS, IF NOT EXISTS...) """
+
+    def __init__(self, sql: str, transactional: bool = True) -> None:
+        self.sqlText = sql
+        self.transactional = transactional
+
+    def is_transactional(self, database: Database) -> bool:
+        return self.transactional
+
+    def describe(self, database: Database) -> str:
+        return self.sqlText
+
+    def run(self, database: Database) -> None:
+        database.execute_sql(self.sqlText)
+
+def uuid_key_columns(model: type[Model]) -> list[str]:
+    """ Colunas do modelo que guardam um UUID: a chave primária e as chaves estrangeiras que apontam para uma """
+    columns = []
+
+    for field in model._meta.sorted_fields:
+        target = field
+        while isinstance(target, ForeignKeyField):
+            target = target.rel_field
+
+        if isinstance(target, UUIDKeyField):
+            columns.append(field.column_name)
+
+    return columns
+
+def uuid_blob(value: str | bytes | None) -> bytes | None:
+    uuid = to_uuid(value)
+    return uuid.bytes if uuid is not None else None
+
+class ConvertUUIDKeys(Operation):
+    """
+    Converte as chaves em texto (hex de 32 caracteres) para o tipo nativo, junto com as linhas existentes.
+    No Postgres troca o tipo das colunas para `uuid` com `ALTER COLUMN ... TYPE` (reescreve as tabelas,
+    rode fora do horário de pico), removendo e recriando as chaves estrangeiras em volta.
+    No SQLite, que não altera o tipo de uma coluna, recria as tabelas e copia as linhas convertendo
+    para BLOB, recriando depois os índices de migrações (que não estão declarados nos modelos).
+    """
+
+    SQLITE_SUFFIX = "__texto"
+
+    def __init__(self, models: list[type[Model]]) -> None:
+        self.models = models
+        self.columns = {model: uuid_key_columns(model) for model in models}
+
+    def is_transactional(self, database: Database) -> bool:
+        # No SQLite o PRAGMA foreign_keys não pode mudar dentro de uma transação, a operação abre a sua
+        return is_postgres(database)
+
+    def describe(self, database: Database) -> str:
+        columns = ", ".join(f"{model._meta.table_name}.{column}" for (model, columns) in self.columns.items() for column in columns)
+
+        if is_postgres(database):
+            return f"ALTER COLUMN ... TYPE uuid ({columns})"
+
+        return f"recria as tabelas com as chaves em BLOB ({columns})"
+
+    def pending(self, database: Database) -> dict[type[Model], list[str]]:
+        """ Colunas que ainda não estão no tipo nativo, por modelo """
+        native = "uuid" if is_postgres(database) else "blob"
+        pending = {}
+
+        for (model, columns) in self.columns.items():
+            table = model._meta.table_name
+
+            if not columns or not database.table_exists(table):
+                continue
+
+            types = {column.name: column.data_type.lower() for column in database.get_columns(table)}
+            remaining = [column for column in columns if types.get(column) != native]
+
+            if remaining:
+                pending[model] = remaining
+
+        return pending
+
+    def run(self, database: Database) -> None:
+        pending = self.pending(database)
+
+        if not pending:
+            return
+
+        if is_postgres(database):
+            self.__run_postgres__(database, pending)
+        else:
+            self.__run_sqlite__(database)
+
+    def __run_postgres__(self, database: Database, pending: dict[type[Model], list[str]]) -> None:
+        tables = [model._meta.table_name for model in self.models]
+
+        constraints = database.execute_sql(
+            "SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE contype = 'f' AND (conrelid::regclass::text = ANY(%s) OR confrelid::regclass::text = ANY(%s))",
+            (tables, tables)
+        ).fetchall()
+
+        for (table, name, _) in constraints:
+            database.execute_sql(f"ALTER TABLE {table} DROP CONSTRAINT {quote(database, name)}")
+
+        for (model, columns) in pending.items():
+            table = quote(database, model._meta.table_name)
+
+            for column in columns:
+                column = quote(database, column)
+                database.execute_sql(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE uuid USING NULLIF({column}, '')::uuid")
+
+        for (table, name, definition) in constraints:
+            database.execute_sql(f"ALTER TABLE {table} ADD CONSTRAINT {quote(database, name)} {definition}")
+
+    def __run_sqlite__(self, database: Database) -> None:
+        tables = [model._meta.table_name for model in self.models if database.table_exists(model._meta.table_name)]
+        models = [model for model in self.models if model._meta.table_name in tables]
+        placeholders = ", ".join("?" * len(tables))
+
+        database.connection().create_function("uuid_blob", 1, uuid_blob, deterministic=True)
+        foreignKeys = database.execute_sql("PRAGMA foreign_keys").fetchone()[0]
+        database.execute_sql("PRAGMA foreign_keys = 0")
+
+        try:
+            with database.atomic():
+                # Nomes de índice são globais no SQLite, os das tabelas antigas impediriam recriar os das novas
+                indexes = database.execute_sql(
+                    f"SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN ({placeholders})",
+                    tables
+                ).fetchall()
+
+                for (index, _) in indexes:
+                    database.execute_sql(f"DROP INDEX {quote(database, index)}")
+
+                for table in tables:
+                    database.execute_sql(f"ALTER TABLE {quote(database, table)} RENAME TO {quote(database, table + self.SQLITE_SUFFIX)}")
+
+                database.create_tables(models)
+
+                for model in models:
+                    table = model._meta.table_name
+                    old = {column.name for column in database.get_columns(table + self.SQLITE_SUFFIX)}
+                    columns = [field.column_name for field in model._meta.sorted_fields if field.column_name in old]
+                    values = [f"uuid_blob({quote(database, column)})" if column in self.columns[model] else quote(database, column) for column in columns]
+
+                    database.execute_sql(
+                        f"INSERT INTO {quote(database, table)} ({', '.join(quote(database, column) for column in columns)}) "
+                        f"SELECT {', '.join(values)} FROM {quote(database, table + self.SQLITE_SUFFIX)}"
+                    )
+
+                for table in tables:
+                    database.execute_sql(f"DROP TABLE {quote(database, table + self.SQLITE_SUFFIX)}")
+
+                # `create_tables` já recriou os índices dos modelos, faltam os das migrações
+                created = {index.name for table in tables for index in database.get_indexes(table)}
+
+                for (index, sql) in indexes:
+                    if index not in created:
+                        database.execute_sql(sql)
+        finally:
+            database.execute_sql(f"PRAGMA foreign_keys = {int(foreignKeys)}")
+
+def utc_text(value: str | None) -> str | None:
+    """ Texto ISO (com ou sem fuso) no formato UTC de largura fixa do `UTCDateTimeField` """
+    try:
+        utc = to_utc(value)
+    except ValueError:
+        return value
+
+    return utc.strftime(SQLITE_UTC_FORMAT) if utc is not None else None
+
+class ConvertUTCTimestamps(Operation):
+    """
+    Converte colunas de data e hora gravadas como texto ISO para o formato do `UTCDateTimeField`.
+    No Postgres a coluna vira `timestamptz`, com os valores sem fuso interpretados como UTC.
+    No SQLite os valores são reescritos em UTC com largura fixa, comparáveis direto no SQL.
+    """
+
+    def __init__(self, fields: list[Field]) -> None:
+        self.fields = fields
+
+    def describe(self, database: Database) -> str:
+        columns = ", ".join(f"{field.model._meta.table_name}.{field.column_name}" for field in self.fields)
+
+        if is_postgres(database):
+            return f"ALTER COLUMN ... TYPE timestamptz ({columns})"
+
+        return f"UPDATE ... SET coluna = utc_text(coluna) ({columns})"
+
+    def run(self, database: Database) -> None:
+        if not is_postgres(database):
+            database.connection().create_function("utc_text", 1, utc_text, deterministic=True)
+
+        for field in self.fields:
+            table = field.model._meta.table_name
+
+            if not database.table_exists(table):
+                continue
+
+            column = quote(database, field.column_name)
+
+            if not is_postgres(database):
+                database.execute_sql(f"UPDATE {quote(database, table)} SET {column} = utc_text({column}) WHERE {column} IS NOT NULL")
+                continue
+
+            types = {column.name: column.data_type.lower() for column in database.get_columns(table)}
+
+            if types.get(field.column_name) != "timestamp with time zone":
+                database.execute_sql(f"ALTER TABLE {quote(database, table)} ALTER COLUMN {column} TYPE timestamptz USING {column} AT TIME ZONE 'UTC'")
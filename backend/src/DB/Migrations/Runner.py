@@ -0,0 +1,131 @@
+from contextlib import contextmanager
+from time import perf_counter
+
+from peewee import Database
+
+from typing import Callable, Iterator
+
+from src.DB import db
+from src.DB.Migrations.Operations import Operation, is_postgres
+from src.Model.SchemaMigration import SchemaMigration
+
+from src.Logging import Logging, Level
+
+# Chave do advisory lock do Postgres, impede que dois processos migrem ao mesmo tempo
+MIGRATION_LOCK_KEY = 7_151_013
+
+class MigrationStep:
+    """
+    Uma versão do esquema. `operations` é chamada somente quando a versão vai ser planejada
+    ou aplicada, assim os modelos e o banco já estão configurados.
+    """
+
+    def __init__(self, version: int, name: str, operations: Callable[[], list[Operation]]) -> None:
+        self.version = version
+        self.name = name
+        self.operations = operations
+
+class MigrationRunner:
+    """
+    Aplica em ordem as versões do esquema que ainda não estão na tabela `migracao`.
+    Uma versão com somente operações transacionais roda inteira em uma transação junto com o
+    seu registro, as demais rodam operação por operação e são registradas no fim.
+    """
+
+    def __init__(self, steps: list[MigrationStep]) -> None:
+        versions = [step.version for step in steps]
+
+        if versions != sorted(set(versions)):
+            raise ValueError(f"Versões de migração fora de ordem ou repetidas: {versions}")
+
+        self.steps = steps
+
+    @property
+    def database(self) -> Database:
+        return db.obj
+
+    def applied_versions(self) -> set[int]:
+        if not self.database.table_exists(SchemaMigration._meta.table_name):
+            return set()
+
+        return {row[0] for row in SchemaMigration.select(SchemaMigration.versao).tuples()}
+
+    def pending(self) -> list[MigrationStep]:
+        applied = self.applied_versions()
+        return [step for step in self.steps if step.version not in applied]
+
+    def plan(self) -> list[dict]:
+        """ Lista as versões pendentes e o SQL de cada operação sem alterar o banco """
+        return [{
+            "versao": step.version,
+            "nome": step.name,
+            "operacoes": [self.__describe__(operation) for operation in step.operations()]
+        } for step in self.pending()]
+
+    def migrate(self) -> list[dict]:
+        """ Aplica as versões pendentes e retorna o tempo de cada operação """
+        report = []
+
+        with self.__lock__():
+            SchemaMigration.create_table(safe=True)
+
+            for step in self.pending():
+                report.append(self.__apply__(step))
+
+        return report
+
+    def __describe__(self, operation: Operation) -> str:
+        transactional = "" if operation.is_transactional(self.database) else " (fora de transação)"
+        return operation.describe(self.database) + transactional
+
+    def __apply__(self, step: MigrationStep) -> dict:
+        operations = step.operations()
+        transactional = all(operation.is_transactional(self.database) for operation in operations)
+        timings = []
+        start = perf_counter()
+
+        if transactional:
+            with self.database.atomic():
+                for operation in operations:
+                    timings.append(self.__run__(step, operation))
+
+                elapsed = (perf_counter() - start) * 1000
+                SchemaMigration.create(versao=step.version, nome=step.name, tempo_ms=round(elapsed, 3))
+        else:
+            for operation in operations:
+                if operation.is_transactional(self.database):
+                    with self.database.atomic():
+                        timings.append(self.__run__(step, operation))
+                else:
+                    timings.append(self.__run__(step, operation))
+
+            elapsed = (perf_counter() - start) * 1000
+            SchemaMigration.create(versao=step.version, nome=step.name, tempo_ms=round(elapsed, 3))
+
+        Logging.log(f"Migração {step.version} ({step.name}) aplicada em {elapsed:.1f}ms", Level.INFO)
+
+        return {"versao": step.version, "nome": step.name, "tempo_ms": round(elapsed, 3), "operacoes": timings}
+
+    def __run__(self, step: MigrationStep, operation: Operation) -> dict:
+        description = operation.describe(self.database)
+        start = perf_counter()
+
+        operation.run(self.database)
+
+        elapsed = (perf_counter() - start) * 1000
+        Logging.log(f"Migração {step.version}: {description} em {elapsed:.1f}ms", Level.DEBUG)
+
+        return {"operacao": description, "tempo_ms": round(elapsed, 3)}
+
+    @contextmanager
+    def __lock__(self) -> Iterator[None]:
+        if not is_postgres(self.database):
+            yield
+            return
+
+        self.database.execute_sql("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_KEY,))
+
+        try:
+            yield
+        finally:
+            self.database.execute_sql("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,))
@@ -0,0 +1,21 @@
+from src.DB.Migrations.Operations import Operation, CreateTables
+from src.Model import User, Driver, Travel, UserSession, Ambulance, Equipment, Manager, UpgradeToken, RestorePassword, EmailOutbox
+
+VERSION = 1
+NAME = "tabelas iniciais"
+
+def operations() -> list[Operation]:
+    """ Esquema criado antes das migrações versionadas, em bancos existentes não altera nada """
+
+    return [CreateTables([
+        User.User,
+        Driver.Driver,
+        Travel.Travel,
+        UserSession.Session,
+        Ambulance.Ambulance,
+        Equipment.Equipment,
+        Manager.Manager,
+        UpgradeToken.UpgradeToken,
+        RestorePassword.RestorePassword,
+        EmailOutbox.EmailOutbox
+    ])]
@@ -0,0 +1,39 @@
+from src.DB.Migrations.Operations import Operation, CreateIndex, DropIndex
+from src.Model import Travel, UserSession, UpgradeToken, RestorePassword, EmailOutbox
+
+VERSION = 2
+NAME = "indices das consultas"
+
+def operations() -> list[Operation]:
+    """
+    Índices no formato das consultas dos repositórios e do sweeper.
+    Os índices parciais usam `IS NOT NULL`, que o Postgres e o SQLite conseguem provar a partir
+    de uma comparação com parâmetro (`coluna <= ?`), diferente de `status = 'enviado'`.
+    """
+    travel = Travel.Travel
+    session = UserSession.Session
+    restorePassword = RestorePassword.RestorePassword
+    upgradeToken = UpgradeToken.UpgradeToken
+    emailOutbox = EmailOutbox.EmailOutbox
+
+    return [
+        # Viagens atribuídas ao usuário, da mais recente para a mais antiga
+        CreateIndex(travel, ["id_paciente", "criado_em"]),
+        CreateIndex(travel, ["id_motorista", "criado_em"], where='"id_motorista_id" IS NOT NULL'),
+        CreateIndex(travel, ["criado_em"]),
+        CreateIndex(travel, ["inicio"]),
+
+        # Os índices compostos começam pela chave estrangeira e substituem os de coluna única
+        DropIndex("travel_id_paciente_id"),
+        DropIndex("travel_id_motorista_id"),
+
+        # Expiração usada pelo sweeper
+        CreateIndex(session, ["valido_ate"]),
+        CreateIndex(restorePassword, ["valido_ate"]),
+        CreateIndex(upgradeToken, ["revogado_em"], where='"revogado_em" IS NOT NULL'),
+        CreateIndex(emailOutbox, ["enviado_em"], where='"enviado_em" IS NOT NULL'),
+
+        # Tokens livres por cargo e fila de envio de emails
+        CreateIndex(upgradeToken, ["fator_cargo", "usado"]),
+        CreateIndex(emailOutbox, ["status", "proxima_tentativa"])
+    ]
@@ -0,0 +1,11 @@
+from src.DB.Migrations.Operations import Operation, ConvertUUIDKeys
+from src.DB.Migrations import V0001_Initial
+
+VERSION = 3
+NAME = "chaves uuid nativas"
+
+def operations() -> list[Operation]:
+    """ Registrada somente com `DB_UUID_STORAGE=native`, converte as chaves das tabelas existentes """
+    (createTables,) = V0001_Initial.operations()
+
+    return [ConvertUUIDKeys(createTables.models)]
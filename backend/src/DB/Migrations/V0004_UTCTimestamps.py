@@ -0,0 +1,23 @@
+from src.DB.Migrations.Operations import Operation, ConvertUTCTimestamps
+from src.Model import UserSession, RestorePassword, UpgradeToken, EmailOutbox
+
+VERSION = 4
+NAME = "datas em utc"
+
+def operations() -> list[Operation]:
+    """ Colunas de expiração filtradas no SQL (autenticação e sweeper), antes gravadas como texto ISO """
+    session = UserSession.Session
+    restorePassword = RestorePassword.RestorePassword
+    upgradeToken = UpgradeToken.UpgradeToken
+    emailOutbox = EmailOutbox.EmailOutbox
+
+    return [ConvertUTCTimestamps([
+        session.valido_ate,
+        session.criado_em,
+        restorePassword.valido_ate,
+        upgradeToken.criado_em,
+        upgradeToken.revogado_em,
+        emailOutbox.proxima_tentativa,
+        emailOutbox.criado_em,
+        emailOutbox.enviado_em
+    ])]
@@ -0,0 +1,10 @@
+from src.DB.Migrations.Operations import Operation, ConvertUTCTimestamps
+from src.Model import Travel
+
+VERSION = 5
+NAME = "criado_em das viagens em utc"
+
+def operations() -> list[Operation]:
+    """ `criado_em` é a chave do cursor das listagens de viagens e precisa comparar na ordem cronológica """
+
+    return [ConvertUTCTimestamps([Travel.Travel.criado_em])]
@@ -0,0 +1,21 @@
+from src.DB.Migrations.Operations import Operation, CreateIndex, DropIndex
+from src.Model import Travel
+
+VERSION = 6
+NAME = "indices do filtro de viagens"
+
+def operations() -> list[Operation]:
+    """
+    Índices no formato de `TravelRepository.find_travels`: igualdade no usuário e em `cancelada`,
+    depois a ordem da listagem (`criado_em`, `id`), assim a página sai do índice sem ordenar.
+    Substituem os índices (usuário, criado_em) da versão 2, que são prefixos do mesmo acesso.
+    """
+    travel = Travel.Travel
+
+    return [
+        CreateIndex(travel, ["id_paciente", "cancelada", "criado_em", "id"]),
+        CreateIndex(travel, ["id_motorista", "cancelada", "criado_em", "id"], where='"id_motorista_id" IS NOT NULL'),
+
+        DropIndex("transporte_id_paciente_id_criado_em"),
+        DropIndex("transporte_id_motorista_id_criado_em")
+    ]
@@ -0,0 +1,12 @@
+from peewee import CharField
+
+from src.DB.Migrations.Operations import Operation, AddColumn
+from src.Model import EmailOutbox
+
+VERSION = 7
+NAME = "reserva dos emails da fila"
+
+def operations() -> list[Operation]:
+    """ Lote do dispatcher que reservou cada email, assim dois workers não enviam o mesmo email """
+
+    return [AddColumn(EmailOutbox.EmailOutbox, "reservado_por", CharField(max_length=32, null=True))]
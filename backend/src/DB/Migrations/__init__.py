@@ -0,0 +1,24 @@
+"""
+Migrações versionadas do esquema. Para uma nova versão crie `VXXXX_Nome.py` com `VERSION`,
+`NAME` e `operations()` e adicione o módulo em `VERSIONS`, sempre no fim da lista.
+
+Uso (na pasta backend):
+    python -m src.DB.Migrations plan      mostra o SQL das versões pendentes sem alterar o banco
+    python -m src.DB.Migrations migrate   aplica as versões pendentes
+"""
+from src.DB.Migrations.Runner import MigrationRunner, MigrationStep
+from src.DB.Migrations import V0001_Initial, V0002_QueryIndexes, V0003_NativeUUIDKeys, V0004_UTCTimestamps, V0005_TravelCreatedAtUTC, V0006_TravelFilterIndexes, V0007_EmailOutboxLease
+from src.Model.Fields import uses_native_uuid
+
+VERSIONS = [
+    V0001_Initial,
+    V0002_QueryIndexes,
+    # Conversão das chaves existentes para o tipo nativo, somente com DB_UUID_STORAGE=native
+    *([V0003_NativeUUIDKeys] if uses_native_uuid() else []),
+    V0004_UTCTimestamps,
+    V0005_TravelCreatedAtUTC,
+    V0006_TravelFilterIndexes,
+    V0007_EmailOutboxLease
+]
+
+MIGRATION_RUNNER = MigrationRunner([MigrationStep(version.VERSION, version.NAME, version.operations) for version in VERSIONS])
@@ -0,0 +1,30 @@
+import argparse
+
+from src.DB import db
+from src.DB.Migrations import MIGRATION_RUNNER
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.DB.Migrations")
+    parser.add_argument("command", choices=["plan", "migrate"])
+    args = parser.parse_args()
+
+    with db.obj.connection_context():
+        if args.command == "plan":
+            steps = MIGRATION_RUNNER.plan()
+
+            if not steps:
+                print("Nenhuma migração pendente")
+
+            for step in steps:
+                print(f"{step['versao']:04d} {step['nome']}")
+                for operation in step["operacoes"]:
+                    print(f"    {operation}")
+            return
+
+        for step in MIGRATION_RUNNER.migrate():
+            print(f"{step['versao']:04d} {step['nome']}: {step['tempo_ms']:.1f}ms")
+            for operation in step["operacoes"]:
+                print(f"    {operation['tempo_ms']:10.1f}ms  {operation['operacao']}")
+
+if __name__ == "__main__":
+    main()
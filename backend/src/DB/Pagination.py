@@ -0,0 +1,84 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from fastapi import Response
+from peewee import Expression, Field, ModelSelect
+
+from typing import Any
+
+from src.Error.Resource.InvalidCursorError import InvalidCursor
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def set_next_cursor(response: Response, cursor: str | None) -> None:
+    """ Devolve o cursor da próxima página no header, sem o header a listagem terminou """
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+
+class Keyset:
+    """
+    Ordem estável de uma listagem: as colunas de ordenação terminando na chave primária, todas no
+    mesmo sentido. O cursor é a chave da última linha de uma página codificada em base64, a página
+    seguinte começa logo depois dela (`WHERE chave < cursor`) e não depende de OFFSET.
+    """
+
+    def __init__(self, fields: list[Field], descending: bool = False) -> None:
+        self.fields = fields
+        self.descending = descending
+
+    def order_by(self) -> list:
+        return [field.desc() if self.descending else field.asc() for field in self.fields]
+
+    def after(self, values: list) -> Expression:
+        """
+        Linhas depois de `values` na ordem da listagem. A primeira coluna também vira um intervalo
+        simples (`criado_em <= ?`), que o banco resolve pelo índice antes de desempatar pelas demais.
+        """
+        (first, *rest) = list(zip(self.fields, values))
+        (field, value) = first
+
+        if not rest:
+            return field < value if self.descending else field > value
+
+        tail = Keyset([field for (field, _) in rest], self.descending).after([value for (_, value) in rest])
+        strictly = field < value if self.descending else field > value
+        bounded = field <= value if self.descending else field >= value
+
+        return bounded & (strictly | ((field == value) & tail))
+
+    def paginate(self, query: ModelSelect, cursor: str | None, pageSize: int) -> ModelSelect:
+        if cursor:
+            query = query.where(self.after(self.decode(cursor)))
+
+        return query.order_by(*self.order_by()).limit(pageSize)
+
+    def cursor(self, row: Any) -> str:
+        # `__data__` tem o valor cru (o ID de uma ForeignKeyField), sem carregar o modelo relacionado
+        values = [row.__data__.get(field.name) for field in self.fields]
+        values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+
+        return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode().rstrip("=")
+
+    def next_cursor(self, rows: list, pageSize: int) -> str | None:
+        """ Cursor da próxima página, None quando a página veio incompleta (não há mais linhas) """
+        if not rows or len(rows) < pageSize:
+            return None
+
+        return self.cursor(rows[-1])
+
+    def decode(self, cursor: str) -> list:
+        try:
+            padding = "=" * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        except (binascii.Error, ValueError):
+            raise InvalidCursor()
+
+        if not isinstance(values, list) or len(values) != len(self.fields):
+            raise InvalidCursor()
+
+        try:
+            return [field.python_value(value) for (field, value) in zip(self.fields, values)]
+        except (TypeError, ValueError):
+            raise InvalidCursor()
@@ -0,0 +1,124 @@
+import hashlib
+import re
+from threading import Lock
+
+from peewee import BaseQuery, Context, Database
+
+from typing import Any, Callable
+
+from src.DB import db
+from src.DB.Connection import MonitoredPooledPostgresqlDatabase
+from src.Utils.env import get_env_var
+
+# false: não usa PREPARE/EXECUTE no Postgres (necessário atrás de um pgbouncer em modo transaction)
+SERVER_SIDE_PREPARE = (get_env_var("DB_PREPARED_STATEMENTS", "true") or "true").lower() == "true"
+
+PSYCOPG_PLACEHOLDER = re.compile(r"%s")
+
+class Parameter:
+    """ Marca a posição de um parâmetro no SQL compilado e o conversor (`db_value`) do campo comparado """
+
+    __slots__ = ("index", "converter")
+
+    def __init__(self, index: int, converter: Callable[[Any], Any] | None = None) -> None:
+        self.index = index
+        self.converter = converter
+
+    def bind(self, values: tuple) -> Any:
+        value = values[self.index]
+        return self.converter(value) if self.converter else value
+
+class ParameterContext(Context):
+    """ Contexto de SQL que mantém os marcadores na lista de parâmetros, guardando o conversor que seria aplicado """
+
+    __slots__ = ()
+
+    def value(self, value, converter=None, add_param=True):
+        if not isinstance(value, Parameter):
+            return super().value(value, converter, add_param)
+
+        if converter is None:
+            converter = self.state.converter
+
+        return super().value(Parameter(value.index, converter or None), False, add_param)
+
+class CompiledQuery:
+    """ SQL de uma consulta para um dialeto e as posições dos parâmetros na lista de valores """
+
+    __slots__ = ("query", "sql", "params", "name", "preparedSql")
+
+    def __init__(self, query: BaseQuery, database: Database) -> None:
+        (sql, params) = ParameterContext(**database.get_context_options()).sql(query).query()
+
+        self.query = query
+        self.sql = sql
+        self.params = params
+        self.name = "q_" + hashlib.sha1(sql.encode()).hexdigest()[:16]
+
+        counter = iter(range(1, len(params) + 1))
+        self.preparedSql = PSYCOPG_PLACEHOLDER.sub(lambda _: f"${next(counter)}", sql)
+
+    def bind(self, values: tuple) -> list:
+        return [param.bind(values) if isinstance(param, Parameter) else param for param in self.params]
+
+class PreparedQuery:
+    """
+    Consulta montada e compilada uma única vez por tipo de banco, cada chamada só troca os valores dos parâmetros.
+    `build` recebe um marcador por parâmetro no lugar dos valores e devolve a consulta do peewee, ex.:
+        PreparedQuery(lambda id: User.select().where(User.id == id).limit(1))
+    Os valores passados a `execute`/`first` passam pelo `db_value` do campo comparado, como no peewee.
+    No Postgres a consulta vira um prepared statement no servidor (PREPARE uma vez por conexão).
+    """
+
+    def __init__(self, build: Callable[..., BaseQuery]) -> None:
+        self.build = build
+        self.parameters = build.__code__.co_argcount
+
+        # O SQL só depende do dialeto, bancos da mesma classe compartilham a compilação
+        self.__compiled__: dict[type[Database], CompiledQuery] = {}
+        self.__lock__ = Lock()
+
+    def compiled(self, database: Database) -> CompiledQuery:
+        key = type(database)
+        compiled = self.__compiled__.get(key)
+
+        if compiled is None:
+            with self.__lock__:
+                compiled = self.__compiled__.get(key)
+
+                if compiled is None:
+                    query = self.build(*[Parameter(i) for i in range(self.parameters)])
+                    compiled = CompiledQuery(query, database)
+                    self.__compiled__[key] = compiled
+
+        return compiled
+
+    def execute(self, *values: Any):
+        """ Executa no banco atual (principal ou réplica) e retorna o cursor do peewee com as linhas já convertidas """
+        database = db.current()
+        compiled = self.compiled(database)
+        params = compiled.bind(values)
+
+        if SERVER_SIDE_PREPARE and isinstance(database, MonitoredPooledPostgresqlDatabase):
+            cursor = execute_prepared(database, compiled, params)
+        else:
+            cursor = database.execute_sql(compiled.sql, params)
+
+        return compiled.query._get_cursor_wrapper(cursor)
+
+    def first(self, *values: Any) -> Any | None:
+        rows = self.execute(*values)
+        return rows[0] if rows else None
+
+def execute_prepared(database: MonitoredPooledPostgresqlDatabase, compiled: CompiledQuery, params: list):
+    """ EXECUTE do prepared statement, criado com PREPARE na primeira vez que a conexão atual o usa """
+    prepared = database.prepared_statements(database.connection())
+
+    if compiled.name not in prepared:
+        database.execute_sql(f"PREPARE {compiled.name} AS {compiled.preparedSql}")
+        prepared.add(compiled.name)
+
+    if not params:
+        return database.execute_sql(f"EXECUTE {compiled.name}")
+
+    return database.execute_sql(f"EXECUTE {compiled.name}({', '.join(['%s'] * len(params))})", params)
@@ -0,0 +1,121 @@
+import re
+from collections import Counter
+from contextvars import ContextVar, Token
+from threading import Lock
+from time import perf_counter
+
+from peewee import Database
+
+from src.Utils.env import get_env_var
+
+from src.Logging import Logging, Level
+
+# Em DEV as respostas levam X-DB-Queries e X-DB-Time-Ms
+QUERY_COUNT_HEADERS = get_env_var("environment", "DEV") == "DEV"
+# Repetições da mesma consulta em uma requisição a partir das quais é registrado um aviso de N+1
+N_PLUS_ONE_THRESHOLD = int(get_env_var("DB_N_PLUS_ONE_THRESHOLD", "5") or "5")
+
+QUERY_COUNT_HEADER = "X-DB-Queries"
+QUERY_TIME_HEADER = "X-DB-Time-Ms"
+
+# Listas de parâmetros de tamanhos diferentes (`IN (?, ?, ?)`) são a mesma consulta
+PLACEHOLDER_LIST = re.compile(r"\((\?|%s)(\s*,\s*(\?|%s))*\)")
+
+def statement_shape(sql: str) -> str:
+    return PLACEHOLDER_LIST.sub(r"(\1, ...)", sql)
+
+class QueryStats:
+    """ Consultas de uma requisição, compartilhado com as threads do banco pelo contexto copiado """
+
+    __slots__ = ("count", "elapsed", "shapes", "warned", "path", "lock")
+
+    def __init__(self, path: str = "") -> None:
+        self.count = 0
+        self.elapsed = 0.0
+        self.shapes: Counter[str] = Counter()
+        self.warned: set[str] = set()
+        self.path = path
+        self.lock = Lock()
+
+    @property
+    def elapsed_ms(self) -> float:
+        return round(self.elapsed * 1000, 3)
+
+    def record(self, sql: str, elapsed: float) -> None:
+        shape = statement_shape(sql)
+
+        with self.lock:
+            self.count += 1
+            self.elapsed += elapsed
+            self.shapes[shape] += 1
+
+            repeated = self.shapes[shape] > N_PLUS_ONE_THRESHOLD and shape not in self.warned
+            if repeated:
+                self.warned.add(shape)
+
+        if repeated:
+            Logging.log(f"Possível N+1 em {self.path or 'requisição'}: consulta repetida mais de {N_PLUS_ONE_THRESHOLD} vezes: {shape}", Level.WARN)
+
+QUERY_STATS: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+def begin_query_count(path: str = "") -> tuple[QueryStats, Token]:
+    stats = QueryStats(path)
+    return (stats, QUERY_STATS.set(stats))
+
+def end_query_count(token: Token) -> None:
+    QUERY_STATS.reset(token)
+
+def current_query_stats() -> QueryStats | None:
+    return QUERY_STATS.get()
+
+def use_query_counter(database: Database) -> Database:
+    """ Faz o banco contar as consultas e o tempo gasto nelas na requisição atual """
+    execute_sql = database.execute_sql
+
+    def counted_execute_sql(sql, params=None, *args, **kwargs):
+        stats = QUERY_STATS.get()
+
+        if stats is None:
+            return execute_sql(sql, params, *args, **kwargs)
+
+        start = perf_counter()
+
+        try:
+            return execute_sql(sql, params, *args, **kwargs)
+        finally:
+            stats.record(sql, perf_counter() - start)
+
+    database.execute_sql = counted_execute_sql
+    return database
+
+class QueryCounterMiddleware:
+    """
+    Conta as consultas ao banco de cada requisição HTTP, avisa no log quando a mesma consulta
+    se repete (N+1) e, em DEV, devolve a contagem e o tempo nos headers da resposta.
+    """
+
+    def __init__(self, app, headers: bool = QUERY_COUNT_HEADERS) -> None:
+        self.app = app
+        self.headers = headers
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        (stats, token) = begin_query_count(f"{scope['method']} {scope['path']}")
+
+        async def send_with_counts(message) -> None:
+            if self.headers and message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (QUERY_COUNT_HEADER.lower().encode(), str(stats.count).encode()),
+                    (QUERY_TIME_HEADER.lower().encode(), str(stats.elapsed_ms).encode())
+                ]
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_counts)
+        finally:
+            end_query_count(token)
@@ -0,0 +1,36 @@
+from peewee import Expression, Model
+
+from typing import TypeVar
+
+from src.DB import db
+
+M = TypeVar("M", bound=Model)
+
+def supports_returning() -> bool:
+    """ O banco principal aceita `RETURNING` (Postgres e SQLite 3.35+ com `returning_clause`) """
+    return bool(getattr(db.obj, "returning_clause", False))
+
+def insert_returning(instance: M) -> M:
+    """ Insere a linha e devolve como ficou no banco em um único comando (`INSERT ... RETURNING`) """
+    model = type(instance)
+
+    if not supports_returning():
+        instance.save(force_insert=True)
+        return model.select().where(model._meta.primary_key == instance._pk).first()
+
+    return model.insert(instance.__data__).returning(model).execute()[0]
+
+def update_returning(model: type[M], values: dict, where: Expression, key: Expression | None = None) -> M | None:
+    """ Atualiza as linhas de `where` e devolve a primeira já atualizada (`UPDATE ... RETURNING`),
+    None quando nenhuma linha foi atualizada. Sem RETURNING a linha é lida de volta por `key`,
+    necessário quando `where` compara campos que a própria atualização muda """
+    query = model.update(values).where(where)
+
+    if not supports_returning():
+        if query.execute() == 0:
+            return None
+
+        return model.select().where(where if key is None else key).first()
+
+    rows = query.returning(model).execute()
+    return rows[0] if rows else None
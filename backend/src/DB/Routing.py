@@ -0,0 +1,170 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from itertools import count
+from threading import Lock
+
+from peewee import BaseQuery, Database, Proxy, Insert, Update, Delete
+
+from typing import Callable, Hashable, Iterator, TypeVar
+
+from src.Utils.cache import ExpiringDict
+from src.Utils.env import get_env_var
+
+T = TypeVar("T")
+
+READ_ONLY: ContextVar[bool] = ContextVar("read_only", default=False)
+
+# Depois de escrever, o mesmo usuário (ou IP, sem login) lê do principal por este tempo,
+# assim não vê dados antigos enquanto as réplicas ainda não receberam a escrita
+READ_YOUR_WRITES_SECONDS = float(get_env_var("DB_READ_YOUR_WRITES_SECONDS", "5") or "5")
+
+RECENT_WRITERS = ExpiringDict()
+
+class RoutingState:
+    """ Réplica escolhida e quem está fazendo a requisição atual, veja `begin_routing` """
+
+    __slots__ = ("replica", "writers", "wrote")
+
+    def __init__(self, replica: Database | None, writer: Hashable | None = None) -> None:
+        self.replica = replica
+        self.writers: list[Hashable] = [writer] if writer is not None else []
+        self.wrote = False
+
+ROUTING: ContextVar[RoutingState | None] = ContextVar("db_routing", default=None)
+
+class ReplicaSet:
+    """ Réplicas de leitura, cada requisição usa uma delas em rodízio """
+
+    def __init__(self) -> None:
+        self.databases: list[Database] = []
+        self.__next__ = count()
+        self.__lock__ = Lock()
+
+    def initialize(self, databases: list[Database] | None) -> None:
+        self.databases = [database for database in databases or [] if database is not None]
+
+    def choose(self) -> Database | None:
+        if not self.databases:
+            return None
+
+        with self.__lock__:
+            index = next(self.__next__)
+
+        return self.databases[index % len(self.databases)]
+
+class RoutingProxy(Proxy):
+    """
+    Proxy do banco principal que envia as consultas para uma réplica quando o contexto
+    atual é somente leitura (veja `read_replica` e `read_only`). Continua no principal
+    dentro de transações e logo depois de uma escrita do mesmo usuário (read-your-writes).
+    Sem réplicas configuradas tudo vai para o principal.
+    """
+
+    __slots__ = ("obj", "_callbacks", "replicas")
+
+    def __init__(self, replicas: ReplicaSet) -> None:
+        self.replicas = replicas
+        super().__init__()
+
+    def current(self) -> Database | None:
+        """ Banco que recebe as consultas no contexto atual """
+        if READ_ONLY.get() and self.replicas.databases and not self.prefers_primary():
+            state = ROUTING.get()
+
+            if state is not None and state.replica is not None:
+                return state.replica
+
+            return self.replicas.databases[0]
+
+        return self.obj
+
+    def prefers_primary(self) -> bool:
+        """ Leituras ficam no principal com uma transação aberta ou dentro da janela read-your-writes """
+        if self.obj is not None and self.obj.in_transaction():
+            return True
+
+        state = ROUTING.get()
+
+        if state is None:
+            return False
+
+        return state.wrote or any(writer in RECENT_WRITERS for writer in state.writers)
+
+    def databases(self) -> list[Database]:
+        """ Todos bancos configurados, o principal primeiro """
+        databases = [self.obj] if self.obj is not None else []
+
+        for replica in self.replicas.databases:
+            if replica not in databases:
+                databases.append(replica)
+
+        return databases
+
+    def execute(self, query, **kwargs):
+        if isinstance(query, (Insert, Update, Delete)):
+            mark_write()
+
+        return self.current().execute(query, **kwargs)
+
+    def __getattr__(self, attr: str):
+        database = self.current()
+
+        if database is None:
+            raise AttributeError("Cannot use uninitialized Proxy.")
+
+        return getattr(database, attr)
+
+def begin_routing(replica: Database | None, writer: Hashable | None = None):
+    """ Começa o roteamento de uma requisição, `writer` identifica quem escreve (IP do cliente) """
+    return ROUTING.set(RoutingState(replica, writer))
+
+def end_routing(token) -> None:
+    ROUTING.reset(token)
+
+def bind_writer(writer: Hashable) -> None:
+    """ Associa a requisição atual a um usuário para a janela read-your-writes """
+    state = ROUTING.get()
+
+    if state is None or writer in state.writers:
+        return
+
+    state.writers.append(writer)
+
+def mark_write() -> None:
+    """ Registra uma escrita da requisição atual: as próximas leituras dela e de quem a fez vão para o principal """
+    state = ROUTING.get()
+
+    if state is None:
+        return
+
+    state.wrote = True
+
+    for writer in state.writers:
+        RECENT_WRITERS.set(writer, True, READ_YOUR_WRITES_SECONDS)
+
+@contextmanager
+def read_only(enabled: bool = True) -> Iterator[None]:
+    """ Envia as consultas do bloco para uma réplica de leitura """
+    token = READ_ONLY.set(enabled)
+
+    try:
+        yield
+    finally:
+        READ_ONLY.reset(token)
+
+def read_replica(fn: Callable[..., T]) -> Callable[..., T]:
+    """ Roteia uma função de leitura do `Repository` para as réplicas, consultas
+    preguiçosas são executadas ainda dentro da função para não irem para o principal """
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs) -> T:
+        with read_only():
+            result = fn(*args, **kwargs)
+
+            if isinstance(result, BaseQuery):
+                return list(result)
+
+            return result
+
+    return wrapper
@@ -0,0 +1,237 @@
+import asyncio
+import json
+import re
+import sys
+from collections import deque
+from datetime import datetime, timezone
+from threading import Lock
+from time import perf_counter
+
+from peewee import Database, PostgresqlDatabase
+
+from typing import Any
+
+from src.DB.QueryCounter import statement_shape
+from src.Utils.env import get_env_var
+
+from src.Logging import Logging, Level
+
+SLOW_QUERY_MS = float(get_env_var("DB_SLOW_QUERY_MS", "200") or "200")
+SLOW_QUERY_BUFFER = int(get_env_var("DB_SLOW_QUERY_BUFFER", "200") or "200")
+SLOW_QUERY_FILE = get_env_var("DB_SLOW_QUERY_FILE", "slow_queries.jsonl") or "slow_queries.jsonl"
+SLOW_QUERY_FLUSH_INTERVAL = float(get_env_var("DB_SLOW_QUERY_FLUSH_INTERVAL", "60") or "60")
+
+# Únicas colunas cujos valores vão para o log, os das demais são mascarados (senha, cpf, e-mail, endereços...)
+LOGGABLE_COLUMNS = {
+    "id", "usuario", "id_paciente", "id_motorista", "id_ambulancia", "status", "tipo", "placa", "cargo",
+    "realizado", "estado_paciente", "cancelada", "em_viagem", "refresh", "usado", "fator_cargo",
+    "inicio", "fim", "criado_em", "valido_ate", "revogado_em", "tentativas", "proxima_tentativa", "enviado_em",
+    "equipamento", "descricao", "versao"
+}
+
+# Tabelas em que nenhum parâmetro vai para o log: o id da restauração é o próprio código enviado por e-mail,
+# o do token de cargo dá acesso ao cargo e as variáveis do e-mail têm o código e o link de restauração
+SECRET_TABLES = {"restaurar_senha", "email_saida", "atualizar_token"}
+
+MASK = "***"
+SAVEPOINT = '"slow_query_explain"'
+
+# Somente comandos de dados têm plano (EXECUTE é um prepared statement do Postgres)
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "EXECUTE")
+
+IDENTIFIER = re.compile(r'"(\w+)"')
+PLACEHOLDER = re.compile(r"\?|%s")
+INSERT_COLUMNS = re.compile(r'^\s*INSERT\s+INTO\s+\S+\s*\(([^)]*)\)', re.IGNORECASE)
+TABLES = re.compile(r'\b(?:FROM|JOIN|INTO|UPDATE)\s+"(\w+)"', re.IGNORECASE)
+
+def normalize_sql(sql: str) -> str:
+    return " ".join(statement_shape(sql).split())
+
+def parameter_columns(sql: str, count: int) -> list[str | None]:
+    """
+    Coluna de cada parâmetro: em um INSERT a ordem da lista de colunas (repetida por linha),
+    nos demais comandos o último identificador antes do parâmetro (`"cpf" = ?`, `"cpf" IN (?, ?)`).
+    """
+    insert = INSERT_COLUMNS.match(sql)
+
+    if insert:
+        columns = IDENTIFIER.findall(insert.group(1))
+        return [columns[i % len(columns)] if columns else None for i in range(count)]
+
+    columns: list[str | None] = []
+    position = 0
+
+    for placeholder in PLACEHOLDER.finditer(sql):
+        between = sql[position:placeholder.start()]
+        identifiers = IDENTIFIER.findall(between)
+
+        if identifiers:
+            columns.append(identifiers[-1])
+        elif columns and between.strip() == ",":
+            # Próximo item de uma lista `IN (?, ?)`
+            columns.append(columns[-1])
+        else:
+            columns.append(None)
+
+        position = placeholder.end()
+
+    return (columns + [None] * count)[:count]
+
+def loggable(column: str | None, value: Any) -> bool:
+    # Sem coluna conhecida (LIMIT, OFFSET, EXECUTE de um prepared statement) só números vão para o log
+    if column is None:
+        return isinstance(value, (int, float, bool, type(None)))
+
+    return column in LOGGABLE_COLUMNS
+
+def mask_parameters(sql: str, params: Any) -> list:
+    """ Parâmetros como vão para o log: mascarados, a não ser os de `LOGGABLE_COLUMNS` fora de `SECRET_TABLES` """
+    params = list(params or ())
+
+    if SECRET_TABLES.intersection(TABLES.findall(sql)):
+        return [MASK] * len(params)
+
+    columns = parameter_columns(sql, len(params))
+
+    return [(value if isinstance(value, (int, float, bool, type(None))) else str(value)) if loggable(column, value) else MASK
+            for (column, value) in zip(columns, params)]
+
+def calling_function() -> str:
+    """ Primeira função de um `Repository` na pilha, ou a primeira fora de `src.DB` """
+    frame = sys._getframe(2)
+    fallback = None
+
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+
+        if module.startswith("src.Repository.") and module != "src.Repository.AsyncRepository":
+            return f"{module.removeprefix('src.Repository.')}.{frame.f_code.co_name}"
+
+        if fallback is None and module.startswith("src.") and not module.startswith("src.DB"):
+            fallback = f"{module.removeprefix('src.')}.{frame.f_code.co_name}"
+
+        frame = frame.f_back
+
+    return fallback or "desconhecida"
+
+class SlowQueryLog:
+    """
+    Guarda em um buffer circular as consultas mais lentas que `thresholdMs`, com o SQL normalizado,
+    os parâmetros mascarados, a função do repositório que chamou e o plano (`EXPLAIN`) da primeira
+    ocorrência de cada formato de consulta. As entradas novas são gravadas periodicamente em `path`.
+    """
+
+    def __init__(self, thresholdMs: float = 200, size: int = 200, path: str = "slow_queries.jsonl") -> None:
+        self.thresholdMs = thresholdMs
+        self.path = path
+
+        self.entries: deque[dict] = deque(maxlen=max(1, size))
+        self.unflushed: deque[dict] = deque(maxlen=max(1, size))
+        self.plans: dict[str, list[str] | str] = {}
+
+        self.__lock__ = Lock()
+
+    def record(self, database: Database, execute_sql, sql: str, params: Any, elapsedMs: float) -> None:
+        shape = normalize_sql(sql)
+
+        with self.__lock__:
+            explain = shape not in self.plans
+            if explain:
+                self.plans[shape] = []
+
+        if explain:
+            self.plans[shape] = self.__explain__(database, execute_sql, sql, params)
+
+        entry = {
+            "sql": shape,
+            "parametros": mask_parameters(sql, params),
+            "tempo_ms": round(elapsedMs, 3),
+            "origem": calling_function(),
+            "plano": self.plans[shape],
+            "quando": datetime.now(timezone.utc).isoformat()
+        }
+
+        with self.__lock__:
+            self.entries.append(entry)
+            self.unflushed.append(entry)
+
+        Logging.log(f"Consulta lenta ({entry['tempo_ms']}ms) em {entry['origem']}: {shape}", Level.WARN)
+
+    def __explain__(self, database: Database, execute_sql, sql: str, params: Any) -> list[str] | str:
+        if not sql.lstrip().upper().startswith(EXPLAINABLE):
+            return []
+
+        explain = "EXPLAIN" if isinstance(database, PostgresqlDatabase) else "EXPLAIN QUERY PLAN"
+
+        # Dentro da transação de quem chamou o EXPLAIN roda em um savepoint: no Postgres um
+        # comando com erro aborta a transação inteira, o savepoint desfaz só o EXPLAIN
+        savepoint = database.in_transaction()
+
+        try:
+            if savepoint:
+                execute_sql(f"SAVEPOINT {SAVEPOINT}")
+
+            try:
+                rows = execute_sql(f"{explain} {sql}", params).fetchall()
+            except Exception:
+                if savepoint:
+                    execute_sql(f"ROLLBACK TO SAVEPOINT {SAVEPOINT}")
+                raise
+            finally:
+                if savepoint:
+                    execute_sql(f"RELEASE SAVEPOINT {SAVEPOINT}")
+        except Exception as e:
+            return f"Falha no EXPLAIN: {e}"
+
+        return [str(row[-1]) for row in rows]
+
+    def recent(self) -> list[dict]:
+        """ Consultas lentas mais recentes primeiro """
+        with self.__lock__:
+            return list(reversed(self.entries))
+
+    def flush(self) -> int:
+        """ Acrescenta ao arquivo as entradas ainda não gravadas e retorna quantas foram """
+        with self.__lock__:
+            pending = list(self.unflushed)
+            self.unflushed.clear()
+
+        if not pending:
+            return 0
+
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.writelines(json.dumps(entry, ensure_ascii=False) + "\n" for entry in pending)
+
+        return len(pending)
+
+    async def flush_forever(self, interval: float) -> None:
+        """ Executa `flush` a cada `interval` segundos em uma thread separada """
+        while True:
+            await asyncio.sleep(interval)
+
+            try:
+                await asyncio.to_thread(self.flush)
+            except OSError as e:
+                Logging.log(f"Falha ao gravar consultas lentas em {self.path}: {e}", Level.ERROR)
+
+SLOW_QUERY_LOG = SlowQueryLog(SLOW_QUERY_MS, SLOW_QUERY_BUFFER, SLOW_QUERY_FILE)
+
+def use_slow_query_log(database: Database, log: SlowQueryLog = SLOW_QUERY_LOG) -> Database:
+    """ Faz o banco registrar em `log` as consultas mais lentas que o limite """
+    execute_sql = database.execute_sql
+
+    def logged_execute_sql(sql, params=None, *args, **kwargs):
+        start = perf_counter()
+        cursor = execute_sql(sql, params, *args, **kwargs)
+        elapsedMs = (perf_counter() - start) * 1000
+
+        if elapsedMs >= log.thresholdMs:
+            try:
+                log.record(database, execute_sql, sql, params, elapsedMs)
+            except Exception as e:
+                Logging.log(f"Falha ao registrar consulta lenta: {e}", Level.ERROR)
+
+        return cursor
+
+    database.execute_sql = logged_execute_sql
+    return database
@@ -0,0 +1,106 @@
+import asyncio
+from datetime import timedelta
+from time import perf_counter
+
+from peewee import Expression, Model
+
+from typing import Callable
+
+from src.DB import db
+from src.Model import UserSession, RestorePassword, UpgradeToken, EmailOutbox
+from src.Utils.env import get_env_var
+
+from src.Logging import Logging, Level
+
+SWEEP_INTERVAL = float(get_env_var("SWEEP_INTERVAL", "120") or "120")
+SWEEP_BATCH_SIZE = int(get_env_var("SWEEP_BATCH_SIZE", "500") or "500")
+UPGRADE_TOKEN_RETENTION = timedelta(days=int(get_env_var("UPGRADE_TOKEN_RETENTION_DAYS", "30") or "30"))
+EMAIL_RETENTION = timedelta(days=int(get_env_var("EMAIL_RETENTION_DAYS", "7") or "7"))
+
+class SweepTarget:
+    """
+    Um modelo com uma coluna de expiração.
+    `condition` é chamada a cada lote para que o "agora" da condição seja atual.
+    """
+
+    def __init__(self, name: str, model: type[Model], condition: Callable[[], Expression]) -> None:
+        self.name = name
+        self.model = model
+        self.condition = condition
+
+class Sweeper:
+    """
+    Remove periodicamente as linhas expiradas dos modelos registrados.
+    Cada lote seleciona no máximo `batchSize` chaves primárias e as deleta em uma
+    transação curta, assim o banco nunca fica com um lock de escrita longo.
+    """
+
+    def __init__(self, targets: list[SweepTarget], batchSize: int = 500, interval: float = 120) -> None:
+        self.targets = targets
+        self.batchSize = max(1, batchSize)
+        self.interval = interval
+
+        self.lastReport: dict[str, dict[str, float]] = {}
+
+    def sweep_target(self, target: SweepTarget) -> int:
+        """ Deleta em lotes todas linhas expiradas de um modelo e retorna quantas foram removidas """
+        primaryKey = target.model._meta.primary_key
+        total = 0
+
+        while True:
+            with db.atomic():
+                ids = [row[0] for row in target.model.select(primaryKey).where(target.condition()).limit(self.batchSize).tuples()]
+
+                if not ids:
+                    break
+
+                deleted = target.model.delete().where(primaryKey.in_(ids)).execute()
+                total += deleted
+
+            # Um lote que não deleta nada voltaria a selecionar as mesmas chaves para sempre
+            if not deleted or len(ids) < self.batchSize:
+                break
+
+        return total
+
+    def sweep(self) -> dict[str, dict[str, float]]:
+        """ Varre todos modelos registrados, registra no log e retorna linhas e tempo por modelo """
+        report: dict[str, dict[str, float]] = {}
+
+        for target in self.targets:
+            start = perf_counter()
+
+            try:
+                rows = self.sweep_target(target)
+            except Exception as e:
+                Logging.log(f"Falha ao varrer {target.name}: {e}", Level.ERROR)
+                continue
+
+            elapsed = (perf_counter() - start) * 1000
+            report[target.name] = {"linhas": rows, "tempo_ms": round(elapsed, 3)}
+
+            Logging.log(f"Sweep {target.name}: {rows} linhas removidas em {elapsed:.1f}ms", Level.INFO)
+
+        self.lastReport = report
+        return report
+
+    def __sweep_with_connection__(self) -> dict[str, dict[str, float]]:
+        with db.connection_context():
+            return self.sweep()
+
+    async def run_forever(self) -> None:
+        """ Executa `sweep` a cada `interval` segundos em uma thread separada """
+        while True:
+            await asyncio.sleep(self.interval)
+            await asyncio.to_thread(self.__sweep_with_connection__)
+
+SWEEPER = Sweeper(
+    [
+        SweepTarget("sessao", UserSession.Session, UserSession.Session.expired),
+        SweepTarget("restaurar_senha", RestorePassword.RestorePassword, RestorePassword.RestorePassword.expired),
+        SweepTarget("atualizar_token", UpgradeToken.UpgradeToken, lambda: UpgradeToken.UpgradeToken.used_before(UPGRADE_TOKEN_RETENTION)),
+        SweepTarget("email_saida", EmailOutbox.EmailOutbox, lambda: EmailOutbox.EmailOutbox.finished_before(EMAIL_RETENTION))
+    ],
+    batchSize=SWEEP_BATCH_SIZE,
+    interval=SWEEP_INTERVAL
+)
@@ -1,12 +1,17 @@
 from peewee import Proxy
 import sys
+from src.DB.Routing import RoutingProxy, ReplicaSet
+from src.DB.QueryCounter import use_query_counter
+from src.DB.SlowQueryLog import use_slow_query_log
 from src.DB import postgres, sqlite
 from src.Utils.env import get_env_var
 from src.Utils.singleton import singleton
 
 from src.Logging import Logging, Level
 
-db = Proxy()
+# Réplicas de leitura (pool somente leitura do SQLite, réplicas do Postgres), sem réplicas tudo vai para o `db`
+db_replicas = ReplicaSet()
+db = RoutingProxy(db_replicas)
 
 class connection(metaclass=singleton):
     def __init__(self):
@@ -18,22 +23,38 @@ class connection(metaclass=singleton):
         self.port =        get_env_var("Database_Port")
         self.user =        get_env_var("Database_User")
 
+        # postgres | sqlite, por padrão PROD usa postgres e DEV usa sqlite
+        self.engine =      get_env_var("Database_Engine", "postgres" if self.environment == "PROD" else "sqlite")
+
+        # Réplicas de leitura separadas por vírgula: "ip:porta" no postgres e caminhos de arquivo no sqlite
+        self.replicas =    [replica.strip() for replica in (get_env_var("Database_Replicas", "") or "").split(",") if replica.strip()]
+
+        # default | tuned
+        self.sqliteMode =             get_env_var("SQLITE_MODE", "default")
+        self.sqlitePath =             get_env_var("SQLITE_PATH", "database.db") or "database.db"
+        self.sqliteBusyTimeout =      int(get_env_var("SQLITE_BUSY_TIMEOUT", "5000") or "5000")
+        self.sqliteCacheSizeKb =      int(get_env_var("SQLITE_CACHE_SIZE_KB", "65536") or "65536")
+        self.sqliteMmapSize =         int(get_env_var("SQLITE_MMAP_SIZE", "268435456") or "268435456")
+        self.sqliteReadConnections =  int(get_env_var("SQLITE_READ_CONNECTIONS", "8") or "8")
+        self.sqliteWriteConnections = int(get_env_var("SQLITE_WRITE_CONNECTIONS", "4") or "4")
+
 is_pytest = any(arg.startswith('pytest') for arg in sys.argv)
 
 selected_db = None
 
 if not is_pytest:
     databases = {
-        "PROD": postgres.Database(connection()),
-        "DEV" : sqlite.Database(connection())
+        "postgres": postgres.Database,
+        "sqlite"  : sqlite.Database
     }
-    env = get_env_var("environment", "DEV")
-    if env in databases:
-        selected_db = databases[env].db
+    engine = connection().engine
+    if engine in databases:
+        selected_db = databases[engine](connection())
 
     if selected_db is None:
         raise RuntimeError("Erro a o selecionar banco de dados!")
 
-    db.initialize(selected_db)
+    db.initialize(use_query_counter(use_slow_query_log(selected_db.db)))
+    db_replicas.initialize([use_query_counter(use_slow_query_log(replica)) for replica in selected_db.replicas])
 else:
     Logging.log("***Running in test mode***", Level.DEBUG)
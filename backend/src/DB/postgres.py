@@ -1,4 +1,5 @@
-from peewee import PostgresqlDatabase
+from src.DB.Connection import MonitoredPooledPostgresqlDatabase, use_request_connection_state
+from src.Utils.env import get_env_var
 
 class Database:
     def __init__(self, connection):
@@ -7,5 +8,24 @@ class Database:
         __ip__       =  connection.ip
         __port__     =  connection.port
         __user__     =  connection.user
-    
-        self.db = PostgresqlDatabase(f"postgresql://{__user__}:{__password__}@{__ip__}:{__port__}/{__database__}")
+
+        self.db = self.__pool__(__database__, __user__, __password__, __ip__, __port__)
+
+        # Réplicas de leitura com o mesmo banco e credenciais do principal
+        self.replicas = []
+
+        for replica in connection.replicas:
+            (host, _, port) = replica.partition(":")
+            self.replicas.append(self.__pool__(__database__, __user__, __password__, host, port or __port__))
+
+    def __pool__(self, database, user, password, host, port) -> MonitoredPooledPostgresqlDatabase:
+        return use_request_connection_state(MonitoredPooledPostgresqlDatabase(
+            database,
+            user=user,
+            password=password,
+            host=host,
+            port=port,
+            max_connections=int(get_env_var("DB_MAX_CONNECTIONS", "20") or "20"),
+            stale_timeout=int(get_env_var("DB_STALE_TIMEOUT", "300") or "300"),
+            timeout=int(get_env_var("DB_POOL_TIMEOUT", "10") or "10")
+        ))
@@ -1,5 +1,64 @@
+import sqlite3
+
 from peewee import SqliteDatabase
+from playhouse.pool import PooledSqliteDatabase
+
+from src.DB.Connection import use_request_connection_state
+
+# RETURNING existe a partir do SQLite 3.35, antes disso as escritas voltam a ler a linha com um SELECT
+SQLITE_RETURNING = True if sqlite3.sqlite_version_info >= (3, 35, 0) else None
 
 class Database:
+    """
+    `SQLITE_MODE=default`: uma conexão por requisição com as configurações padrão do SQLite.
+    `SQLITE_MODE=tuned`: WAL, `synchronous=NORMAL`, cache e mmap configuráveis, um pool de
+    conexões de escrita e um pool separado de conexões somente leitura usado como réplica.
+    Os arquivos de `Database_Replicas` são abertos somente leitura como réplicas extras
+    (a cópia dos dados para eles fica fora da aplicação).
+    """
+
     def __init__(self, connection):
-        self.db = SqliteDatabase("database.db")
+        self.read_db = None
+        self.replicas = []
+
+        if connection.sqliteMode != "tuned":
+            self.db = use_request_connection_state(SqliteDatabase(connection.sqlitePath, check_same_thread=False, returning_clause=SQLITE_RETURNING))
+            self.replicas = [self.__replica__(path) for path in getattr(connection, "replicas", [])]
+            return
+
+        pragmas = {
+            "busy_timeout": connection.sqliteBusyTimeout,
+            "cache_size": -connection.sqliteCacheSizeKb,
+            "mmap_size": connection.sqliteMmapSize,
+            "foreign_keys": 1
+        }
+
+        self.db = use_request_connection_state(PooledSqliteDatabase(
+            connection.sqlitePath,
+            pragmas={"journal_mode": "wal", "synchronous": "normal", **pragmas},
+            max_connections=connection.sqliteWriteConnections,
+            stale_timeout=300,
+            timeout=connection.sqliteBusyTimeout / 1000,
+            check_same_thread=False,
+            returning_clause=SQLITE_RETURNING
+        ))
+
+        self.read_db = use_request_connection_state(PooledSqliteDatabase(
+            f"file:{connection.sqlitePath}?mode=ro",
+            pragmas={"query_only": 1, **pragmas},
+            max_connections=connection.sqliteReadConnections,
+            stale_timeout=300,
+            timeout=connection.sqliteBusyTimeout / 1000,
+            check_same_thread=False,
+            uri=True
+        ))
+
+        self.replicas = [self.read_db] + [self.__replica__(path, pragmas) for path in getattr(connection, "replicas", [])]
+
+    def __replica__(self, path: str, pragmas: dict | None = None) -> SqliteDatabase:
+        return use_request_connection_state(SqliteDatabase(
+            f"file:{path}?mode=ro",
+            pragmas={"query_only": 1, **(pragmas or {})},
+            check_same_thread=False,
+            uri=True
+        ))
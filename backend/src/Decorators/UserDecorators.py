@@ -7,13 +7,17 @@ TOKEN_SCHEME = Annotated[str, Depends(OAuth2PasswordBearer(tokenUrl="token", aut
 
 from src.Model.User import User
 from src.Model.UserSession import Session
-from src.Decorators import get_user_auth_user, get_user_auth_session
+from src.Decorators import get_user_auth_user, get_user_auth_full_user, get_user_auth_session
 
 async def token_get_user(request: Request, token: TOKEN_SCHEME) -> User:
     return await get_user_auth_user(request, token)
 
+async def token_get_full_user(request: Request, token: TOKEN_SCHEME) -> User:
+    return await get_user_auth_full_user(request, token)
+
 async def get_user_session(request: Request, token: TOKEN_SCHEME) -> Session:
     return await get_user_auth_session(request, token)
 
 GET_AUTHENTICATED_USER = Annotated[User, Depends(token_get_user)]
+GET_AUTHENTICATED_FULL_USER = Annotated[User, Depends(token_get_full_user)]
 GET_AUTHENTICATED_SESSION = Annotated[Session, Depends(get_user_session)]
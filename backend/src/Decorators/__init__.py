@@ -12,9 +12,16 @@ TOKEN_SCHEME = Annotated[str, Depends(OAuth2PasswordBearer(tokenUrl="token", aut
 from src.Model.User import User
 from src.Model.UserSession import Session
 from src.Service import SessionService
+from src.DB.Routing import bind_writer
 
 async def __get_auth__(request: Request, token: TOKEN_SCHEME | None = None) -> tuple[User, Session]:
-    """ Pega o usuário autenticado """
+    """ Pega o usuário autenticado, o resultado fica salvo em `request.state.auth`
+    para ser reaproveitado pelas outras dependências da mesma requisição """
+
+    requestAuth = getattr(request.state, "auth", None)
+
+    if requestAuth is not None:
+        return requestAuth
 
     userIP = get_remote_address(request)
 
@@ -27,8 +34,7 @@ async def __get_auth__(request: Request, token: TOKEN_SCHEME | None = None) -> t
     if not token:
         raise invalidCredentials()
     
-    currentSession = SessionService.get_current_session_by_token(token)
-    currentUser    = SessionService.get_current_user(token)
+    (currentUser, currentSession) = await SessionService.get_current_auth_by_token(token)
 
     if not currentSession.ip_equals(userIP):
         raise invalidCredentials()
@@ -39,7 +45,10 @@ async def __get_auth__(request: Request, token: TOKEN_SCHEME | None = None) -> t
     if currentUser is None:
         raise invalidCredentials()
     
-    return (currentUser, currentSession)
+    request.state.auth = (currentUser, currentSession)
+    bind_writer(currentUser.str_id)
+
+    return request.state.auth
 
 async def get_user_auth_user(request: Request, token: TOKEN_SCHEME | None = None) -> User:
     """ Pega a sessão atual do usuário autenticado """
@@ -48,6 +57,14 @@ async def get_user_auth_user(request: Request, token: TOKEN_SCHEME | None = None
 
     return user
 
+async def get_user_auth_full_user(request: Request, token: TOKEN_SCHEME | None = None) -> User:
+    """ Pega o usuário autenticado com todos os seus campos, mesmo quando
+    o token é stateless e só carrega o id e o cargo do usuário """
+
+    (user, session) = await __get_auth__(request, token)
+
+    return await SessionService.get_full_user(user)
+
 async def get_user_auth_session(request: Request, token: TOKEN_SCHEME | None = None) -> Session:
     """ Pega a sessão atual do usuário autenticado """
 
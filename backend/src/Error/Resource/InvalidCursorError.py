@@ -0,0 +1,9 @@
+from src.Error.Base.ErrorClass import ErrorClass, status
+
+class InvalidCursor(ErrorClass):
+    def __init__(self) -> None:
+        super().__init__(
+            "invalid_cursor",
+            "O cursor de paginação é inválido, recomece a listagem sem o cursor",
+            status.HTTP_400_BAD_REQUEST
+        )
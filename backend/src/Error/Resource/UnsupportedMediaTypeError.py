@@ -0,0 +1,9 @@
+from src.Error.Base.ErrorClass import ErrorClass, status
+
+class UnsupportedMediaType(ErrorClass):
+    def __init__(self, accepted: list[str]) -> None:
+        super().__init__(
+            "unsupported_media_type",
+            f"Formato não suportado, envie o corpo com Content-Type {' ou '.join(accepted)}",
+            status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+        )
@@ -0,0 +1,5 @@
+from src.Error.Base.ErrorClass import ErrorClass, status
+
+class ServerBusy(ErrorClass):
+    def __init__(self, customMessage: str = "O servidor está ocupado, tente novamente em instantes.", retryAfter: int = 1) -> None:
+        super().__init__("server_busy", customMessage, status.HTTP_503_SERVICE_UNAVAILABLE, {"Retry-After": str(retryAfter)})
@@ -0,0 +1,5 @@
+from src.Error.Base.ErrorClass import ErrorClass, status
+
+class TooManyRequests(ErrorClass):
+    def __init__(self, userMessage: str = "Muitas tentativas, aguarde um pouco antes de tentar novamente.", retryAfter: int = 60) -> None:
+        super().__init__("too_many_requests", userMessage, status.HTTP_429_TOO_MANY_REQUESTS, {"Retry-After": str(retryAfter)})
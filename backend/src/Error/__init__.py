@@ -1,6 +1,10 @@
 from src.Error.Base import ErrorClass, ErrorListClass
 from src.Error.Base import NotFoundError
+from src.Error.User.TooManyRequestsError import TooManyRequests
 from fastapi import responses, Request
+from slowapi.errors import RateLimitExceeded
+from math import ceil
+from time import time
 
 def register_error_handlers(app):
     # @app.exception_handler(ErrorListClass.ErrorListClass)
@@ -26,6 +30,13 @@ def register_error_handlers(app):
             headers=error.headers
         )
 
+    @app.exception_handler(RateLimitExceeded)
+    def rate_limit_handler(request: Request, error: RateLimitExceeded):
+        (item, identifiers) = request.state.view_rate_limit
+        stats = request.app.state.limiter.limiter.get_window_stats(item, *identifiers)
+
+        return base_error_handler(request, TooManyRequests(retryAfter=max(1, ceil(stats.reset_time - time()))))
+
     @app.exception_handler(NotFoundError.NotFoundError)
     def base_not_found_handler(request: Request, error: NotFoundError.NotFoundError):
         return responses.JSONResponse(
@@ -0,0 +1,42 @@
+from peewee import CharField, IntegerField, TextField, Expression
+from src.Model.BaseModel import BaseModel
+from src.Model.Fields import UUIDKeyField, UTCDateTimeField
+
+from datetime import datetime, timedelta, timezone
+
+from src.Validator.GenericValidator import generate_uuid
+
+def now_utc() -> datetime:
+    return datetime.now(timezone.utc)
+
+class EmailOutbox(BaseModel):
+    PENDING = "pendente"
+    SENT    = "enviado"
+    FAILED  = "falhou"
+
+    id                 : str      | UUIDKeyField     = UUIDKeyField(default=generate_uuid, primary_key=True)
+    destinatario       : str      | CharField        = CharField(max_length=254, null=False)
+    assunto            : str      | CharField        = CharField(max_length=200, null=False)
+    template           : str      | CharField        = CharField(max_length=100, null=False)
+    variaveis          : str      | TextField        = TextField(null=False, default="{}")
+    status             : str      | CharField        = CharField(max_length=10, null=False, default=PENDING)
+    tentativas         : int      | IntegerField     = IntegerField(null=False, default=0)
+    proxima_tentativa  : datetime | UTCDateTimeField = UTCDateTimeField(null=False, default=now_utc)
+    ultimo_erro        : str      | TextField        = TextField(null=True)
+    criado_em          : datetime | UTCDateTimeField = UTCDateTimeField(null=False, default=now_utc)
+    enviado_em         : datetime | UTCDateTimeField = UTCDateTimeField(null=True)
+    # Lote do dispatcher que reservou o email, a reserva vale até `proxima_tentativa`
+    reservado_por      : str      | CharField        = CharField(max_length=32, null=True)
+
+    @classmethod
+    def due(cls) -> Expression:
+        """ Condição SQL dos emails pendentes que já podem ser enviados """
+        return (cls.status == cls.PENDING) & (cls.proxima_tentativa <= now_utc())
+
+    @classmethod
+    def finished_before(cls, retention: timedelta) -> Expression:
+        """ Condição SQL dos emails enviados há mais de `retention` """
+        return (cls.status == cls.SENT) & (cls.enviado_em <= now_utc() - retention)
+
+    class Meta:
+        table_name = "email_saida"
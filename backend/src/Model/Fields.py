@@ -0,0 +1,111 @@
+from peewee import CharField, DateTimeField, Model, PostgresqlDatabase
+
+from uuid import UUID
+from datetime import datetime, timezone
+
+from src.Utils.env import get_env_var
+
+UUID_TEXT = "text"
+UUID_NATIVE = "native"
+
+# text: chaves em VARCHAR(32) com o hex | native: `uuid` no Postgres e BLOB de 16 bytes no SQLite
+# Ao mudar para native rode as migrações, a versão 3 converte as linhas existentes
+UUID_STORAGE = (get_env_var("DB_UUID_STORAGE", UUID_TEXT) or UUID_TEXT).lower()
+
+def uses_native_uuid() -> bool:
+    return UUID_STORAGE == UUID_NATIVE
+
+def is_postgres_model(model: type[Model]) -> bool:
+    database = model._meta.database
+    return isinstance(getattr(database, "obj", database), PostgresqlDatabase)
+
+def to_uuid(value) -> UUID | None:
+    """ Converte hex, texto com hífens, UUID ou 16 bytes em UUID, None se não for um UUID """
+    if value is None or isinstance(value, UUID):
+        return value
+
+    try:
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return UUID(bytes=bytes(value))
+
+        return UUID(str(value))
+    except ValueError:
+        return None
+
+class UUIDKeyField(CharField):
+    """
+    Chave primária (e, pelas `ForeignKeyField`, chave estrangeira) com UUID.
+    No Python o valor é sempre o hex de 32 caracteres usado no resto do código, a conversão
+    para o formato do banco acontece só na fronteira (`db_value`/`python_value`).
+    No modo native um valor que não é UUID vira NULL, e por isso não encontra nenhuma linha.
+    Já um valor gravado que não é UUID é devolvido como está, nunca como None.
+    """
+
+    def __init__(self, max_length: int = 32, *args, **kwargs) -> None:
+        super().__init__(max_length, *args, **kwargs)
+
+    @property
+    def field_type(self) -> str:
+        if not uses_native_uuid():
+            return CharField.field_type
+
+        return "UUID" if is_postgres_model(self.model) else "BLOB"
+
+    def get_modifiers(self):
+        return None if uses_native_uuid() else super().get_modifiers()
+
+    def db_value(self, value):
+        if not uses_native_uuid():
+            return super().db_value(value)
+
+        uuid = to_uuid(value)
+
+        if uuid is None:
+            return None
+
+        return uuid.hex if is_postgres_model(self.model) else uuid.bytes
+
+    def python_value(self, value):
+        if not uses_native_uuid():
+            return super().python_value(value)
+
+        uuid = to_uuid(value)
+        return uuid.hex if uuid is not None else value
+
+# Largura fixa, assim a ordem do texto no SQLite é a ordem cronológica
+SQLITE_UTC_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+def to_utc(value: datetime | str | None) -> datetime | None:
+    """ Converte um datetime ou texto ISO em datetime com fuso UTC, valores sem fuso já são UTC """
+    if value is None:
+        return None
+
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+
+    return value.astimezone(timezone.utc)
+
+class UTCDateTimeField(DateTimeField):
+    """
+    Data e hora sempre em UTC: `timestamptz` no Postgres e, no SQLite, texto UTC de largura fixa
+    que compara na ordem cronológica. No Python o valor é um datetime com fuso UTC, e a coluna
+    pode ser filtrada e indexada por intervalo (`valido_ate <= agora`).
+    """
+
+    @property
+    def field_type(self) -> str:
+        return "TIMESTAMPTZ" if is_postgres_model(self.model) else DateTimeField.field_type
+
+    def db_value(self, value):
+        value = to_utc(value)
+
+        if value is None or is_postgres_model(self.model):
+            return value
+
+        return value.strftime(SQLITE_UTC_FORMAT)
+
+    def python_value(self, value):
+        return to_utc(value)
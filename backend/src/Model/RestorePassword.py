@@ -1,6 +1,7 @@
 from src.Model.BaseModel import BaseModel
+from src.Model.Fields import UUIDKeyField, UTCDateTimeField, to_utc
 
-from peewee import CharField, DateTimeField, ForeignKeyField
+from peewee import ForeignKeyField, Expression
 
 from uuid import UUID
 from datetime import datetime, timedelta, timezone
@@ -9,18 +10,31 @@ from src.Validator.GenericValidator import generate_uuid
 
 from src.Model.User import User
 
+def default_expiration() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(minutes=15)
+
 class RestorePassword(BaseModel):
-    id         : UUID     | CharField       = CharField(default=generate_uuid, max_length=36, primary_key=True)
-    usuario    : User     | ForeignKeyField = ForeignKeyField(model=User, backref="restore_password", on_delete="CASCADE")
-    valido_ate : datetime | DateTimeField   = DateTimeField(null=False, default=(datetime.now(timezone.utc) + timedelta(minutes=15)).isoformat())
+    id         : UUID     | UUIDKeyField     = UUIDKeyField(default=generate_uuid, max_length=36, primary_key=True)
+    usuario    : User     | ForeignKeyField  = ForeignKeyField(model=User, backref="restore_password", on_delete="CASCADE")
+    valido_ate : datetime | UTCDateTimeField = UTCDateTimeField(null=False, default=default_expiration)
 
     @property
     def valido_ate_datetime(self) -> datetime:
-        return datetime.fromisoformat(str(self.valido_ate))
+        return to_utc(self.valido_ate)
     
     @property
     def is_expired(self) -> bool:
-        return bool(datetime.now(timezone.utc) >= self.valido_ate_datetime.astimezone(timezone.utc))
+        return bool(datetime.now(timezone.utc) >= self.valido_ate_datetime)
+
+    @classmethod
+    def expired(cls) -> Expression:
+        """ Condição SQL equivalente a `is_expired` """
+        return cls.valido_ate <= datetime.now(timezone.utc)
+
+    @classmethod
+    def valid(cls) -> Expression:
+        """ Condição SQL dos códigos que ainda não expiraram """
+        return cls.valido_ate > datetime.now(timezone.utc)
 
     @property
     def usuario_str_id(self) -> str:
@@ -0,0 +1,13 @@
+from peewee import IntegerField, CharField, DateTimeField, FloatField
+from src.Model.BaseModel import BaseModel
+
+from datetime import datetime, timezone
+
+class SchemaMigration(BaseModel):
+    versao      : int      | IntegerField  = IntegerField(primary_key=True)
+    nome        : str      | CharField     = CharField(max_length=100, null=False)
+    aplicado_em : datetime | DateTimeField = DateTimeField(default=lambda: datetime.now(timezone.utc), null=False)
+    tempo_ms    : float    | FloatField    = FloatField(null=False, default=0)
+
+    class Meta:
+        table_name = "migracao"
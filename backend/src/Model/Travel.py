@@ -1,6 +1,7 @@
 from peewee import ForeignKeyField, CharField, DateTimeField, IntegerField, FloatField, BooleanField
 from src.Model import User, Driver, Ambulance
 from src.Model.BaseModel import BaseModel
+from src.Model.Fields import UUIDKeyField, UTCDateTimeField
 
 from src.Schema.Travel.TravelRealizedEnum import TravelRealized
 from src.Schema.Travel.TravelPatientStateEnum import PatientState
@@ -11,24 +12,24 @@ from datetime import datetime, timezone
 from src.Validator.UserValidator import generate_uuid
 
 class Travel(BaseModel):
-    id              : str            | CharField       = CharField(default=generate_uuid, max_length=32, primary_key=True)
-    realizado       : TravelRealized | IntegerField    = IntegerField(null=False, default=2)
-    inicio          : datetime       | DateTimeField   = DateTimeField(null=False)
-    fim             : datetime       | DateTimeField   = DateTimeField(null=True)
-    id_paciente     : str            | ForeignKeyField = ForeignKeyField(User.User, backref="viagens", null=False)
-    cpf_paciente    : str            | CharField       = CharField(max_length=11, null=False)
-    estado_paciente : PatientState   | IntegerField    = IntegerField(null=False, default=0)
-    observacoes     : str            | CharField       = CharField(max_length=100, null=True)
-    id_motorista    : str            | ForeignKeyField = ForeignKeyField(Driver.Driver, backref="viagens", null=True)
-    id_ambulancia   : str            | ForeignKeyField = ForeignKeyField(Ambulance.Ambulance, backref="viagens", null=True)
-    lat_inicio      : float          | FloatField      = FloatField(null=False)
-    long_inicio     : float          | FloatField      = FloatField(null=False)
-    end_inicio      : str            | CharField       = CharField(max_length=350, null=False)
-    lat_fim         : float          | FloatField      = FloatField(null=False)
-    long_fim        : float          | FloatField      = FloatField(null=False)
-    end_fim         : str            | CharField       = CharField(max_length=350, null=False)
-    cancelada       : bool           | BooleanField    = BooleanField(null=False, default=False)
-    criado_em       : datetime       | DateTimeField   = DateTimeField(default=datetime.now(timezone.utc), null=False)
+    id              : str            | UUIDKeyField     = UUIDKeyField(default=generate_uuid, primary_key=True)
+    realizado       : TravelRealized | IntegerField     = IntegerField(null=False, default=2)
+    inicio          : datetime       | DateTimeField    = DateTimeField(null=False)
+    fim             : datetime       | DateTimeField    = DateTimeField(null=True)
+    id_paciente     : str            | ForeignKeyField  = ForeignKeyField(User.User, backref="viagens", null=False, index=False)
+    cpf_paciente    : str            | CharField        = CharField(max_length=11, null=False)
+    estado_paciente : PatientState   | IntegerField     = IntegerField(null=False, default=0)
+    observacoes     : str            | CharField        = CharField(max_length=100, null=True)
+    id_motorista    : str            | ForeignKeyField  = ForeignKeyField(Driver.Driver, backref="viagens", null=True, index=False)
+    id_ambulancia   : str            | ForeignKeyField  = ForeignKeyField(Ambulance.Ambulance, backref="viagens", null=True)
+    lat_inicio      : float          | FloatField       = FloatField(null=False)
+    long_inicio     : float          | FloatField       = FloatField(null=False)
+    end_inicio      : str            | CharField        = CharField(max_length=350, null=False)
+    lat_fim         : float          | FloatField       = FloatField(null=False)
+    long_fim        : float          | FloatField       = FloatField(null=False)
+    end_fim         : str            | CharField        = CharField(max_length=350, null=False)
+    cancelada       : bool           | BooleanField     = BooleanField(null=False, default=False)
+    criado_em       : datetime       | UTCDateTimeField = UTCDateTimeField(default=lambda: datetime.now(timezone.utc), null=False)
 
     @property
     def in_progress(self) -> bool:
@@ -43,4 +44,5 @@ class Travel(BaseModel):
         return bool(self.realizado == TravelRealized.REALIZADO)
 
     class Meta:
+        # id_paciente e id_motorista são indexados junto com cancelada, criado_em e id (migração 6)
         table_name = "transporte"
\ No newline at end of file
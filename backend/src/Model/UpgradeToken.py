@@ -1,17 +1,23 @@
-from peewee import CharField, DateTimeField, BooleanField, IntegerField
+from peewee import CharField, BooleanField, IntegerField, Expression
 from src.Model.BaseModel import BaseModel
+from src.Model.Fields import UUIDKeyField, UTCDateTimeField
 
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 from src.Validator.GenericValidator import generate_uuid
 
 class UpgradeToken(BaseModel):
-    id          : str      | CharField     = CharField(default=generate_uuid, max_length=32, primary_key=True)
-    fator_cargo : int      | IntegerField  = IntegerField(default=1, null=False)
-    usado       : bool     | BooleanField  = BooleanField(default=False, null=False)
-    usuario     : str      | CharField     = CharField(default=None, null=True)
-    criado_em   : datetime | DateTimeField = DateTimeField(default=datetime.now(timezone.utc), null=False)
-    revogado_em : datetime | DateTimeField = DateTimeField(default=None, null=True)
+    id          : str      | UUIDKeyField     = UUIDKeyField(default=generate_uuid, primary_key=True)
+    fator_cargo : int      | IntegerField     = IntegerField(default=1, null=False)
+    usado       : bool     | BooleanField     = BooleanField(default=False, null=False)
+    usuario     : str      | CharField        = CharField(default=None, null=True)
+    criado_em   : datetime | UTCDateTimeField = UTCDateTimeField(default=lambda: datetime.now(timezone.utc), null=False)
+    revogado_em : datetime | UTCDateTimeField = UTCDateTimeField(default=None, null=True)
+
+    @classmethod
+    def used_before(cls, retention: timedelta) -> Expression:
+        """ Condição SQL dos tokens usados há mais de `retention` """
+        return (cls.usado == True) & (cls.revogado_em <= datetime.now(timezone.utc) - retention)
 
     class Meta:
         table_name = "atualizar_token"
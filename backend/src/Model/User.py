@@ -1,5 +1,6 @@
 from peewee import CharField, DateTimeField, IntegerField
 from src.Model.BaseModel import BaseModel
+from src.Model.Fields import UUIDKeyField
 
 from src.Schema.User.UserRoleEnum import UserRole
 
@@ -8,7 +9,7 @@ from src.Validator.GenericValidator import generate_uuid
 from datetime import datetime
 
 class User(BaseModel):
-    id         : str      | CharField     = CharField(default=generate_uuid, max_length=32, primary_key=True)
+    id         : str      | UUIDKeyField  = UUIDKeyField(default=generate_uuid, primary_key=True)
     email      : str      | CharField     = CharField(max_length=100, unique=True, null=False)
     senha      : str      | CharField     = CharField(max_length=60, null=False)
     nome       : str      | CharField     = CharField(max_length=50, null=False)
@@ -29,5 +30,10 @@ class User(BaseModel):
     def is_driver_or_higher(self) -> bool:
         return bool(self.cargo >= UserRole.DRIVER)
 
+    @property
+    def is_claims_only(self) -> bool:
+        """ Indica se o usuário foi montado apenas com as claims de um token stateless """
+        return self.email is None
+
     class Meta:
         table_name = "usuario"
\ No newline at end of file
@@ -1,32 +1,37 @@
-from peewee import CharField, ForeignKeyField, DateTimeField, BooleanField
+from peewee import CharField, ForeignKeyField, BooleanField, Expression
 from src.Model.BaseModel import BaseModel
+from src.Model.Fields import UUIDKeyField, UTCDateTimeField, to_utc
 
 from datetime import datetime, timedelta, timezone
 from src.Model import User
 
-from datetime import datetime
-
 from src.Validator.UserValidator import generate_uuid
 
+def default_expiration() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(minutes=30)
+
+def default_creation() -> datetime:
+    return datetime.now(timezone.utc)
+
 class Session(BaseModel):
-    id         : str  | CharField       = CharField(default=generate_uuid, max_length=36, primary_key=True)
-    usuario    : str  | ForeignKeyField = ForeignKeyField(User.User, backref="sessoes", null=False)
-    ip         : str  | CharField       = CharField(max_length=39, null=False)
-    refresh    : bool | BooleanField    = BooleanField(default=False, null=False)
-    valido_ate : str  | DateTimeField   = DateTimeField(default=(datetime.now(timezone.utc) + timedelta(minutes=30)).isoformat(), null=False)
-    criado_em  : str  | DateTimeField   = DateTimeField(default=(datetime.now(timezone.utc)).isoformat(), null=False)
+    id         : str      | UUIDKeyField     = UUIDKeyField(default=generate_uuid, max_length=36, primary_key=True)
+    usuario    : str      | ForeignKeyField  = ForeignKeyField(User.User, backref="sessoes", null=False)
+    ip         : str      | CharField        = CharField(max_length=39, null=False)
+    refresh    : bool     | BooleanField     = BooleanField(default=False, null=False)
+    valido_ate : datetime | UTCDateTimeField = UTCDateTimeField(default=default_expiration, null=False)
+    criado_em  : datetime | UTCDateTimeField = UTCDateTimeField(default=default_creation, null=False)
 
     @property
     def valido_ate_datetime(self) -> datetime:
-        return datetime.fromisoformat(str(self.valido_ate))
+        return to_utc(self.valido_ate)
     
     @property
     def valido_ate_iso_str(self) -> str:
-        return str(self.valido_ate)
+        return self.valido_ate_datetime.isoformat()
     
     @property
     def is_expired(self) -> bool:
-        return bool(self.valido_ate_datetime.astimezone(timezone.utc) <= datetime.now(timezone.utc))
+        return bool(self.valido_ate_datetime <= datetime.now(timezone.utc))
     
     @property
     def is_refresh(self):
@@ -35,5 +40,10 @@ class Session(BaseModel):
     def ip_equals(self, ip: str) -> bool:
         return bool(self.ip == ip)
 
+    @classmethod
+    def expired(cls) -> Expression:
+        """ Condição SQL equivalente a `is_expired` """
+        return cls.valido_ate <= datetime.now(timezone.utc)
+
     class Meta:
         table_name = "sessao"
@@ -2,9 +2,14 @@ from src.Model.Ambulance import Ambulance
 from src.Model.Equipment import Equipment
 from src.Model.Driver import Driver
 
-from typing import Any
+from src.DB.Routing import read_replica
+from src.DB.PreparedQuery import PreparedQuery
+from src.DB.Pagination import Keyset
+from src.DB.Returning import insert_returning, update_returning
 
-from src.Error.Server.InternalServerError import InternalServerError
+FIND_AMBULANCE_BY_ID = PreparedQuery(lambda id: Ambulance.select().where(Ambulance.id == id).limit(1))
+
+AMBULANCE_KEYSET = Keyset([Ambulance.id])
 
 """
     Criar
@@ -13,50 +18,70 @@ from src.Error.Server.InternalServerError import InternalServerError
 def create_ambulance(ambulance: Ambulance) -> Ambulance:
     """ Cria uma nova ambulância """
 
-    ambulance.save(force_insert=True)
-    return Ambulance.select().where(Ambulance.id == ambulance.id).first()
+    return insert_returning(ambulance)
 
 def create_equipment(equipment: Equipment) -> Equipment:
     """ Cria um novo equipamento """
 
-    equipment.save(force_insert=True)
-    return Equipment.select().where(Equipment.id == equipment.id).first()
+    return insert_returning(equipment)
 
 
 """
     Ler
 """
 
-def find_ambulances_by_page(page: int, pageSize: int) -> list[Ambulance]:
-    """ Encontra todas as ambulâncias presentes na página x de tamanho x """
+@read_replica
+def find_ambulances_by_page(page: int, pageSize: int, cursor: str | None = None) -> list[Ambulance]:
+    """ Encontra todas as ambulâncias presentes na página x de tamanho x, ou depois de `cursor` """
+
+    if cursor:
+        return list(AMBULANCE_KEYSET.paginate(Ambulance.select(), cursor, pageSize))
 
-    return Ambulance.select().order_by(Ambulance.id.asc()).paginate(page, pageSize) # type: ignore
+    return list(Ambulance.select().order_by(*AMBULANCE_KEYSET.order_by()).paginate(page, pageSize))
 
+@read_replica
 def find_ambulance_by_id(id: str) -> Ambulance | None:
     """ Encontra uma ambulância pelo seu ID """
 
-    return Ambulance.select().where(Ambulance.id == id).first()
+    return FIND_AMBULANCE_BY_ID.first(str(id))
 
+@read_replica
 def find_ambulance_joined_by_id(id: str) -> Ambulance | None:
     """ Encontra uma ambulância e faz join pelo seu ID """
 
     return Ambulance.select().where(Ambulance.id == id).join(Equipment, on=(Ambulance.id == Equipment.id_ambulancia)).join(Driver, on=(Ambulance.id == Driver.id_ambulancia)).first()
 
+@read_replica
 def find_driver_by_ambulance_id(id: str) -> Driver | None:
     """ Encontra motoristas atrelados a uma ambulância pelo seu id """
 
     return Driver.select().where(Driver.id_ambulancia == id).first()
 
+@read_replica
 def find_ambulance_equipments_by_id(id: str) -> list[Equipment]:
     """ Encontra todos equipamentos de uma ambulância pelo seu id """
     
     return Equipment.select().where(Equipment.id_ambulancia == id)
 
+@read_replica
+def find_drivers_by_ambulance_ids(ids: list[str]) -> list[Driver]:
+    """ Encontra os motoristas atrelados a qualquer uma das ambulâncias em uma consulta """
+
+    return Driver.select().where(Driver.id_ambulancia.in_(ids))
+
+@read_replica
+def find_equipments_by_ambulance_ids(ids: list[str]) -> list[Equipment]:
+    """ Encontra os equipamentos de todas as ambulâncias em uma consulta """
+
+    return Equipment.select().where(Equipment.id_ambulancia.in_(ids))
+
+@read_replica
 def ambulance_exits_by_id(id: str) -> bool:
     """ Verifica se uma ambulância existe pelo seu id """
     
     return Ambulance.select().where(Ambulance.id == id).exists()
 
+@read_replica
 def equipment_exits_by_id(id: str) -> bool:
     """ Verifica se um equipamento existe pelo seu id """
     
@@ -71,45 +96,30 @@ def update_ambulance_ignore_none(travelId: str, **args) -> Ambulance | None:
 
     filteredArgs = {k: v for k, v in args.items() if v is not None}
 
-    query = Ambulance.update(filteredArgs).where(Ambulance.id == travelId)
-    query.execute()
-
-    return Ambulance.select().where(Ambulance.id == travelId).first()
+    return update_returning(Ambulance, filteredArgs, Ambulance.id == travelId)
 
 def update_ambulance(travelId: str, **args) -> Ambulance | None:
     """ Atualiza uma ambulância """
 
-    query = Ambulance.update(args).where(Ambulance.id == travelId)
-    query.execute()
-
-    return Ambulance.select().where(Ambulance.id == travelId).first()
+    return update_returning(Ambulance, args, Ambulance.id == travelId)
 
 def update_equipment_ignore_none(equipmentId: str, **args) -> Equipment | None:
     """ Atualiza um equipamento ignorando valores nulos """
 
     filteredArgs = {k: v for k, v in args.items() if v is not None}
 
-    query = Equipment.update(filteredArgs).where(Equipment.id == equipmentId)
-    query.execute()
-
-    return Equipment.select().where(Equipment.id == equipmentId).first()
+    return update_returning(Equipment, filteredArgs, Equipment.id == equipmentId)
 
 """
     Deletar
 """
 
-def delete_equipment(equipmentId: str) -> None:
-    """ Excluí um equipamento pelo seu id """
+def delete_equipment(equipmentId: str) -> bool:
+    """ Excluí um equipamento pelo seu id, retorna se alguma linha foi excluída """
 
-    Equipment.delete().where(Equipment.id == equipmentId).execute()
-
-    if equipment_exits_by_id(equipmentId):
-        raise InternalServerError()
+    return Equipment.delete().where(Equipment.id == equipmentId).execute() > 0
     
-def delete_ambulance(ambulanceId: str) -> None:
-    """ Excluí um equipamento pelo seu id """
-
-    Ambulance.delete().where(Ambulance.id == ambulanceId).execute()
+def delete_ambulance(ambulanceId: str) -> bool:
+    """ Excluí uma ambulância pelo seu id, retorna se alguma linha foi excluída """
 
-    if ambulance_exits_by_id(ambulanceId):
-        raise InternalServerError()
+    return Ambulance.delete().where(Ambulance.id == ambulanceId).execute() > 0
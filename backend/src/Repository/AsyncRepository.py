@@ -0,0 +1,28 @@
+from types import ModuleType
+
+from typing import Any, Callable, Awaitable
+
+from src.DB.Executor import run_in_db
+
+class AsyncRepository:
+    """
+    Versão aguardável de um módulo de `Repository`: `await TravelRepositoryAsync.find_travel_by_id(id)`
+    roda `TravelRepository.find_travel_by_id(id)` no pool de threads do banco (veja `run_in_db`).
+    """
+
+    def __init__(self, module: ModuleType) -> None:
+        self.module = module
+
+    def __getattr__(self, name: str) -> Callable[..., Awaitable[Any]]:
+        fn = getattr(self.module, name)
+
+        if not callable(fn):
+            raise AttributeError(f"{self.module.__name__}.{name} não é uma função")
+
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await run_in_db(fn, *args, **kwargs)
+
+        call.__name__ = name
+        call.__doc__ = fn.__doc__
+
+        return call
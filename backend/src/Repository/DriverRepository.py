@@ -1,5 +1,10 @@
 from src.Model.Driver import Driver
 from src.Model.User import User
+from src.DB.Routing import read_replica
+from src.DB.PreparedQuery import PreparedQuery
+from src.DB.Returning import insert_returning, update_returning
+
+FIND_DRIVER_BY_ID = PreparedQuery(lambda id: Driver.select().join(User).where(Driver.id == id).limit(1))
 
 
 """
@@ -9,17 +14,23 @@ from src.Model.User import User
 def create_driver_by_id(driver: Driver) -> Driver | None:
     """ Cria um motorista pelo id """
 
-    driver.save(force_insert=True)
-    return Driver.select().join(User).where(Driver.id == driver.id).first()
+    return insert_returning(driver)
 
 """
     Ler
 """
 
+@read_replica
 def find_driver_by_id(id: str) -> Driver | None:
     """ Encontra motorista pelo seu ID """
 
-    return Driver.select().join(User).where(Driver.id == id).first()
+    return FIND_DRIVER_BY_ID.first(str(id))
+
+@read_replica
+def find_drivers_by_ids(ids: list[str]) -> list[Driver]:
+    """ Encontra os motoristas, com o usuário de cada um já carregado, em uma consulta """
+
+    return list(Driver.select(Driver, User).join(User).where(Driver.id.in_(ids)))
 
 """
     Atualizar
@@ -28,9 +39,7 @@ def find_driver_by_id(id: str) -> Driver | None:
 def update_driver_by_id(id: str, **kwargs) -> Driver | None:
     """ Atualiza um motorista pelos valores passados em kwargs """
 
-    Driver.update(**kwargs).where(Driver.id == id).execute()
-
-    return Driver.select().where(Driver.id == id).first()
+    return update_returning(Driver, kwargs, Driver.id == id)
 
 """
     Deletar
@@ -0,0 +1,76 @@
+from peewee import PostgresqlDatabase
+
+from src.Model.EmailOutbox import EmailOutbox, now_utc
+
+from src.DB import db
+from src.DB.Returning import supports_returning
+
+from datetime import datetime
+
+"""
+    Criar
+"""
+
+def create_email(email: EmailOutbox) -> EmailOutbox:
+    """ Coloca um email na fila de envio """
+
+    email.save(force_insert=True)
+    return email
+
+"""
+    Ler
+"""
+
+def find_due_emails(limit: int) -> list[EmailOutbox]:
+    """ Encontra os próximos emails pendentes cuja tentativa já venceu """
+
+    return list(EmailOutbox.select().where(EmailOutbox.due()).order_by(EmailOutbox.proxima_tentativa.asc()).limit(limit))
+
+def find_email_by_id(id: str) -> EmailOutbox | None:
+    """ Encontra um email da fila pelo seu ID """
+
+    return EmailOutbox.select().where(EmailOutbox.id == id).first()
+
+"""
+    Atualizar
+"""
+
+def claim_due_emails(owner: str, limit: int, leaseUntil: datetime) -> list[EmailOutbox]:
+    """ Reserva para o lote `owner` até `leaseUntil` os próximos emails pendentes cuja tentativa já venceu
+    e devolve os reservados. Um único UPDATE: outro worker não reserva os mesmos emails e, se o lote
+    não terminar, eles voltam a vencer em `leaseUntil`. No Postgres as linhas travadas por outro worker são puladas """
+
+    due = EmailOutbox.select(EmailOutbox.id).where(EmailOutbox.due()).order_by(EmailOutbox.proxima_tentativa.asc()).limit(limit)
+
+    if isinstance(db.obj, PostgresqlDatabase):
+        due = due.for_update("FOR UPDATE SKIP LOCKED")
+
+    # `due()` de novo no UPDATE: uma linha reservada por outro worker depois do SELECT não é reservada outra vez
+    query = EmailOutbox.update(reservado_por=owner, proxima_tentativa=leaseUntil).where(EmailOutbox.id.in_(due) & EmailOutbox.due())
+
+    if supports_returning():
+        return list(query.returning(EmailOutbox).execute())
+
+    query.execute()
+    return list(EmailOutbox.select().where(EmailOutbox.reservado_por == owner))
+
+def update_dispatch_results(owner: str, sent: list[str], retries: list[tuple[str, int, datetime, str]], failed: list[tuple[str, int, str]]) -> None:
+    """ Salva o resultado do lote `owner` em uma única transação e libera a reserva:
+    `retries` são (id, tentativas, proxima_tentativa, erro) e `failed` são (id, tentativas, erro).
+    Emails que outro lote reservou depois que a reserva deste venceu não são alterados """
+
+    claimed = EmailOutbox.reservado_por == owner
+
+    with db.atomic():
+        if sent:
+            EmailOutbox.update(
+                status=EmailOutbox.SENT, enviado_em=now_utc(), ultimo_erro=None, tentativas=EmailOutbox.tentativas + 1, reservado_por=None
+            ).where(EmailOutbox.id.in_(sent) & claimed).execute()
+
+        for (id, attempts, nextAttempt, error) in retries:
+            EmailOutbox.update(
+                tentativas=attempts, proxima_tentativa=nextAttempt, ultimo_erro=error, reservado_por=None
+            ).where((EmailOutbox.id == id) & claimed).execute()
+
+        for (id, attempts, error) in failed:
+            EmailOutbox.update(status=EmailOutbox.FAILED, tentativas=attempts, ultimo_erro=error, reservado_por=None).where((EmailOutbox.id == id) & claimed).execute()
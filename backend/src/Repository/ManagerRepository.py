@@ -1,6 +1,8 @@
 from src.Model.Manager import Manager
 from src.Model.User import User
 from src.Model.UpgradeToken import UpgradeToken
+from src.DB.Routing import read_replica
+from src.DB.Returning import insert_returning, update_returning
 
 """ 
     Criar
@@ -15,13 +17,11 @@ def bulk_create_token(tokenList: list[UpgradeToken]) -> list[UpgradeToken] |  No
 
 def create_token(token: UpgradeToken) -> UpgradeToken | None:
     """ Cria um token para atualizar usuário para gerente """
-    token.save(force_insert=True)
-    return UpgradeToken.select().where(UpgradeToken.id == token.id).first()
+    return insert_returning(token)
 
 def create_manager(manager: Manager) -> Manager | None:
     """ Cria um gerente """
-    manager.save(force_insert=True)
-    return Manager.select().where(Manager.id == manager.id).first()
+    return insert_returning(manager)
 
 """
     Ler
@@ -38,15 +38,22 @@ def find_all_tokens() -> list[UpgradeToken]:
     """ Selectiona todos tokens no banco de dados """
     return UpgradeToken.select()
 
+def find_unused_tokens_by_role(role: int) -> list[UpgradeToken]:
+    """ Seleciona os tokens ainda não usados de um cargo """
+    return list(UpgradeToken.select().where((UpgradeToken.fator_cargo == role) & (UpgradeToken.usado == False)))
 
+
+@read_replica
 def count_manager() -> int:
     """ Conta a quantidade de gerentes no banco de dados """
     return Manager.select().count()
 
+@read_replica
 def find_manager_by_id(managerId: str) -> Manager | None:
     """ Seleciona um gerente pelo seu id """
     return Manager.select().where(Manager.id == managerId).first()
 
+@read_replica
 def find_manager_join_by_id(managerId: str):
     """ Seleciona um usuario e faz o join com gerente pelo seu id """
     return User.select(User, Manager).join(Manager).where(User.id == managerId).first()
@@ -57,35 +64,23 @@ def find_manager_join_by_id(managerId: str):
 def update_manager_by_id_ignore_none(managerId: str, **args) -> Manager | None:
     """ Atualiza um gerente ignorando valores nulos """
 
-    filteredArgs = [x for x in args if x is not None]
-
-    query = Manager.update(filteredArgs).where(Manager.id == managerId)
-    query.execute()
+    filteredArgs = {k: v for k, v in args.items() if v is not None}
 
-    return Manager.select().where(Manager.id == managerId).first()
+    return update_returning(Manager, filteredArgs, Manager.id == managerId)
 
 def update_manager_by_id(managerId: str, **args) -> Manager | None:
     """ Atualiza um gerente pelo seu id """
 
-    query = Manager.update(args).where(Manager.id == managerId)
-    query.execute()
-
-    return Manager.select().where(Manager.id == managerId).first()
+    return update_returning(Manager, args, Manager.id == managerId)
 
 def update_token_by_id_ignore_none(tokenId: str, **args) -> UpgradeToken | None:
     """ Atualiza um token ignorando valores nulos """
 
-    filteredArgs = [x for x in args if x is not None]
+    filteredArgs = {k: v for k, v in args.items() if v is not None}
 
-    query = UpgradeToken.update(filteredArgs).where(UpgradeToken.id == tokenId)
-    query.execute()
-
-    return UpgradeToken.select().where(UpgradeToken.id == tokenId).first()
+    return update_returning(UpgradeToken, filteredArgs, UpgradeToken.id == tokenId)
 
 def update_token_by_id(tokenId: str, **args) -> UpgradeToken | None:
     """ Atualiza um token pelo seu id """
 
-    query = UpgradeToken.update(args).where(UpgradeToken.id == tokenId)
-    query.execute()
-
-    return UpgradeToken.select().where(UpgradeToken.id == tokenId).first()
+    return update_returning(UpgradeToken, args, UpgradeToken.id == tokenId)
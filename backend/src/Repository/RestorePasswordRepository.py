@@ -15,6 +15,9 @@ def create_restore_password(restorePassword: RestorePassword) -> RestorePassword
 def find_restore_password_by_id(restorePasswordId: str) -> RestorePassword | None:
     return RestorePassword.select().where(RestorePassword.id == restorePasswordId).first()
 
+def find_valid_restore_password_by_id(restorePasswordId: str) -> RestorePassword | None:
+    return RestorePassword.select().where((RestorePassword.id == restorePasswordId) & RestorePassword.valid()).first()
+
 """
     Atualizar
 """
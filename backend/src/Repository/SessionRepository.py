@@ -5,9 +5,33 @@ from src.Model.User import User
 
 from src.Model.UserSession import Session
 
+from src.Utils.cache import TTLCache, ExpiringDict
+from src.Utils.env import get_env_var
+from src.DB.PreparedQuery import PreparedQuery
+
 from typing import List
 from uuid import UUID
 
+from datetime import datetime, timedelta, timezone
+from time import time
+
+SESSION_CACHE = TTLCache(
+    maxSize=int(get_env_var("SESSION_CACHE_SIZE", "2048") or "2048"),
+    ttl=float(get_env_var("SESSION_CACHE_TTL", "60") or "60")
+)
+
+# Tokens de acesso stateless duram no máximo o mesmo que uma sessão de acesso (30 minutos),
+# depois disso o próprio `exp` do token o invalida e a revogação pode ser esquecida
+STATELESS_REVOCATION_TTL = timedelta(minutes=30).total_seconds()
+
+REVOKED_SESSIONS = ExpiringDict()
+USER_CLAIMS_CHANGED_AT = ExpiringDict()
+
+# Consultas compiladas uma vez, o caminho de autenticação roda em quase toda requisição
+FIND_SESSION_BY_ID = PreparedQuery(lambda id: Session.select().where(Session.id == id).limit(1))
+FIND_SESSION_WITH_USER_BY_ID = PreparedQuery(
+    lambda id, now: Session.select(Session, User).join(User).where((Session.id == id) & (Session.valido_ate > now)).limit(1)
+)
 
 """
     Criar
@@ -17,6 +41,10 @@ def insert_session(session: Session) -> None:
     """ Insere uma sessão no banco de dados """
     session.save(force_insert=True)
 
+def insert_sessions(sessions: list[Session]) -> None:
+    """ Insere várias sessões no banco de dados com um único INSERT """
+    Session.bulk_create(sessions)
+
 """
     Ler
 """
@@ -38,12 +66,41 @@ def find_session_by_session_id(id: str | UUID) -> Session | None:
     if type(id) == UUID:
         id = validate_uuid(id)
     
-    session = Session.select().where(Session.id == id).first()
+    session = FIND_SESSION_BY_ID.first(str(id))
     if session is None:
         return None
 
     return session
 
+def find_session_with_user_by_session_id(id: str | UUID) -> Session | None:
+    """ Retorna uma sessão ainda válida junto com o seu usuário em uma única consulta (JOIN) """
+    return FIND_SESSION_WITH_USER_BY_ID.first(unmask_uuid(id), datetime.now(timezone.utc))
+
+def find_cached_auth_by_session_id(id: str | UUID) -> tuple[User, Session] | None:
+    """ Retorna o par (usuário, sessão) pelo ID da sessão, consultando o cache antes do banco de dados """
+    auth = find_auth_in_cache(id)
+    if auth is not None:
+        return auth
+
+    return cache_auth_by_session_id(id)
+
+def find_auth_in_cache(id: str | UUID) -> tuple[User, Session] | None:
+    """ Retorna o par (usuário, sessão) somente se estiver no cache, sem consultar o banco de dados """
+    return SESSION_CACHE.get(unmask_uuid(id))
+
+def cache_auth_by_session_id(id: str | UUID) -> tuple[User, Session] | None:
+    """ Busca o par (usuário, sessão) no banco de dados e o guarda no cache """
+    sessionId = unmask_uuid(id)
+
+    session = find_session_with_user_by_session_id(sessionId)
+    if session is None:
+        return None
+
+    auth = (session.usuario, session)
+    SESSION_CACHE.set(sessionId, auth)
+
+    return auth
+
 def find_user_by_session_id(id: str | UUID) -> User | None:
     """ Retorna o usuário pela sessão do mesmo """
     id = unmask_uuid(id)
@@ -60,18 +117,49 @@ def find_user_by_session_id(id: str | UUID) -> User | None:
     Atualizar
 """
 
+"""
+    Cache
+"""
+
+def invalidate_cached_session(id: str | UUID) -> None:
+    """ Remove uma sessão do cache de autenticação """
+    SESSION_CACHE.delete(unmask_uuid(id))
+
+def invalidate_cached_user_sessions(userId: str | UUID) -> None:
+    """ Remove todas sessões de um usuário do cache de autenticação e marca as
+    claims dos tokens stateless já emitidos para ele como desatualizadas """
+    userId = unmask_uuid(userId)
+    SESSION_CACHE.delete_where(lambda sessionId, auth: auth[0].str_id == userId)
+    USER_CLAIMS_CHANGED_AT.set(userId, time(), STATELESS_REVOCATION_TTL)
+
+def is_session_revoked(id: str | UUID) -> bool:
+    """ Verifica se uma sessão foi revogada recentemente (usado pelos tokens stateless) """
+    return unmask_uuid(id) in REVOKED_SESSIONS
+
+def are_user_claims_stale(userId: str | UUID, issuedAt: float) -> bool:
+    """ Verifica se o usuário foi alterado depois que o token foi emitido em `issuedAt` """
+    changedAt = USER_CLAIMS_CHANGED_AT.get(unmask_uuid(userId))
+    return changedAt is not None and issuedAt <= changedAt
+
+def session_cache_stats() -> dict[str, int | float]:
+    """ Retorna os contadores do cache de autenticação """
+    return SESSION_CACHE.stats()
+
 """
     Deletar
 """
 
 def delete_token_by_id(token: str) -> None:
     """ Deleta uma sessão pelo seu ID """
-    Session.delete_by_id(validate_uuid(token))
+    Session.delete_by_id(unmask_uuid(token))
+    invalidate_cached_session(token)
+    REVOKED_SESSIONS.set(unmask_uuid(token), True, STATELESS_REVOCATION_TTL)
 
 def delete_all_user_tokens_by_id(id: int) -> None:
     """ Deleta todas sessões associadas a um usuário pelo seu ID """
     Session.delete().where(Session.usuario == id).execute()
+    invalidate_cached_user_sessions(str(id))
 
 def delete_expired_sessions() -> None:
     """ Deleta todas sessões expiradas """
-    Session.delete().where(Session.is_expired == True).execute()
+    Session.delete().where(Session.expired()).execute()
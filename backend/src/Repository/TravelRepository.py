@@ -1,5 +1,23 @@
+from peewee import JOIN, Expression, ModelSelect, chunked
+
 from src.Model.Travel import Travel
 from src.Model.User import User
+from src.Model.Ambulance import Ambulance
+from src.Schema.Travel.TravelFilterSchema import TravelFilterSchema
+from src.Schema.Travel.TravelRoleEnum import TravelRole
+from src.DB import db
+from src.DB.Routing import read_replica
+from src.DB.PreparedQuery import PreparedQuery
+from src.DB.Pagination import Keyset
+from src.DB.Returning import update_returning
+
+FIND_TRAVEL_BY_ID = PreparedQuery(lambda id: Travel.select().where(Travel.id == id).limit(1))
+
+# Da mais recente para a mais antiga, o ID desempata viagens criadas no mesmo instante
+TRAVEL_KEYSET = Keyset([Travel.criado_em, Travel.id], descending=True)
+
+# Linhas por INSERT: com as 18 colunas fica abaixo do limite de 999 parâmetros de SQLites antigos
+TRAVEL_INSERT_CHUNK_SIZE = 50
 
 
 """
@@ -11,29 +29,83 @@ def insert_travel(travel: Travel) -> Travel:
     travel.save(force_insert=True)
     return travel
 
+def insert_travels(travels: list[Travel]) -> int:
+    """ Insere várias viagens em uma única transação, um INSERT de várias linhas por bloco.
+    Se alguma linha falhar nenhuma é gravada """
+    with db.atomic():
+        for chunk in chunked([travel.__data__ for travel in travels], TRAVEL_INSERT_CHUNK_SIZE):
+            Travel.insert_many(chunk).as_rowcount().execute()
+
+    return len(travels)
+
 
 """
     Ler
 """
 
-def find_assigned_travels(user: User, page: int, pageSize: int) -> list[Travel]:
-    """ Encontra todas viagens atribuidas a o usuário user """
-    travels = (Travel.select()
-                      .where((Travel.id_paciente == user.id) | (Travel.id_motorista == user.id))
-                      .paginate(page, pageSize))
-    
-    return list(travels)
+def joined_travels() -> ModelSelect:
+    """ Viagens com a ambulância no mesmo SELECT (LEFT JOIN), `travel.id_ambulancia` já vem carregada """
+    return Travel.select(Travel, Ambulance).join(Ambulance, JOIN.LEFT_OUTER, on=(Travel.id_ambulancia == Ambulance.id))
+
+def travel_filter_condition(user: User, travelFilter: TravelFilterSchema) -> Expression:
+    """ Condição SQL das viagens do usuário que passam pelos filtros """
+    if travelFilter.papel == TravelRole.PACIENTE:
+        condition = Travel.id_paciente == user.id
+    elif travelFilter.papel == TravelRole.MOTORISTA:
+        condition = Travel.id_motorista == user.id
+    else:
+        condition = (Travel.id_paciente == user.id) | (Travel.id_motorista == user.id)
+
+    if travelFilter.cancelada is not None:
+        condition &= Travel.cancelada == travelFilter.cancelada
+
+    if travelFilter.realizado:
+        condition &= Travel.realizado.in_([int(state) for state in travelFilter.realizado])
+
+    if travelFilter.inicio_de is not None:
+        condition &= Travel.inicio >= travelFilter.inicio_de
 
-def find_all_travels(itemsPerPage: int = 15, page: int = 0) -> list[Travel]:
+    if travelFilter.inicio_ate is not None:
+        condition &= Travel.inicio < travelFilter.inicio_ate
+
+    return condition
+
+@read_replica
+def find_travels(user: User, travelFilter: TravelFilterSchema, page: int, pageSize: int, cursor: str | None = None, joined: bool = False) -> list[Travel]:
+    """ Encontra as viagens do usuário que passam pelos filtros, da mais recente para a mais antiga.
+    Com `cursor` a página começa depois da última viagem da página anterior e `page` é ignorado.
+    Com `joined` a ambulância de cada viagem vem na mesma consulta """
+    query = (joined_travels() if joined else Travel.select()).where(travel_filter_condition(user, travelFilter))
+
+    if cursor:
+        return list(TRAVEL_KEYSET.paginate(query, cursor, pageSize))
+
+    return list(query.order_by(*TRAVEL_KEYSET.order_by()).paginate(page, pageSize))
+
+def find_assigned_travels(user: User, page: int, pageSize: int, cursor: str | None = None) -> list[Travel]:
+    """ Encontra todas viagens atribuidas a o usuário user (inclusive canceladas), da mais recente para a mais antiga """
+    return find_travels(user, TravelFilterSchema(cancelada=None), page, pageSize, cursor)
+
+@read_replica
+def find_all_travels(itemsPerPage: int = 15, page: int = 0, cursor: str | None = None) -> list[Travel]:
     """ Encontra todas viagens e ordena de mais recente para mais antiga """
-    return (Travel.select()
-                  .order_by(Travel.criado_em.desc())
-                  .paginate(page, itemsPerPage))
+    if cursor:
+        return list(TRAVEL_KEYSET.paginate(Travel.select(), cursor, itemsPerPage))
+
+    return list(Travel.select()
+                      .order_by(*TRAVEL_KEYSET.order_by())
+                      .paginate(page, itemsPerPage))
 
 
+@read_replica
 def find_travel_by_id(travelId: str) -> Travel | None:
     """ Encontra uma viagem pelo seu ID, se não encontrar retorna None """
-    return Travel.select().where(Travel.id == travelId).first()
+    return FIND_TRAVEL_BY_ID.first(str(travelId))
+
+@read_replica
+def find_travel_joined_by_id(travelId: str) -> Travel | None:
+    """ Encontra uma viagem e a sua ambulância pelo ID da viagem, se não encontrar retorna None """
+    return joined_travels().where(Travel.id == travelId).first()
 
 """
     Atualizar
@@ -42,10 +114,13 @@ def find_travel_by_id(travelId: str) -> Travel | None:
 def update_travel(travelId: str, **args) -> Travel | None:
     """ Atualiza uma viagem """
 
-    query = Travel.update(args).where(Travel.id == travelId)
-    query.execute()
+    return update_returning(Travel, args, Travel.id == travelId)
+
+def transition_travel(travelId: str, condition: Expression, **args) -> Travel | None:
+    """ Atualiza a viagem só se ela ainda atende `condition` (compare-and-set em um único UPDATE),
+    retorna None quando nenhuma linha mudou: a viagem não existe ou já não está no estado esperado """
 
-    return Travel.select().where(Travel.id == travelId).first()
+    return update_returning(Travel, args, (Travel.id == travelId) & condition, key=Travel.id == travelId)
 
 
 """
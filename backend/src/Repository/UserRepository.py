@@ -4,14 +4,24 @@ from src.Model.Driver import Driver
 
 from src.Schema.User.UserRoleEnum import UserRole
 
+from src.Repository.SessionRepository import invalidate_cached_user_sessions
+from src.DB.Routing import read_replica
+from src.DB.PreparedQuery import PreparedQuery
+from src.DB.Pagination import Keyset
+from src.DB.Returning import insert_returning, update_returning
+
+# Consultas compiladas uma vez, usadas em quase toda requisição
+FIND_BY_ID = PreparedQuery(lambda id: User.select().where(User.id == id).limit(1))
+
+USER_KEYSET = Keyset([User.id])
+
 """
     Criar
 """
 
 def create(userModel: User) -> User:
     """ Cria um usuário """
-    userModel.save(force_insert=True)
-    return User.select().where(User.id == userModel.id).first()
+    return insert_returning(userModel)
 
 def create_role_by_user_id(userId: str, role: UserRole) -> None:
     """ Cria a coluna auxiliar para o cargo respectivo """
@@ -32,41 +42,59 @@ def create_role_by_user_id(userId: str, role: UserRole) -> None:
     Ler
 """
 
+@read_replica
 def find_by_id(id: str) -> User | None:
     """ Retorna um usuário pelo seu ID """
-    return User.select().where(User.id == id).first()
+    return FIND_BY_ID.first(str(id))
 
+@read_replica
 def find_by_email(email: str) -> User | None:
     """ Retorna um usuário pelo seu email """
     return User.select().where(User.email == email).first()
 
+@read_replica
 def find_by_cpf(cpf: str) -> User:
     """ Retorna um usuário pelo seu CPF """
     return User.get(User.cpf == cpf)
 
-def find_all_with_page(pageNumber: int= 0, pageSize: int = 25) -> 'list[User]':
-    """ Retorna uma lista de usuários pelo pageNumber que se divide pelo pageSize """
-    return (User.select()
-                .order_by(User.id.asc())
-                .paginate(pageNumber, pageSize))
+def find_ids_by_cpfs(cpfs: list[str]) -> dict[str, str]:
+    """ Retorna o ID dos usuários cadastrados com cada CPF, em uma consulta.
+    Lida sempre do primário: alimenta a gravação da importação e não pode ver uma réplica atrasada """
+    return {user.cpf: user.id for user in User.select(User.id, User.cpf).where(User.cpf.in_(cpfs))}
+
+@read_replica
+def find_all_with_page(pageNumber: int= 0, pageSize: int = 25, cursor: str | None = None) -> 'list[User]':
+    """ Retorna uma lista de usuários pelo pageNumber que se divide pelo pageSize,
+    ou a página depois de `cursor` quando ele é informado """
+    if cursor:
+        return list(USER_KEYSET.paginate(User.select(), cursor, pageSize))
 
+    return list(User.select()
+                    .order_by(*USER_KEYSET.order_by())
+                    .paginate(pageNumber, pageSize))
+
+@read_replica
 def exists_by_id(id: int) -> bool:
     """ Verifica se um usuário existe pelo seu ID """
     return User.select().where(User.id == id).exists()
 
+@read_replica
 def exists_by_email(email: str) -> bool:
     """ Verifica se um usuário existe pelo seu e-mail """
     return User.select().where(User.email == email).exists()
 
+@read_replica
 def exists_by_phone_number(phone_number: str) -> bool:
     """ Verifica se um usuário existe pelo seu número de telefone """
     return User.select().where(User.telefone == phone_number).exists()
 
+@read_replica
 def exists_by_cpf(cpf: str) -> bool:
     """ Verifica se um usuário existe pelo seu CPF """
     return User.select().where(User.cpf == cpf).exists()
 
 
+@read_replica
 def count() -> int:
     """ Retorna a quantidade de usuários cadastrados """
     return User.select().count()
@@ -78,20 +106,26 @@ def count() -> int:
 def update_user_by_id_ignore_none(userId: str, **args) -> User | None:
     """ Atualiza uma viagem ignorando valores nulos """
 
-    filteredArgs = [x for x in args if x is not None]
+    filteredArgs = {k: v for k, v in args.items() if v is not None}
 
-    query = User.update(filteredArgs).where(User.id == userId)
-    query.execute()
+    user = update_returning(User, filteredArgs, User.id == userId)
+    invalidate_cached_user_sessions(userId)
 
-    return User.select().where(User.id == userId).first()
+    return user
 
 def update_user_by_id(userId: str, **args) -> User | None:
     """ Atualiza uma viagem """
 
-    query = User.update(args).where(User.id == userId)
-    query.execute()
+    user = update_returning(User, args, User.id == userId)
+    invalidate_cached_user_sessions(userId)
+
+    return user
+
+def update_password_hash(userId: str, oldHash: str, newHash: str) -> bool:
+    """ Troca o hash da senha apenas se ela não foi alterada nesse meio tempo,
+    não invalida as sessões pois a senha do usuário continua a mesma """
 
-    return User.select().where(User.id == userId).first()
+    return User.update(senha=newHash).where((User.id == userId) & (User.senha == oldHash)).execute() > 0
 
 """
     Deletar
@@ -100,6 +134,7 @@ def update_user_by_id(userId: str, **args) -> User | None:
 def delete_by_id(id: str) -> None:
     """ Excluí um usuário pelo seu ID """
     User.delete_by_id(id)
+    invalidate_cached_user_sessions(str(id))
 
 def delete_all() -> None:
     """ Excluí todos usuários cadastrados (usar apenas em testes) """
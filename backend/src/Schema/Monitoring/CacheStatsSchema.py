@@ -0,0 +1,13 @@
+from src.Schema.BaseModel import BaseModel, Field
+
+from typing import Annotated
+
+class CacheStatsSchema(BaseModel):
+    tamanho        : Annotated[int  , Field(examples=[312])]
+    tamanho_maximo : Annotated[int  , Field(examples=[2048])]
+    ttl            : Annotated[float, Field(examples=[60])]
+    hits           : Annotated[int  , Field(examples=[18230])]
+    misses         : Annotated[int  , Field(examples=[641])]
+    evictions      : Annotated[int  , Field(examples=[0])]
+    expirations    : Annotated[int  , Field(examples=[329])]
+    hit_ratio      : Annotated[float, Field(examples=[0.966])]
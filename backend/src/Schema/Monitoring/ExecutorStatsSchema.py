@@ -0,0 +1,11 @@
+from src.Schema.BaseModel import BaseModel, Field
+
+from typing import Annotated
+
+class ExecutorStatsSchema(BaseModel):
+    nome         : Annotated[str, Field(examples=["db-PooledPostgresqlDatabase-0"])]
+    workers      : Annotated[int, Field(examples=[20])]
+    limite_fila  : Annotated[int, Field(examples=[256])]
+    em_andamento : Annotated[int, Field(examples=[3])]
+    recusadas    : Annotated[int, Field(examples=[0])]
+    concluidas   : Annotated[int, Field(examples=[15230])]
@@ -0,0 +1,12 @@
+from src.Schema.BaseModel import BaseModel, Field
+
+from typing import Annotated
+
+class PoolStatsSchema(BaseModel):
+    em_uso           : Annotated[int, Field(examples=[4])]
+    disponiveis      : Annotated[int, Field(examples=[6])]
+    aguardando       : Annotated[int, Field(examples=[0])]
+    criadas          : Annotated[int, Field(examples=[12])]
+    maximo           : Annotated[int, Field(examples=[20])]
+    timeouts         : Annotated[int, Field(examples=[0])]
+    fechadas_ociosas : Annotated[int, Field(examples=[2])]
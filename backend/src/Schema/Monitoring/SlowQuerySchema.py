@@ -0,0 +1,11 @@
+from src.Schema.BaseModel import BaseModel, Field
+
+from typing import Annotated, Any
+
+class SlowQuerySchema(BaseModel):
+    sql        : Annotated[str             , Field(examples=['SELECT * FROM "transporte" AS "t1" WHERE ("t1"."id_paciente_id" = ?)'])]
+    parametros : Annotated[list[Any]       , Field(examples=[["4f1c0d7e9b2a4c3d8e5f6a7b8c9d0e1f"]])]
+    tempo_ms   : Annotated[float           , Field(examples=[412.7])]
+    origem     : Annotated[str             , Field(examples=["TravelRepository.find_assigned_travels"])]
+    plano      : Annotated[list[str] | str , Field(examples=[["SCAN t1"]])]
+    quando     : Annotated[str             , Field(examples=["2025-01-01T12:00:00+00:00"])]
@@ -0,0 +1,8 @@
+from src.Schema.BaseModel import BaseModel, Field
+
+from typing import Annotated
+
+class SweepStatsSchema(BaseModel):
+    tabela   : Annotated[str  , Field(examples=["sessao"])]
+    linhas   : Annotated[int  , Field(examples=[128])]
+    tempo_ms : Annotated[float, Field(examples=[4.2])]
@@ -0,0 +1,16 @@
+from src.Schema.BaseModel import BaseModel
+from pydantic import Field
+
+from typing import Annotated
+from datetime import datetime, timezone, timedelta
+
+from src.Schema.Travel.TravelRealizedEnum import TravelRealized
+from src.Schema.Travel.TravelRoleEnum import TravelRole
+
+class TravelFilterSchema(BaseModel):
+    """ Filtros das viagens de um usuário, todos aplicados no SQL. None não filtra """
+    cancelada  : Annotated[bool | None,                 Field(examples=[False])] = False
+    realizado  : Annotated[list[TravelRealized] | None, Field(examples=[[TravelRealized.NAO_REALIZADO, TravelRealized.EM_PROGRESSO]])] = None
+    inicio_de  : Annotated[datetime | None,             Field(examples=[datetime.now(timezone.utc)])] = None
+    inicio_ate : Annotated[datetime | None,             Field(examples=[datetime.now(timezone.utc) + timedelta(days=1)])] = None
+    papel      : Annotated[TravelRole | None,           Field(examples=[TravelRole.MOTORISTA])] = None
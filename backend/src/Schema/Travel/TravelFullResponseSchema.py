@@ -12,7 +12,7 @@ from datetime import datetime, timedelta, timezone
 from src.Schema.Driver.DriverResponseSchema import DriverResponseSchema, DRIVER_EXAMPLE
 from src.Schema.Ambulance.AmbulanceFullResponseSchema import AmbulanceFullResponseSchema, AMBULANCE_FULL_EXAMPLE
 
-class TravelResponseSchema(BaseModel):
+class TravelFullResponseSchema(BaseModel):
     id              : Annotated[UUID,                               Field(examples=[uuid4()])]
     realizado       : Annotated[int,                                Field(examples=[TravelRealized.EM_PROGRESSO])]
     inicio          : Annotated[datetime,                           Field(examples=[datetime.now(timezone.utc) + timedelta(days=1)])]
@@ -22,7 +22,7 @@ class TravelResponseSchema(BaseModel):
     estado_paciente : Annotated[int,                                Field(examples=[PatientState.WHELL_CHAIR])]
     observacoes     : Annotated[str | None,                         Field(examples=["Precisa de suporte para subir na ambulância"])] = None
     motorista       : Annotated[DriverResponseSchema | None,        Field(examples=[DRIVER_EXAMPLE])] = None
-    ambulancia      : Annotated[AmbulanceFullResponseSchema | None, Field(examples=[uuid4()])] = None
+    ambulancia      : Annotated[AmbulanceFullResponseSchema | None, Field(examples=[AMBULANCE_FULL_EXAMPLE])] = None
     lat_inicio      : Annotated[float,                              Field(examples=[-22.011433])]
     long_inicio     : Annotated[float,                              Field(examples=[-47.913322])]
     end_inicio      : Annotated[str,                                Field(examples=["Parque Faber II, São Carlos, Região Imediata de São Carlos, Região Geográfica Intermediária de Araraquara, São Paulo, Região Sudeste, 13562-020, Brasil, Alameda dos Curios, 156"])]
@@ -34,7 +34,7 @@ class TravelResponseSchema(BaseModel):
 
 
 
-TRAVEL_EXAMPLE = TravelResponseSchema.model_validate({
+TRAVEL_FULL_EXAMPLE = TravelFullResponseSchema.model_validate({
     "id"              : uuid4(),
     "realizado"       : TravelRealized.EM_PROGRESSO,
     "inicio"          : datetime.now(timezone.utc) + timedelta(days=1),
@@ -0,0 +1,7 @@
+from src.Schema.BaseModel import BaseModel, Field
+
+from typing import Annotated
+
+class TravelImportErrorSchema(BaseModel):
+    linha : Annotated[int,       Field(examples=[42])]
+    erros : Annotated[list[str], Field(examples=[["cpf_paciente: String should have at least 11 characters"]])]
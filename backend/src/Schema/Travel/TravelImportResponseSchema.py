@@ -0,0 +1,10 @@
+from src.Schema.BaseModel import BaseModel, Field
+
+from typing import Annotated
+
+from src.Schema.Travel.TravelImportErrorSchema import TravelImportErrorSchema
+
+class TravelImportResponseSchema(BaseModel):
+    importadas : Annotated[int,                           Field(examples=[998])]
+    rejeitadas : Annotated[int,                           Field(examples=[2])]
+    erros      : Annotated[list[TravelImportErrorSchema], Field(examples=[[{"linha": 42, "erros": ["inicio: Field required"]}]])]
@@ -1,5 +1,5 @@
 from src.Schema.BaseModel import BaseModel
-from pydantic import Field, BeforeValidator
+from pydantic import Field, BeforeValidator, AliasChoices
 
 from src.Schema.Travel.TravelRealizedEnum import TravelRealized
 from src.Schema.Travel.TravelPatientStateEnum import PatientState
@@ -10,16 +10,17 @@ from typing import Annotated
 from datetime import datetime, timedelta, timezone
 
 class TravelResponseSchema(BaseModel):
+    # As chaves estrangeiras são lidas de `<campo>_id` para não carregar o modelo relacionado (uma consulta por viagem)
     id              : Annotated[UUID,            Field(examples=[uuid4()])]
     realizado       : Annotated[int,             Field(examples=[TravelRealized.EM_PROGRESSO])]
     inicio          : Annotated[datetime,        Field(examples=[datetime.now(timezone.utc) + timedelta(days=1)])]
     fim             : Annotated[datetime | None, Field(examples=[datetime.now(timezone.utc) + timedelta(days=1, hours=3)])] = None
-    id_paciente     : Annotated[UUID,            Field(examples=[uuid4()]), BeforeValidator(lambda id: UUID(str(id)))]
+    id_paciente     : Annotated[UUID,            Field(examples=[uuid4()], validation_alias=AliasChoices("id_paciente_id", "id_paciente")), BeforeValidator(lambda id: UUID(str(id)))]
     cpf_paciente    : Annotated[str,             Field(examples=["12345678925"])]
     estado_paciente : Annotated[int,             Field(examples=[PatientState.WHELL_CHAIR])]
     observacoes     : Annotated[str | None,      Field(examples=["Precisa de suporte para subir na ambulância"])] = None
-    id_motorista    : Annotated[UUID | None,     Field(examples=[uuid4()]), BeforeValidator(lambda id: UUID(str(id)) if id else None)] = None
-    id_ambulancia   : Annotated[UUID | None,     Field(examples=[uuid4()]), BeforeValidator(lambda id: UUID(str(id)) if id else None)] = None
+    id_motorista    : Annotated[UUID | None,     Field(examples=[uuid4()], validation_alias=AliasChoices("id_motorista_id", "id_motorista")), BeforeValidator(lambda id: UUID(str(id)) if id else None)] = None
+    id_ambulancia   : Annotated[UUID | None,     Field(examples=[uuid4()], validation_alias=AliasChoices("id_ambulancia_id", "id_ambulancia")), BeforeValidator(lambda id: UUID(str(id)) if id else None)] = None
     lat_inicio      : Annotated[float,           Field(examples=[-22.011433])]
     long_inicio     : Annotated[float,           Field(examples=[-47.913322])]
     end_inicio      : Annotated[str,             Field(examples=["Parque Faber II, São Carlos, Região Imediata de São Carlos, Região Geográfica Intermediária de Araraquara, São Paulo, Região Sudeste, 13562-020, Brasil, Alameda dos Curios, 156"])]
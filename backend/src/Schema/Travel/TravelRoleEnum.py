@@ -0,0 +1,5 @@
+from enum import Enum
+
+class TravelRole(str, Enum):
+    PACIENTE  = "paciente"
+    MOTORISTA = "motorista"
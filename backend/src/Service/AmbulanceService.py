@@ -1,11 +1,14 @@
 from src.Repository import AmbulanceRepository, DriverRepository
+from src.Repository.AsyncRepository import AsyncRepository
 
 from src.Model.Ambulance import Ambulance
 from src.Model.Equipment import Equipment
+from src.Model.Driver import Driver
 
 from peewee import IntegrityError
 
 from src.DB import db
+from src.DB.Executor import run_in_db
 
 from playhouse.shortcuts import model_to_dict
 
@@ -23,23 +26,22 @@ from src.Error.Server.InternalServerError import InternalServerError
 from src.Error.Base.NotFoundError import NotFoundError
 from src.Error.Resource.AlreadyExistsError import AlreadyExists
 
-from src.Validator.GenericValidator import unmask_uuid
+from src.Validator.GenericValidator import mask_uuid, unmask_uuid
 
 from uuid import UUID
 
 AMBULANCE_NOT_FOUND = NotFoundError("ambulância")
+EQUIPMENT_NOT_FOUND = NotFoundError("equipamento")
+
+AmbulanceRepositoryAsync = AsyncRepository(AmbulanceRepository)
 
 """
     Helpers
 """
-def add_ambulance_atributes(ambulance: Ambulance) -> AmbulanceFullResponseSchema:
-    """" Adiciona informações para ambulância para full schema """
+def __ambulance_full_schema__(ambulance: Ambulance, equipments: list[Equipment], driver: Driver | None) -> AmbulanceFullResponseSchema:
+    """ Monta o full schema com os equipamentos e o motorista já carregados """
 
-    ambulanceIdUnmasked = ambulance.str_id
-
-    equipments = AmbulanceRepository.find_ambulance_equipments_by_id(ambulanceIdUnmasked)
-    driver = AmbulanceRepository.find_driver_by_ambulance_id(ambulanceIdUnmasked)
-    driverId = driver.uuid_id if driver else None
+    driverId = mask_uuid(driver.id_id) if driver else None
 
     ambulanceDict = model_to_dict(ambulance, recurse=False)
     equipmentsDict = list(map(lambda e: model_to_dict(e, recurse=False), equipments)) or []
@@ -47,32 +49,78 @@ def add_ambulance_atributes(ambulance: Ambulance) -> AmbulanceFullResponseSchema
 
     return AmbulanceFullResponseSchema.model_validate(ambulanceDict)
 
+async def add_ambulance_atributes(ambulance: Ambulance) -> AmbulanceFullResponseSchema:
+    """" Adiciona informações para ambulância para full schema """
+
+    ambulanceIdUnmasked = ambulance.str_id
+
+    equipments = await AmbulanceRepositoryAsync.find_ambulance_equipments_by_id(ambulanceIdUnmasked)
+    driver = await AmbulanceRepositoryAsync.find_driver_by_ambulance_id(ambulanceIdUnmasked)
+
+    return __ambulance_full_schema__(ambulance, equipments, driver)
+
+async def add_ambulances_atributes(ambulances: list[Ambulance]) -> list[AmbulanceFullResponseSchema]:
+    """ Adiciona informações para uma lista de ambulâncias, com uma consulta para equipamentos e outra para motoristas """
+
+    if not ambulances:
+        return []
+
+    ambulanceIds = [ambulance.str_id for ambulance in ambulances]
+
+    equipments = await AmbulanceRepositoryAsync.find_equipments_by_ambulance_ids(ambulanceIds)
+    drivers = await AmbulanceRepositoryAsync.find_drivers_by_ambulance_ids(ambulanceIds)
+
+    equipmentsByAmbulance: dict[str, list[Equipment]] = {}
+    for equipment in equipments:
+        equipmentsByAmbulance.setdefault(str(equipment.id_ambulancia_id), []).append(equipment)
+
+    driverByAmbulance: dict[str, Driver] = {}
+    for driver in drivers:
+        driverByAmbulance.setdefault(str(driver.id_ambulancia_id), driver)
+
+    return [
+        __ambulance_full_schema__(ambulance, equipmentsByAmbulance.get(ambulance.str_id, []), driverByAmbulance.get(ambulance.str_id))
+        for ambulance in ambulances
+    ]
+
+def __update_ambulance_atomic__(ambulanceId: str, ambulanceUpdate: AmbulanceUpdateSchema) -> Ambulance:
+    """ Atualiza a ambulância em uma transação, roda inteira na mesma thread do banco """
+
+    with db.atomic() as atomic:
+        ambulanceUpdated = AmbulanceRepository.update_ambulance_ignore_none(ambulanceId, **ambulanceUpdate.model_dump())
+
+        if not ambulanceUpdated:
+            atomic.rollback()
+            raise InternalServerError()
+
+    return ambulanceUpdated
+
 """
     Criar
 """
-def create_ambulance(ambulance: AmbulanceCreateSchema) -> AmbulanceFullResponseSchema:
+async def create_ambulance(ambulance: AmbulanceCreateSchema) -> AmbulanceFullResponseSchema:
     """ Cria uma nova ambulância """
 
     ambulanceModel = Ambulance(**ambulance.model_dump())
     
     try:
-        ambulanceModel = AmbulanceRepository.create_ambulance(ambulanceModel)
+        ambulanceModel = await AmbulanceRepositoryAsync.create_ambulance(ambulanceModel)
     except IntegrityError:
         raise AlreadyExists("ambulância")
 
-    return add_ambulance_atributes(ambulanceModel)
+    return await add_ambulance_atributes(ambulanceModel)
 
-def create_equipment_by_ambulance_id(ambulanceId: UUID, equipmentCreate: EquipmentCreateSchema) -> EquipmentResponseSchema:
+async def create_equipment_by_ambulance_id(ambulanceId: UUID, equipmentCreate: EquipmentCreateSchema) -> EquipmentResponseSchema:
     """ Cria um novo equipamento e adiciona a respectiva ambulância do ambulanceId"""
 
-    if not AmbulanceRepository.ambulance_exits_by_id(unmask_uuid(ambulanceId)):
+    if not await AmbulanceRepositoryAsync.ambulance_exits_by_id(unmask_uuid(ambulanceId)):
         raise AMBULANCE_NOT_FOUND
     
     equipmentDict = equipmentCreate.model_dump()
     equipmentDict.update({"id_ambulancia": unmask_uuid(ambulanceId)})
 
     equipment = Equipment(**equipmentDict)
-    equipment = AmbulanceRepository.create_equipment(equipment)
+    equipment = await AmbulanceRepositoryAsync.create_equipment(equipment)
 
     return EquipmentResponseSchema.model_validate(equipment)
 
@@ -80,51 +128,46 @@ def create_equipment_by_ambulance_id(ambulanceId: UUID, equipmentCreate: Equipme
     Ler
 """
 
-def get_ambulances_by_page(page: int = 0, pageSize: int = 30) -> list[AmbulanceFullResponseSchema]:
-    """ Procura todos as ambulâncias presentes na página `page` """
+async def get_ambulances_by_page(page: int = 0, pageSize: int = 30, cursor: str | None = None) -> tuple[list[AmbulanceFullResponseSchema], str | None]:
+    """ Procura todos as ambulâncias presentes na página `page` (ou depois de `cursor`) e o cursor da próxima página """
 
     if pageSize > 30:
         pageSize = 30
 
-    ambulances = AmbulanceRepository.find_ambulances_by_page(page, pageSize)
-    return list(map(lambda a: add_ambulance_atributes(a), ambulances)) or []
+    ambulances = await AmbulanceRepositoryAsync.find_ambulances_by_page(page, pageSize, cursor)
+    nextCursor = AmbulanceRepository.AMBULANCE_KEYSET.next_cursor(ambulances, pageSize)
 
-def get_ambulance_by_id(ambulanceId: UUID) -> AmbulanceFullResponseSchema:
+    return (await add_ambulances_atributes(ambulances), nextCursor)
+
+async def get_ambulance_by_id(ambulanceId: UUID) -> AmbulanceFullResponseSchema:
     """ Procura uma ambulância pelo seu id """
 
     ambulanceIdUnmasked = unmask_uuid(ambulanceId)
 
-    ambulance = AmbulanceRepository.find_ambulance_by_id(ambulanceIdUnmasked)
+    ambulance = await AmbulanceRepositoryAsync.find_ambulance_by_id(ambulanceIdUnmasked)
     if not ambulance:
         raise AMBULANCE_NOT_FOUND
 
-    return add_ambulance_atributes(ambulance)
+    return await add_ambulance_atributes(ambulance)
 
 """
     Atualizar
 """
 
-def update_ambulance_by_id(id: UUID, ambulanceUpdate: AmbulanceUpdateSchema) -> AmbulanceFullResponseSchema:
+async def update_ambulance_by_id(id: UUID, ambulanceUpdate: AmbulanceUpdateSchema) -> AmbulanceFullResponseSchema:
     """ Atualiza uma ambulância pelo seu id """
 
-    ambulanceUpdated = None
-
-    if not AmbulanceRepository.ambulance_exits_by_id(unmask_uuid(id)):
+    if not await AmbulanceRepositoryAsync.ambulance_exits_by_id(unmask_uuid(id)):
         raise AMBULANCE_NOT_FOUND
 
-    with db.atomic() as atomic:
-        ambulanceUpdated = AmbulanceRepository.update_ambulance_ignore_none(unmask_uuid(id), **ambulanceUpdate.model_dump())
-
-        if not ambulanceUpdated:
-            atomic.rollback()
-            raise InternalServerError()
+    ambulanceUpdated = await run_in_db(__update_ambulance_atomic__, unmask_uuid(id), ambulanceUpdate)
         
-    return add_ambulance_atributes(ambulanceUpdated)
+    return await add_ambulance_atributes(ambulanceUpdated)
 
-def update_equipment_by_id(equipmentId: UUID, equipmentUpdate: EquipmentUpdateSchema) -> EquipmentResponseSchema:
+async def update_equipment_by_id(equipmentId: UUID, equipmentUpdate: EquipmentUpdateSchema) -> EquipmentResponseSchema:
     """ Atualiza um equipamento pelo seu ID """
 
-    equipmentUpdated = AmbulanceRepository.update_equipment_ignore_none(unmask_uuid(equipmentId), **equipmentUpdate.model_dump())
+    equipmentUpdated = await AmbulanceRepositoryAsync.update_equipment_ignore_none(unmask_uuid(equipmentId), **equipmentUpdate.model_dump())
 
     return EquipmentResponseSchema.model_validate(equipmentUpdated)
 
@@ -132,12 +175,14 @@ def update_equipment_by_id(equipmentId: UUID, equipmentUpdate: EquipmentUpdateSc
     Deletar
 """
 
-def delete_equipment_by_id(equipmentId: UUID) -> None:
+async def delete_equipment_by_id(equipmentId: UUID) -> None:
     """ Delete um equipamento pelo seu ID """
 
-    AmbulanceRepository.delete_equipment(unmask_uuid(equipmentId))
+    if not await AmbulanceRepositoryAsync.delete_equipment(unmask_uuid(equipmentId)):
+        raise EQUIPMENT_NOT_FOUND
 
-def delete_ambulance_by_id(ambulanceId: UUID) -> None:
+async def delete_ambulance_by_id(ambulanceId: UUID) -> None:
     """ Delete um ambulância pelo seu ID """
 
-    AmbulanceRepository.delete_ambulance(unmask_uuid(ambulanceId))
+    if not await AmbulanceRepositoryAsync.delete_ambulance(unmask_uuid(ambulanceId)):
+        raise AMBULANCE_NOT_FOUND
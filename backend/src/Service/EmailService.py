@@ -0,0 +1,188 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import httpx
+
+from src.Model.EmailOutbox import EmailOutbox
+from src.Repository import EmailOutboxRepository
+
+from src.DB.Executor import run_in_db_detached
+
+from src.Utils.env import get_env_var
+
+from src.Logging import Logging, Level
+
+MAILGUN_API_KEY = get_env_var("MAILGUN_API_KEY")
+MAILGUN_SANDBOX = get_env_var("MAILGUN_SANDBOX")
+# Pode apontar para um servidor HTTP local que imita o Mailgun (testes e desenvolvimento)
+MAILGUN_BASE_URL = get_env_var("MAILGUN_BASE_URL", "https://api.mailgun.net/v3") or "https://api.mailgun.net/v3"
+
+EMAIL_BATCH_SIZE = int(get_env_var("EMAIL_BATCH_SIZE", "20") or "20")
+EMAIL_MAX_ATTEMPTS = int(get_env_var("EMAIL_MAX_ATTEMPTS", "6") or "6")
+EMAIL_POLL_INTERVAL = float(get_env_var("EMAIL_POLL_INTERVAL", "30") or "30")
+EMAIL_RETRY_BASE = 5
+EMAIL_RETRY_MAX = 600
+# Tempo que um lote reservado fica com um worker antes de poder ser enviado por outro
+EMAIL_LEASE_SECONDS = float(get_env_var("EMAIL_LEASE_SECONDS", "120") or "120")
+
+class EmailDispatcher:
+    """
+    Envia os emails da tabela `email_saida` em segundo plano.
+    Usa um único `httpx.AsyncClient` com keep-alive, envia em lotes concorrentes e
+    reagenda falhas temporárias com backoff exponencial. Cada lote é reservado antes do envio,
+    assim cada worker do uvicorn pode ter o seu dispatcher sem enviar o mesmo email duas vezes.
+    """
+
+    def __init__(
+        self,
+        baseUrl: str,
+        apiKey: str | None,
+        sandbox: str | None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        batchSize: int = 20,
+        maxAttempts: int = 6,
+        pollInterval: float = 30,
+        leaseSeconds: float = 120
+    ) -> None:
+        self.baseUrl = baseUrl
+        self.apiKey = apiKey
+        self.sandbox = sandbox
+        self.transport = transport
+        self.batchSize = max(1, batchSize)
+        self.maxAttempts = max(1, maxAttempts)
+        self.pollInterval = pollInterval
+        self.leaseSeconds = leaseSeconds
+
+        self.__client__: httpx.AsyncClient | None = None
+        self.__wake__: asyncio.Event | None = None
+
+    @property
+    def is_configured(self) -> bool:
+        return bool(self.apiKey and self.sandbox)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self.__client__ is None:
+            self.__client__ = httpx.AsyncClient(
+                base_url=self.baseUrl,
+                auth=("api", self.apiKey or ""),
+                timeout=httpx.Timeout(10),
+                limits=httpx.Limits(max_connections=self.batchSize, max_keepalive_connections=self.batchSize),
+                transport=self.transport
+            )
+
+        return self.__client__
+
+    def notify(self) -> None:
+        """ Acorda o dispatcher para enviar um email recém enfileirado sem esperar o intervalo """
+        if self.__wake__ is not None:
+            self.__wake__.set()
+
+    async def send(self, email: EmailOutbox) -> httpx.Response:
+        return await self.client.post(
+            f"/{self.sandbox}.mailgun.org/messages",
+            data={
+                "from": f"Serviço SGA <postmaster@{self.sandbox}.mailgun.org>",
+                "to": email.destinatario,
+                "subject": email.assunto,
+                "template": email.template,
+                "h:X-Mailgun-Variables": email.variaveis
+            }
+        )
+
+    def retry_delay(self, attempts: int) -> float:
+        """ Segundos até a próxima tentativa depois de `attempts` falhas """
+        return min(EMAIL_RETRY_MAX, EMAIL_RETRY_BASE * 2 ** (attempts - 1))
+
+    async def dispatch_pending(self) -> int:
+        """ Reserva e envia um lote de emails pendentes e retorna quantos foram enviados """
+        owner = uuid4().hex
+        leaseUntil = datetime.now(timezone.utc) + timedelta(seconds=self.leaseSeconds)
+
+        emails = await run_in_db_detached(EmailOutboxRepository.claim_due_emails, owner, self.batchSize, leaseUntil)
+
+        if not emails:
+            return 0
+
+        responses = await asyncio.gather(*(self.send(email) for email in emails), return_exceptions=True)
+
+        sent: list[str] = []
+        retries: list[tuple[str, int, datetime, str]] = []
+        failed: list[tuple[str, int, str]] = []
+
+        for (email, response) in zip(emails, responses):
+            attempts = email.tentativas + 1
+
+            if isinstance(response, httpx.Response) and response.is_success:
+                sent.append(email.str_id)
+                continue
+
+            if isinstance(response, httpx.Response):
+                error = f"HTTP {response.status_code}: {response.text[:200]}"
+                permanent = response.is_client_error and response.status_code != 429
+            elif isinstance(response, httpx.HTTPError):
+                error = f"{type(response).__name__}: {response}"
+                permanent = False
+            else:
+                raise response
+
+            if permanent or attempts >= self.maxAttempts:
+                failed.append((email.str_id, attempts, error))
+                Logging.log(f"Email {email.str_id} descartado após {attempts} tentativas: {error}", Level.ERROR)
+            else:
+                nextAttempt = datetime.now(timezone.utc) + timedelta(seconds=self.retry_delay(attempts))
+                retries.append((email.str_id, attempts, nextAttempt, error))
+                Logging.log(f"Falha ao enviar email {email.str_id}, nova tentativa em {self.retry_delay(attempts):.0f}s: {error}", Level.WARN)
+
+        await run_in_db_detached(EmailOutboxRepository.update_dispatch_results, owner, sent, retries, failed)
+
+        return len(sent)
+
+    async def run_forever(self) -> None:
+        """ Envia os pendentes ao ser notificado ou a cada `pollInterval` segundos """
+        self.__wake__ = asyncio.Event()
+
+        while True:
+            try:
+                while await self.dispatch_pending() == self.batchSize:
+                    pass
+            except Exception as e:
+                Logging.log(f"Erro no envio de emails: {e}", Level.ERROR)
+
+            try:
+                await asyncio.wait_for(self.__wake__.wait(), timeout=self.pollInterval)
+            except asyncio.TimeoutError:
+                pass
+
+            self.__wake__.clear()
+
+    async def close(self) -> None:
+        if self.__client__ is not None:
+            await self.__client__.aclose()
+            self.__client__ = None
+
+EMAIL_DISPATCHER = EmailDispatcher(
+    MAILGUN_BASE_URL,
+    MAILGUN_API_KEY,
+    MAILGUN_SANDBOX,
+    batchSize=EMAIL_BATCH_SIZE,
+    maxAttempts=EMAIL_MAX_ATTEMPTS,
+    pollInterval=EMAIL_POLL_INTERVAL,
+    leaseSeconds=EMAIL_LEASE_SECONDS
+)
+
+"""
+    Criar
+"""
+
+def enqueue_email(to: str, subject: str, template: str, variables: dict[str, str]) -> EmailOutbox:
+    """ Salva um email na fila de envio, o envio acontece em segundo plano """
+
+    return EmailOutboxRepository.create_email(EmailOutbox(
+        destinatario=to,
+        assunto=subject,
+        template=template,
+        variaveis=json.dumps(variables)
+    ))
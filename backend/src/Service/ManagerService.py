@@ -29,7 +29,7 @@ from src.Error.Resource.NotFoundResourceError import NotFoundResource
 
 from src.DB import db
 
-from datetime import datetime
+from datetime import datetime, timezone
 from uuid import UUID
 
 NOT_FOUND_AMBULANCE = NotFoundError("ambulance", "Não foi possível encontrar a ambulância.")
@@ -47,7 +47,7 @@ def generate_manager_token_list(tokenNumber: int) -> list[UpgradeToken]:
 
     countToken = ManagerRepository.count_token()
     if countToken >= tokenNumber:
-        return ManagerRepository.find_all_tokens()
+        return ManagerRepository.find_unused_tokens_by_role(UserRole.MANAGER)
 
     generateTokens = list(map(lambda n: UpgradeToken(fator_cargo=2), range(tokenNumber)))
     tokens = ManagerRepository.bulk_create_token(generateTokens)
@@ -114,7 +114,7 @@ def upgrade_user_to_manager(user: User, token: UpgradeToken, driverFields: Drive
         ManagerRepository.update_token_by_id(
             unmask_uuid(token.id),
             usado=True,
-            revogado_em=datetime.now(),
+            revogado_em=datetime.now(timezone.utc),
             usuario=user.id
         )
 
@@ -153,7 +153,7 @@ def upgrade_user_to_driver(user: User, token: UpgradeToken, driverFields: Driver
         ManagerRepository.update_token_by_id(
             unmask_uuid(token.id),
             usado=True,
-            revogado_em=datetime.now(),
+            revogado_em=datetime.now(timezone.utc),
             usuario=userUpdated.id
         )
 
@@ -0,0 +1,48 @@
+from src.Repository import SessionRepository
+from src.DB.Sweeper import SWEEPER
+from src.DB.Connection import pool_stats
+from src.DB.Executor import executor_stats
+from src.DB.SlowQueryLog import SLOW_QUERY_LOG
+from src.DB import db
+
+from src.Schema.Monitoring.CacheStatsSchema import CacheStatsSchema
+from src.Schema.Monitoring.SweepStatsSchema import SweepStatsSchema
+from src.Schema.Monitoring.PoolStatsSchema import PoolStatsSchema
+from src.Schema.Monitoring.ExecutorStatsSchema import ExecutorStatsSchema
+from src.Schema.Monitoring.SlowQuerySchema import SlowQuerySchema
+
+from src.Error.Resource.NotFoundResourceError import NotFoundResource
+
+"""
+    Ler
+"""
+
+def get_session_cache_stats() -> CacheStatsSchema:
+    """ Retorna os contadores do cache de autenticação (sessão -> usuário) """
+
+    return CacheStatsSchema.model_validate(SessionRepository.session_cache_stats())
+
+def get_last_sweep_stats() -> list[SweepStatsSchema]:
+    """ Retorna as linhas removidas e o tempo de cada tabela na última varredura de expirados """
+
+    return [SweepStatsSchema.model_validate({"tabela": table, **stats}) for (table, stats) in SWEEPER.lastReport.items()]
+
+def get_db_pool_stats() -> PoolStatsSchema:
+    """ Retorna os contadores do pool de conexões do banco """
+
+    stats = pool_stats(db.obj)
+
+    if stats is None:
+        raise NotFoundResource("pool", "O banco de dados atual não usa pool de conexões.")
+
+    return PoolStatsSchema.model_validate(stats)
+
+def get_db_executor_stats() -> list[ExecutorStatsSchema]:
+    """ Retorna os contadores dos pools de threads que executam as consultas ao banco """
+
+    return [ExecutorStatsSchema.model_validate(stats) for stats in executor_stats()]
+
+def get_slow_queries() -> list[SlowQuerySchema]:
+    """ Retorna as consultas lentas mais recentes, com o plano da primeira ocorrência de cada uma """
+
+    return [SlowQuerySchema.model_validate(entry) for entry in SLOW_QUERY_LOG.recent()]
@@ -4,8 +4,10 @@ from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 
 from src.Utils.env import get_env_var
 from src.Utils import env
+from src.Utils.limiter import hit_email_limit, LOGIN_EMAIL_LIMIT, RESTORE_EMAIL_LIMIT
 
 from src.Repository import UserRepository, RestorePasswordRepository
+from src.Service import EmailService
 
 from src.Schema.Auth.RevokeSessionSchema import RevokeSessionSchema
 from src.Schema.Auth.UserSessionListSchema import UserSessionListSchema
@@ -19,18 +21,19 @@ from src.Schema.Auth.RestorePasswordResponseSchema import RestorePasswordRespons
 from src.Error.User.UserInvalidCredentials import invalidCredentials
 from src.Error.Server.InternalServerError import InternalServerError
 from src.Error.Resource.NotFoundResourceError import NotFoundResource
-from src.Error.Server.TryAgainLater import TryAgainLater
 
 from src.Model.UserSession import Session
 from src.Model.RestorePassword import RestorePassword
 from src.Model.User import User
 
 from src.Repository import SessionRepository
+from src.Repository.AsyncRepository import AsyncRepository
 
 from typing import Annotated
 
 import jwt
 from passlib.context import CryptContext
+from passlib.hash import bcrypt
 from uuid import UUID
 
 from src.Error.User.UserRBACError import UserRBACError
@@ -42,34 +45,116 @@ from src.Validator.GenericValidator import unmask_uuid
 from datetime import datetime, timezone, timedelta
 
 from src.Utils import env
-import httpx
 
 from pydantic import EmailStr
 
 from src.Logging import Logging, Level
 
+from src.Utils.executor import BoundedExecutor
+from src.DB import db
+from src.DB.Executor import run_in_db, run_in_db_detached
+
+import os
+import asyncio
+import contextvars
+from math import floor, log2
+from statistics import median
+from time import perf_counter
+
 TOKEN_SCHEME = Annotated[str, Depends(OAuth2PasswordBearer(tokenUrl="token"))]
 
 PWD_CONTEXT = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Tempo alvo de um hash bcrypt, o custo é calibrado na inicialização (BCRYPT_ROUNDS fixa o custo)
+BCRYPT_TARGET_MS = float(get_env_var("BCRYPT_TARGET_MS", "250") or "250")
+BCRYPT_MIN_ROUNDS = int(get_env_var("BCRYPT_MIN_ROUNDS", "10") or "10")
+BCRYPT_MAX_ROUNDS = int(get_env_var("BCRYPT_MAX_ROUNDS", "16") or "16")
+BCRYPT_ROUNDS = get_env_var("BCRYPT_ROUNDS", "")
+
+REHASH_TASKS: set[asyncio.Task] = set()
+
+PASSWORD_EXECUTOR = BoundedExecutor(
+    maxWorkers=int(get_env_var("PASSWORD_WORKERS", str(min(4, os.cpu_count() or 1))) or "1"),
+    queueLimit=int(get_env_var("PASSWORD_QUEUE_LIMIT", "64") or "64"),
+    name="bcrypt"
+)
+
+SessionRepositoryAsync = AsyncRepository(SessionRepository)
+UserRepositoryAsync = AsyncRepository(UserRepository)
+
 SECRET_KEY = get_env_var("secret_key_jwt", "CHANGEME")
 ALGORITHM = get_env_var("algorithm_jwt", "HS256")
 
+# "session": todo token é validado contra a tabela `sessao`
+# "stateless": o token de acesso carrega exp, id do usuário e cargo e é validado sem consultar o banco
+TOKEN_MODE = get_env_var("TOKEN_MODE", "session")
+
 """
     Helpers
 """
 
-def get_password_hash(password: str) -> str:
-    """ Gera um hash da senha para ser armazenada no banco de dados """
-    return PWD_CONTEXT.hash(password)
+async def get_password_hash(password: str) -> str:
+    """ Gera um hash da senha para ser armazenada no banco de dados,
+    o bcrypt roda no pool de senhas para não bloquear o event loop """
+    return await PASSWORD_EXECUTOR.run(PWD_CONTEXT.hash, password)
 
-def verify_password(plain_password: str, hash_password: str) -> bool:
+async def verify_password(plain_password: str, hash_password: str) -> bool:
     """ Verifica o hash da senha comparando o hash da senha atual
-    com a armazenada no banco de dados """
-    return PWD_CONTEXT.verify(plain_password, hash_password)
+    com a armazenada no banco de dados, o bcrypt roda no pool de senhas """
+    return await PASSWORD_EXECUTOR.run(PWD_CONTEXT.verify, plain_password, hash_password)
+
+def benchmark_bcrypt_rounds(targetMs: float, minRounds: int, maxRounds: int, samples: int = 3) -> tuple[int, float]:
+    """ Mede o hash com `minRounds` e escolhe o maior custo cujo tempo estimado não passa de `targetMs`.
+    Cada round a mais dobra o tempo do bcrypt. Retorna (rounds, tempo estimado em ms) """
+    timings = []
+
+    for _ in range(samples):
+        start = perf_counter()
+        bcrypt.using(rounds=minRounds).hash("calibracao-bcrypt")
+        timings.append((perf_counter() - start) * 1000)
+
+    baseMs = max(median(timings), 0.001)
+    extraRounds = floor(log2(targetMs / baseMs)) if targetMs > baseMs else 0
+    rounds = min(maxRounds, minRounds + extraRounds)
+
+    return (rounds, baseMs * 2 ** (rounds - minRounds))
+
+def calibrate_password_cost() -> int:
+    """ Define o custo padrão do bcrypt para a máquina atual, hashes com custo menor
+    passam a ser refeitos no próximo login (veja `rehash_password_in_background`) """
+    if BCRYPT_ROUNDS:
+        rounds = int(BCRYPT_ROUNDS)
+        Logging.log(f"Custo do bcrypt fixado em {rounds} rounds", Level.INFO)
+    else:
+        (rounds, estimatedMs) = benchmark_bcrypt_rounds(BCRYPT_TARGET_MS, BCRYPT_MIN_ROUNDS, BCRYPT_MAX_ROUNDS)
+        Logging.log(f"Custo do bcrypt calibrado em {rounds} rounds (~{estimatedMs:.0f}ms, alvo {BCRYPT_TARGET_MS:.0f}ms)", Level.INFO)
+
+    PWD_CONTEXT.update(bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds)
+
+    return rounds
+
+async def rehash_password(userModel: User, plain_password: str) -> None:
+    """ Refaz o hash da senha com o custo atual, a gravação usa uma conexão própria
+    porque a requisição do login pode já ter devolvido a sua """
+    newHash = await get_password_hash(plain_password)
 
-def create_session(userEmail: str, plain_password: str, userIP: str, is_refresh: bool = False) -> Session:
-    """ Cria uma nova sessão """
+    if await run_in_db_detached(UserRepository.update_password_hash, userModel.str_id, userModel.senha, newHash):
+        Logging.log(f"Hash da senha do usuário {userModel.str_id} atualizado", Level.DEBUG)
+
+def log_rehash_error(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        Logging.log(f"Falha ao refazer o hash da senha: {task.exception()!r}", Level.ERROR)
+
+def rehash_password_in_background(userModel: User, plain_password: str) -> None:
+    """ Agenda o rehash da senha sem atrasar a resposta do login, em um contexto vazio
+    para não herdar a conexão nem o roteamento da requisição """
+    task = asyncio.create_task(rehash_password(userModel, plain_password), context=contextvars.Context())
+    REHASH_TASKS.add(task)
+    task.add_done_callback(REHASH_TASKS.discard)
+    task.add_done_callback(log_rehash_error)
+
+async def authenticate_user(userEmail: str, plain_password: str) -> User:
+    """ Busca o usuário pelo email e verifica sua senha uma única vez """
     userModel = UserRepository.find_by_email(userEmail)
     credentialsException = HTTPException(status.HTTP_401_UNAUTHORIZED, "Email ou senha incorretos")
     userNotExists = HTTPException(status.HTTP_404_NOT_FOUND, "Usuário não registrado")
@@ -77,49 +162,116 @@ def create_session(userEmail: str, plain_password: str, userIP: str, is_refresh:
     if userModel is None:
         raise userNotExists
     
-    if not verify_password(plain_password, userModel.senha):
+    if not await verify_password(plain_password, userModel.senha):
         raise credentialsException
 
+    if PWD_CONTEXT.needs_update(userModel.senha):
+        rehash_password_in_background(userModel, plain_password)
+
+    return userModel
+
+def new_session(userModel: User, userIP: str, is_refresh: bool = False) -> Session:
+    """ Monta uma nova sessão (sem salvar no banco de dados) """
     time = {"days" if is_refresh else "minutes": 7 if is_refresh else 30}
 
-    valid_until = (datetime.now(timezone.utc) + timedelta(**time)).isoformat()
+    valid_until = datetime.now(timezone.utc) + timedelta(**time)
 
-    sessionModel = Session(
+    return Session(
         usuario=userModel,
         ip=userIP,
         refresh=is_refresh,
         valido_ate=valid_until
     )
 
-    SessionRepository.insert_session(sessionModel)
+def create_session_pair(userModel: User, userIP: str) -> tuple[Session, Session]:
+    """ Cria a sessão de acesso e a de refresh em uma única transação """
+    accessSession = new_session(userModel, userIP)
+    refreshSession = new_session(userModel, userIP, is_refresh=True)
 
-    return sessionModel
+    with db.atomic():
+        SessionRepository.insert_sessions([accessSession, refreshSession])
+
+    return (accessSession, refreshSession)
 
 def get_refresh_session(refreshToken: str, userIP: str) -> Session:
     """ Da refresh na sessão atual """
-    userModel = get_current_user(refreshToken)
+    auth = SessionRepository.find_cached_auth_by_session_id(decode_jwt_token(refreshToken))
 
-    if not userModel:
+    if auth is None:
         raise invalidCredentials()
 
-    valid_until = (datetime.now(timezone.utc) + timedelta(minutes=30)).isoformat()
+    (userModel, refreshSession) = auth
 
-    sessionModel = Session(
-        usuario=userModel,
-        ip=userIP,
-        refresh=False,
-        valido_ate=valid_until
-    )
+    if not refreshSession.is_refresh or refreshSession.is_expired:
+        raise invalidCredentials()
+
+    sessionModel = new_session(userModel, userIP)
 
     SessionRepository.insert_session(sessionModel)
 
     return sessionModel
 
-def encode_jwt_token(id: str) -> str:
-    """ Encoda em JWT uma sessão pelo ID da mesma """
+def is_stateless_mode() -> bool:
+    return bool(TOKEN_MODE == "stateless")
+
+def encode_jwt_token(id: str, session: Session | None = None) -> str:
+    """ Encoda em JWT uma sessão pelo ID da mesma, no modo stateless os tokens
+    de acesso também carregam exp, id do usuário, cargo e ip da sessão """
     content = {"sub": id}
+
+    if is_stateless_mode() and session is not None and not session.is_refresh:
+        content.update({
+            "typ": "access",
+            "uid": session.usuario.str_id,
+            "cargo": int(session.usuario.cargo),
+            "ip": session.ip,
+            "iat": int(datetime.now(timezone.utc).timestamp()),
+            "exp": int(session.valido_ate_datetime.timestamp())
+        })
+
     return jwt.encode(content, SECRET_KEY, algorithm=ALGORITHM)
 
+def decode_jwt_payload(token: str) -> dict:
+    """ Decoda um token JWT validando a assinatura e o `exp` quando presente """
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.PyJWTError:
+        raise invalidCredentials()
+
+    if not payload.get("sub"):
+        raise invalidCredentials()
+
+    return payload
+
+def decode_jwt_token(token: str) -> str:
+    """ Decoda um token JWT e retorna o ID da sessão contido nele """
+    return decode_jwt_payload(token)["sub"]
+
+def get_auth_from_claims(payload: dict) -> tuple[User, Session] | None:
+    """ Monta o usuário e a sessão a partir das claims de um token de acesso stateless,
+    retorna None quando o token precisa ser validado pelo banco de dados """
+    if payload.get("typ") != "access":
+        return None
+
+    sessionId = payload["sub"]
+
+    if SessionRepository.is_session_revoked(sessionId):
+        raise invalidCredentials()
+
+    if SessionRepository.are_user_claims_stale(payload["uid"], payload["iat"]):
+        return None
+
+    userModel = User(id=payload["uid"], cargo=payload["cargo"])
+    sessionModel = Session(
+        id=sessionId,
+        usuario=userModel,
+        ip=payload["ip"],
+        refresh=False,
+        valido_ate=datetime.fromtimestamp(payload["exp"], timezone.utc)
+    )
+
+    return (userModel, sessionModel)
+
 def datetime_to_http_datetime(date: datetime) -> str:
     return date.strftime("%a, %d %b %Y %H:%M:%S GMT")
 
@@ -141,68 +293,50 @@ def create_restore_password_code(userEmail: EmailStr) -> tuple[RestorePassword,
 
     return (restorePassword, user)
 
-def append_query_params(base: str, key: list[str], value: list[str]) -> str:
-    last = base
+def enqueue_restore_password_email(userEmail: EmailStr, restoreRoute: str) -> None:
+    """ Cria o código de restauração e coloca o email dele na fila na mesma transação """
 
-    for (k, v) in zip(key, value):
-        separator = "&" if last.find("?") > 0 else "?"
-        last = "".join([last, separator, k, "=", v])
+    with db.atomic():
+        (restoreCode, user) = create_restore_password_code(userEmail)
 
-    return last
+        restoreUrl = f"{restoreRoute}/{restoreCode.uuid_id}"
 
+        EmailService.enqueue_email(
+            str(userEmail),
+            "SGA Código de recuperação de senha",
+            "password-restore",
+            {"RESTORE_CODE": str(restoreCode.uuid_id), "USERNAME": user.nome, "RESTORE_LINK": restoreUrl}
+        )
 
 """
     Criar
 """
 
 async def send_restore_password_email(userRestore: AuthRestorePasswordSchema) -> RestorePasswordResponseSchema:
-    (restoreCode, user) = create_restore_password_code(userRestore.userEmail)
+    hit_email_limit("restore-password", RESTORE_EMAIL_LIMIT, str(userRestore.userEmail))
 
-    mailGunApiKey = env.get_env_var("MAILGUN_API_KEY")
-    mailGunSandbox = env.get_env_var("MAILGUN_SANDBOX")
-    urlBase = f"https://api.mailgun.net/v3/{mailGunSandbox}.mailgun.org/messages"
-    mailGunFrom = f"Serviço SGA <postmaster@{mailGunSandbox}.mailgun.org>"
     frontendBaseUrl = env.get_env_var("FRONTEND_BASE_URL")
     frontendRestoreRoute = env.get_env_var("FRONTEND_RESTORE_ROUTE")
 
-    if not mailGunApiKey or not mailGunSandbox or not frontendBaseUrl or not frontendRestoreRoute:
+    if not EmailService.EMAIL_DISPATCHER.is_configured or not frontendBaseUrl or not frontendRestoreRoute:
         Logging.log("Chaves para envio de email não foram configuradas!", Level.ERROR)
         raise InternalServerError()
-    
-    restoreUrl = f"{frontendBaseUrl}{frontendRestoreRoute}/{restoreCode.uuid_id}"
-
-    keys = ["from", "to", "subject", "template", "h:X-Mailgun-Variables"]
-    values = [
-        mailGunFrom,
-        userRestore.userEmail,
-        "SGA Código de recuperação de senha",
-        "password-restore",
-        f"{{\"RESTORE_CODE\": \"{restoreCode.uuid_id}\",\"USERNAME\": \"{user.nome}\", \"RESTORE_LINK\": \"{restoreUrl}\"}}"
-    ]
-
-    url = append_query_params(urlBase, keys, values)
-    
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            url,
-            headers={"api": mailGunApiKey},
-            auth=("api", mailGunApiKey)
-        )
 
-        if response.status_code != status.HTTP_200_OK:
-            raise TryAgainLater("Erro no envio do email! tente novamente mais tarde")
-        
+    await run_in_db(enqueue_restore_password_email, userRestore.userEmail, f"{frontendBaseUrl}{frontendRestoreRoute}")
+
+    EmailService.EMAIL_DISPATCHER.notify()
+
     return RestorePasswordResponseSchema.model_validate({"userMessage":str(userRestore.userEmail)})
         
 async def restore_user_password(userRestore: AuthSetRestorePasswordSchema) -> UserResponseFullSchema:
-    restorePassword = RestorePasswordRepository.find_restore_password_by_id(unmask_uuid(userRestore.restoreCode))
+    restorePassword = RestorePasswordRepository.find_valid_restore_password_by_id(unmask_uuid(userRestore.restoreCode))
 
     if not restorePassword:
         raise NotFoundResource("user_restore", "Não foi possível encontrar o usuário para restaurar a senha.")
     
     userId = restorePassword.usuario_str_id
 
-    newPassword = get_password_hash(userRestore.newPassword)
+    newPassword = await get_password_hash(userRestore.newPassword)
 
     user = UserRepository.update_user_by_id(userId, senha=newPassword)
 
@@ -211,26 +345,25 @@ async def restore_user_password(userRestore: AuthSetRestorePasswordSchema) -> Us
     
     return UserResponseFullSchema.model_validate(user)
 
-def generate_access_token(request: Request, formdata: OAuth2PasswordRequestForm) -> Response:
+async def generate_access_token(request: Request, formdata: OAuth2PasswordRequestForm) -> Response:
     userIP = get_ipaddr(request)
 
-    accessSession = create_session(
-        formdata.username, formdata.password, userIP
-    )
+    hit_email_limit("login", LOGIN_EMAIL_LIMIT, formdata.username)
 
-    refreshSession = create_session(
-        formdata.username, formdata.password, userIP, is_refresh=True
-    )
+    userModel = await authenticate_user(formdata.username, formdata.password)
 
-    accessToken = encode_jwt_token(accessSession.str_id)
-    refreshToken = encode_jwt_token(refreshSession.str_id)
+    (accessSession, refreshSession) = create_session_pair(userModel, userIP)
 
-    accessExpires = datetime.fromisoformat(str(accessSession.valido_ate))
-    refreshExpires = datetime.fromisoformat(str(refreshSession.valido_ate))
+    accessToken = encode_jwt_token(accessSession.str_id, accessSession)
+    refreshToken = encode_jwt_token(refreshSession.str_id, refreshSession)
+
+    accessExpires = accessSession.valido_ate_datetime
+    refreshExpires = refreshSession.valido_ate_datetime
 
     response = Response(
         content=TokenResponseSchema.model_validate({"access_token": accessToken, "token_type": "bearer", "expires_at": accessExpires.isoformat()}).model_dump_json(),
-        media_type="application/json"
+        media_type="application/json",
+        status_code=status.HTTP_201_CREATED
     )
     response = set_http_only_cookie(response, "Authorization", accessToken, accessExpires)
     response = set_http_only_cookie(response, "refreshToken", refreshToken, refreshExpires)
@@ -248,9 +381,9 @@ def refresh_access_token(request: Request) -> Response:
 
     accessSession = get_refresh_session(refreshToken, userIP)
 
-    accessToken = encode_jwt_token(accessSession.str_id)
+    accessToken = encode_jwt_token(accessSession.str_id, accessSession)
 
-    accessExpires = datetime.fromisoformat(str(accessSession.valido_ate))
+    accessExpires = accessSession.valido_ate_datetime
 
     response = Response(
         content=TokenResponseSchema.model_validate({"access_token": accessToken, "token_type": "bearer", "expires_at": accessExpires.isoformat()}).model_dump_json(),
@@ -264,44 +397,57 @@ def refresh_access_token(request: Request) -> Response:
     Ler
 """
 
-def get_current_session_by_token(token: TOKEN_SCHEME | str) -> Session:
-    """ Retorna a sessão pelo token """
+async def get_current_auth_by_token(token: TOKEN_SCHEME | str) -> tuple[User, Session]:
+    """ Retorna o usuário e a sessão pelo token, decodificando o JWT uma única vez
+    e buscando ambos em uma única consulta (fora do event loop quando não estão no cache) """
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        id = payload.get("sub")
-    except:
-        raise invalidCredentials()
-    
+    payload = decode_jwt_payload(token)
 
-    sessionModel = SessionRepository.find_session_by_session_id(id)
+    if is_stateless_mode():
+        auth = get_auth_from_claims(payload)
 
-    if sessionModel is None:
-        raise invalidCredentials()
+        if auth is not None:
+            return auth
 
-    return sessionModel
+    auth = SessionRepository.find_auth_in_cache(payload["sub"])
 
-def get_current_user(token: TOKEN_SCHEME | str) -> User:
-    """ Retorna o usuário pelo token """
+    if auth is None:
+        auth = await SessionRepositoryAsync.cache_auth_by_session_id(payload["sub"])
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        id = payload.get("sub")
-    except:
+    if auth is None:
         raise invalidCredentials()
-    
 
-    userModel = SessionRepository.find_user_by_session_id(id)
+    return auth
+
+async def get_full_user(user: User) -> User:
+    """ Carrega todos os campos de um usuário montado a partir das claims do token """
+    if not user.is_claims_only:
+        return user
+
+    userModel = await UserRepositoryAsync.find_by_id(user.str_id)
 
     if userModel is None:
         raise invalidCredentials()
 
     return userModel
 
-def get_user_sessions(token: TOKEN_SCHEME) -> UserSessionListSchema:
+async def get_current_session_by_token(token: TOKEN_SCHEME | str) -> Session:
+    """ Retorna a sessão pelo token """
+
+    (userModel, sessionModel) = await get_current_auth_by_token(token)
+
+    return sessionModel
+
+async def get_current_user(token: TOKEN_SCHEME | str) -> User:
+    """ Retorna o usuário pelo token """
+
+    (userModel, sessionModel) = await get_current_auth_by_token(token)
+
+    return userModel
+
+def get_user_sessions(user: User) -> UserSessionListSchema:
     """ Encontra as sessões de um usuário """
 
-    user = get_current_user(token)
     return UserSessionListSchema.model_validate({
         "usuario": user,
         "sessoes": SessionRepository.find_all_by_user(user)
@@ -312,7 +458,7 @@ def get_user_sessions(token: TOKEN_SCHEME) -> UserSessionListSchema:
 """
 
 def logout(session: Session) -> Response:
-    response = Response()
+    response = Response(status_code=status.HTTP_204_NO_CONTENT)
     response.delete_cookie("Authorization")
     response.delete_cookie("refreshToken")
 
@@ -324,15 +470,13 @@ def logout(session: Session) -> Response:
     Deletar
 """
 
-def revoke_session(token: TOKEN_SCHEME, sessionSchema: RevokeSessionSchema) -> None:
+def revoke_session(session: Session, sessionSchema: RevokeSessionSchema) -> None:
     """ Revoga uma sessão pelo id da mesma """
 
-    mySessionId = jwt.decode(token, SECRET_KEY, ALGORITHM).get("sub")
-
-    if UUID(mySessionId) == sessionSchema.id_sessao:
+    if session.compare_uuid(sessionSchema.id_sessao):
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "Impossível revogar o próprio token")
     
-    if SessionRepository.find_user_by_session_id(sessionSchema.id_sessao) is not None:
+    if SessionRepository.find_session_by_session_id(unmask_uuid(sessionSchema.id_sessao)) is not None:
         SessionRepository.delete_token_by_id(sessionSchema.id_sessao)
     else:
         raise NotFoundResource("token", "Token não encontrado.")
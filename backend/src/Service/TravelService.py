@@ -1,132 +1,373 @@
-from src.Repository import TravelRepository
+from src.Repository import TravelRepository, DriverRepository, UserRepository
+from src.Repository.AsyncRepository import AsyncRepository
 
 from fastapi import HTTPException, status
+from peewee import Expression, IntegrityError, DataError
+from pydantic import ValidationError
 
 from src.Model.Travel import Travel
 from src.Model.User import User 
+from src.Model.Driver import Driver
+
+from playhouse.shortcuts import model_to_dict
+
+from src.DB import db
+from src.DB.Executor import run_in_db
 
 from uuid import UUID
 from datetime import datetime, timezone
+from typing import AsyncIterator, Callable
 
 from src.Validator.GenericValidator import unmask_uuid, mask_uuid
 
 from src.Schema.Travel.TravelResponseSchema import TravelResponseSchema
+from src.Schema.Travel.TravelFullResponseSchema import TravelFullResponseSchema
+from src.Schema.Driver.DriverResponseSchema import DriverResponseSchema
+from src.Schema.Ambulance.AmbulanceFullResponseSchema import AmbulanceFullResponseSchema
 from src.Schema.Travel.TravelCreateSchema import TravelCreateSchema
+from src.Schema.Travel.TravelFilterSchema import TravelFilterSchema
 from src.Schema.Travel.TravelRealizedEnum import TravelRealized
+from src.Schema.Travel.TravelImportErrorSchema import TravelImportErrorSchema
+from src.Schema.Travel.TravelImportResponseSchema import TravelImportResponseSchema
 
 from src.Validator.TravelValidator import TravelValidator
 
 from src.Error.User.NotUserResourceError import NotUserResource
 from src.Error.Base.NotFoundError import NotFoundError
+from src.Error.Base.ErrorClass import ErrorClass
+from src.Error.Resource.UnsupportedMediaTypeError import UnsupportedMediaType
+
+from src.Utils.env import get_env_var
+from src.Utils.records import CSV_MEDIA_TYPES, NDJSON_MEDIA_TYPES, read_csv, read_ndjson
+
+from src.Service.AmbulanceService import add_ambulances_atributes
 
 NOT_USER_RESOURCE = NotUserResource()
+TRAVEL_STATE_CHANGED = ErrorClass("travel_state_changed", "O estado do transporte mudou durante a operação, tente novamente.", status.HTTP_409_CONFLICT)
+
+TravelRepositoryAsync = AsyncRepository(TravelRepository)
+DriverRepositoryAsync = AsyncRepository(DriverRepository)
+
+# Linhas válidas gravadas por transação na importação em lote
+TRAVEL_IMPORT_BATCH_SIZE = int(get_env_var("TRAVEL_IMPORT_BATCH_SIZE", "500") or "500")
 
 """
-    Criar
+    Helpers
 """
 
-def create_travel(travel: TravelCreateSchema, user: User) -> TravelResponseSchema:
-    """ Cria uma nova viagem """
+class TravelTransition:
+    """
+    Mudança de estado de uma viagem feita com um único UPDATE condicional: `condition` é o estado
+    de onde ela pode sair para o usuário que pediu e `values` o que ela grava. Quando nenhuma linha
+    muda, `validate` lê a viagem atual e levanta o erro da condição que falhou.
+    `driverInTravel` é o `em_viagem` do motorista gravado na mesma transação (None não altera) e
+    `repeated` diz quando o pedido já foi atendido antes, nesse caso a viagem volta sem erro.
+    """
+
+    def __init__(
+        self,
+        condition: Callable[[User], Expression],
+        values: Callable[[], dict],
+        validate: Callable[[TravelValidator], None],
+        driverInTravel: bool | None = None,
+        repeated: Callable[[TravelResponseSchema], bool] | None = None
+    ) -> None:
+        self.condition = condition
+        self.values = values
+        self.validate = validate
+        self.driverInTravel = driverInTravel
+        self.repeated = repeated
+
+START_TRAVEL = TravelTransition(
+    condition=lambda driver: (
+        (Travel.id_motorista == driver.id) & (Travel.realizado == TravelRealized.NAO_REALIZADO)
+        & (Travel.cancelada == False) & Travel.id_ambulancia.is_null(False)
+    ),
+    values=lambda: {"realizado": TravelRealized.EM_PROGRESSO},
+    validate=TravelValidator.validate_start_travel,
+    driverInTravel=True
+)
+
+END_TRAVEL = TravelTransition(
+    condition=lambda driver: (
+        (Travel.id_motorista == driver.id) & (Travel.realizado == TravelRealized.EM_PROGRESSO)
+        & (Travel.cancelada == False) & Travel.id_ambulancia.is_null(False)
+    ),
+    values=lambda: {"realizado": TravelRealized.REALIZADO, "fim": datetime.now(timezone.utc)},
+    validate=TravelValidator.validate_end_travel,
+    driverInTravel=False
+)
+
+CANCEL_TRAVEL = TravelTransition(
+    condition=lambda patient: (
+        (Travel.id_paciente == patient.id) & (Travel.realizado == TravelRealized.NAO_REALIZADO) & (Travel.cancelada == False)
+    ),
+    values=lambda: {"cancelada": True},
+    validate=TravelValidator.validate_cancel_travel,
+    repeated=lambda travel: travel.cancelada
+)
+
+def __transition_atomic__(transition: TravelTransition, travelId: str, user: User) -> tuple[Travel | None, Travel | None]:
+    """ Aplica a transição e o `em_viagem` do motorista em uma transação, roda inteira na mesma thread do banco.
+    Retorna a viagem alterada ou, quando nenhuma linha mudou, a viagem atual para escolher o erro """
+
+    with db.atomic():
+        travel = TravelRepository.transition_travel(travelId, transition.condition(user), **transition.values())
+
+        if travel is None:
+            # Lida na mesma transação, e por isso no principal: uma réplica atrasada daria o erro errado
+            return (None, TravelRepository.find_travel_by_id(travelId))
+
+        if transition.driverInTravel is not None:
+            DriverRepository.update_driver_by_id(user.str_id, em_viagem=transition.driverInTravel)
+
+    return (travel, None)
+
+async def __transition_travel__(transition: TravelTransition, user: User, travelId: UUID) -> TravelResponseSchema:
+    travelId = unmask_uuid(travelId)
+    (travel, current) = await run_in_db(__transition_atomic__, transition, travelId, user)
 
-    travelDict = travel.model_dump()
-    
-    travelModel = Travel(**travelDict)
-    travelModel.id_paciente = user.str_id
+    if travel is not None:
+        return TravelResponseSchema.model_validate(travel)
+
+    if current is None:
+        raise NotFoundError("transporte")
+
+    # Nenhuma linha mudou, a viagem lida depois do UPDATE escolhe o erro
+    current = TravelResponseSchema.model_validate(current)
+    transition.validate(TravelValidator(current, user))
+
+    if transition.repeated is not None and transition.repeated(current):
+        return current
+
+    # Passou na validação: outra requisição mudou a viagem entre o UPDATE e a leitura
+    raise TRAVEL_STATE_CHANGED
+
+def __travel_full_schema__(travel: Travel, driver: Driver | None, ambulance: AmbulanceFullResponseSchema | None) -> TravelFullResponseSchema:
+    """ Monta o full schema com o motorista e a ambulância já carregados """
+
+    travelDict = model_to_dict(travel, recurse=False)
+    driverDict = {**model_to_dict(driver.id, recurse=False), **model_to_dict(driver, recurse=False)} if driver else None
+
+    travelDict.update({"motorista": DriverResponseSchema.model_validate(driverDict) if driverDict else None, "ambulancia": ambulance})
+
+    return TravelFullResponseSchema.model_validate(travelDict)
+
+async def add_travels_atributes(travels: list[Travel]) -> list[TravelFullResponseSchema]:
+    """
+    Adiciona motorista e ambulância (com equipamentos) a viagens carregadas com `TravelRepository.joined_travels`.
+    O número de consultas não depende de quantas viagens são: uma para os motoristas com os usuários
+    e as duas de `add_ambulances_atributes`, além da consulta das viagens com as ambulâncias
+    """
+
+    if not travels:
+        return []
+
+    driverIds = list({str(travel.id_motorista_id) for travel in travels if travel.id_motorista_id})
+    drivers = await DriverRepositoryAsync.find_drivers_by_ids(driverIds) if driverIds else []
+    driverById = {str(driver.id_id): driver for driver in drivers}
+
+    ambulances = list({travel.id_ambulancia_id: travel.id_ambulancia for travel in travels if travel.id_ambulancia_id}.values())
+    ambulanceById = {ambulance.id.hex: ambulance for ambulance in await add_ambulances_atributes(ambulances)}
+
+    return [
+        __travel_full_schema__(travel, driverById.get(str(travel.id_motorista_id)), ambulanceById.get(str(travel.id_ambulancia_id)))
+        for travel in travels
+    ]
+
+def __travel_model__(travel: TravelCreateSchema, patientId: str) -> Travel:
+    travelModel = Travel(**travel.model_dump())
+    travelModel.id_paciente = patientId
     travelModel.criado_em = datetime.now(timezone.utc)
     travelModel.realizado = TravelRealized.NAO_REALIZADO
 
-    TravelRepository.insert_travel(travelModel)
+    return travelModel
+
+def __import_batch_atomic__(batch: list[tuple[int, TravelCreateSchema]]) -> tuple[int, list[TravelImportErrorSchema]]:
+    """ Grava um lote da importação em uma transação, roda inteiro na mesma thread do banco.
+    A viagem fica com o paciente cadastrado com o mesmo CPF, uma linha com um CPF sem cadastro é rejeitada """
+
+    patients = UserRepository.find_ids_by_cpfs(list({travel.cpf_paciente for (_, travel) in batch}))
+
+    errors = [
+        TravelImportErrorSchema(linha=line, erros=[f"Nenhum usuário cadastrado com o CPF {travel.cpf_paciente}"])
+        for (line, travel) in batch if travel.cpf_paciente not in patients
+    ]
+    travels = [(line, __travel_model__(travel, patients[travel.cpf_paciente])) for (line, travel) in batch if travel.cpf_paciente in patients]
+
+    try:
+        return (TravelRepository.insert_travels([travel for (_, travel) in travels]), errors)
+    except (IntegrityError, DataError):
+        pass
+
+    # O lote voltou inteiro, as linhas são gravadas uma a uma para separar as que falham
+    imported = 0
+
+    for (line, travel) in travels:
+        try:
+            with db.atomic():
+                TravelRepository.insert_travel(travel)
+            imported += 1
+        except (IntegrityError, DataError) as error:
+            # Primeira linha da mensagem do banco: a restrição violada ou o valor que não coube na coluna
+            cause = str(error).strip().splitlines()[0] if str(error).strip() else type(error).__name__
+            errors.append(TravelImportErrorSchema(linha=line, erros=[f"Não foi possível gravar a viagem: {cause}"]))
+
+    return (imported, errors)
+
+"""
+    Criar
+"""
+
+async def create_travel(travel: TravelCreateSchema, user: User) -> TravelResponseSchema:
+    """ Cria uma nova viagem """
+
+    travelModel = __travel_model__(travel, user.str_id)
+
+    await TravelRepositoryAsync.insert_travel(travelModel)
 
     return TravelResponseSchema.model_validate(travelModel)
 
+async def import_travels(chunks: AsyncIterator[bytes], mediaType: str) -> TravelImportResponseSchema:
+    """
+    Importa viagens agendadas de um CSV (cabeçalho com os campos de `TravelCreateSchema`) ou NDJSON
+    lido em pedaços do corpo da requisição. As linhas válidas são gravadas em lotes de
+    `TRAVEL_IMPORT_BATCH_SIZE`, uma linha inválida só entra na lista de erros e não interrompe o resto.
+    Uma viagem cujo CPF não tem cadastro também é rejeitada, nunca fica com outro paciente
+    """
+
+    if mediaType in CSV_MEDIA_TYPES:
+        records = read_csv(chunks)
+    elif mediaType in NDJSON_MEDIA_TYPES:
+        records = read_ndjson(chunks)
+    else:
+        raise UnsupportedMediaType(["text/csv", "application/x-ndjson"])
+
+    imported = 0
+    errors: list[TravelImportErrorSchema] = []
+    batch: list[tuple[int, TravelCreateSchema]] = []
+
+    async for (line, record) in records:
+        if isinstance(record, str):
+            errors.append(TravelImportErrorSchema(linha=line, erros=[record]))
+            continue
+
+        try:
+            batch.append((line, TravelCreateSchema.model_validate(record)))
+        except ValidationError as error:
+            errors.append(TravelImportErrorSchema(
+                linha=line,
+                erros=[f"{'.'.join(map(str, detail['loc']))}: {detail['msg']}" for detail in error.errors()]
+            ))
+            continue
+
+        if len(batch) >= TRAVEL_IMPORT_BATCH_SIZE:
+            (batchImported, batchErrors) = await run_in_db(__import_batch_atomic__, batch)
+            imported += batchImported
+            errors += batchErrors
+            batch = []
+
+    if batch:
+        (batchImported, batchErrors) = await run_in_db(__import_batch_atomic__, batch)
+        imported += batchImported
+        errors += batchErrors
+
+    errors.sort(key=lambda error: error.linha)
+
+    return TravelImportResponseSchema(importadas=imported, rejeitadas=len(errors), erros=errors)
+
 """
     Ler
 """
 
-def find_travel_by_id(travelId: UUID | str) -> TravelResponseSchema:
+async def find_travel_by_id(travelId: UUID | str) -> TravelResponseSchema:
     """ Encontra uma travel pelo seu ID """
 
     travelId = unmask_uuid(travelId)
-    travel = TravelRepository.find_travel_by_id(travelId)
+    travel = await TravelRepositoryAsync.find_travel_by_id(travelId)
 
     if travel is None:
         raise NotFoundError("transporte")
     
     return TravelResponseSchema.model_validate(travel)
 
-def find_all_travels(itemsPerPage: int = 15, page: int = 0) -> list[TravelResponseSchema]:
-    """ Encontra todas viagens e ordena de mais recente para mais antiga """
+async def find_travel_full_by_id(user: User, travelId: UUID | str) -> TravelFullResponseSchema:
+    """ Encontra uma viagem pelo seu ID com o motorista e a ambulância,
+    só o paciente, o motorista da viagem ou um gerente podem ver """
+
+    travel = await TravelRepositoryAsync.find_travel_joined_by_id(unmask_uuid(travelId))
+
+    if travel is None:
+        raise NotFoundError("transporte")
+
+    if not user.is_manager and user.str_id not in (str(travel.id_paciente_id), str(travel.id_motorista_id)):
+        raise NOT_USER_RESOURCE
+
+    return (await add_travels_atributes([travel]))[0]
+
+async def find_all_travels(itemsPerPage: int = 15, page: int = 0, cursor: str | None = None) -> tuple[list[TravelResponseSchema], str | None]:
+    """ Encontra todas viagens e ordena de mais recente para mais antiga, retorna também o cursor da próxima página """
 
     itemsPerPage = itemsPerPage or 15
     page = page or 0
 
-    travels = TravelRepository.find_all_travels(itemsPerPage, page)
+    travels = await TravelRepositoryAsync.find_all_travels(itemsPerPage, page, cursor)
+    nextCursor = TravelRepository.TRAVEL_KEYSET.next_cursor(travels, itemsPerPage)
+
+    return (list(map(TravelResponseSchema.model_validate, travels)), nextCursor)
 
-    return list(map(TravelResponseSchema.model_validate, travels))
+async def find_assigned_travels(user: User, page: int, pageSize: int, canceled: bool = False, cursor: str | None = None, travelFilter: TravelFilterSchema | None = None) -> tuple[list[TravelResponseSchema], str | None]:
+    """ Encontra as viagens assinadas para usuário user, se canceled == False não serão mostradas viagens canceladas.
+    Os filtros vão para o SQL, assim as páginas vêm completas. Retorna também o cursor da próxima página """
 
-def find_assigned_travels(user: User, page: int, pageSize: int, canceled: bool = False) -> list[TravelResponseSchema]:
-    """ Encontra as viagens assinadas para usuário user, se canceled == False não serão mostradas viagens canceladas """
+    travelFilter = (travelFilter or TravelFilterSchema()).model_copy(update={"cancelada": None if canceled else False})
 
-    travels = TravelRepository.find_assigned_travels(user, page, pageSize)
+    travels = await TravelRepositoryAsync.find_travels(user, travelFilter, page, pageSize, cursor)
+    nextCursor = TravelRepository.TRAVEL_KEYSET.next_cursor(travels, pageSize)
 
-    if not canceled:
-        travels = [t for t in travels if t.cancelada == False]
+    return (list(map(lambda t: TravelResponseSchema.model_validate(t), travels)), nextCursor)
 
-    return list(map(lambda t: TravelResponseSchema.model_validate(t), travels))
+async def find_assigned_travels_full(user: User, page: int, pageSize: int, canceled: bool = False, cursor: str | None = None, travelFilter: TravelFilterSchema | None = None) -> tuple[list[TravelFullResponseSchema], str | None]:
+    """ Mesmo que `find_assigned_travels`, com o motorista e a ambulância de cada viagem em um número fixo de consultas """
+
+    travelFilter = (travelFilter or TravelFilterSchema()).model_copy(update={"cancelada": None if canceled else False})
+
+    travels = await TravelRepositoryAsync.find_travels(user, travelFilter, page, pageSize, cursor, joined=True)
+    nextCursor = TravelRepository.TRAVEL_KEYSET.next_cursor(travels, pageSize)
+
+    return (await add_travels_atributes(travels), nextCursor)
 
 """
     Atualizar
 """
 
-def update_travel_by_id_ignore_none(travelId: UUID, **fields) -> TravelResponseSchema:
+async def update_travel_by_id_ignore_none(travelId: UUID, **fields) -> TravelResponseSchema:
     """ Atualiza uma viagem com os campos (fields) fornecidos ignorando campos nulos """
 
     filteredArgs = {k: v for k,v in fields.items() if v is not None}
 
-    updatedTravel = TravelRepository.update_travel(unmask_uuid(travelId), **filteredArgs)
+    updatedTravel = await TravelRepositoryAsync.update_travel(unmask_uuid(travelId), **filteredArgs)
 
     if updatedTravel is None:
         raise NotFoundError("transporte")
 
     return TravelResponseSchema.model_validate(updatedTravel)
 
-def cancel_travel_by_id(user: User, travelId: UUID) -> TravelResponseSchema:
-    """ Atualiza o estado de uma viagem para cancelada pelo seu id """
+async def cancel_travel_by_id(user: User, travelId: UUID) -> TravelResponseSchema:
+    """ Atualiza o estado de uma viagem ainda não iniciada para cancelada pelo seu id,
+    cancelar de novo devolve a viagem como está """
 
-    travel = find_travel_by_id(travelId)
+    return await __transition_travel__(CANCEL_TRAVEL, user, travelId)
 
-    if travel.id_paciente != user.uuid_id:
-        raise NOT_USER_RESOURCE
+async def start_travel_by_id(driver: User, travelId: UUID) -> TravelResponseSchema:
+    """ Atualiza o estado de uma viagem para iniciada pelo seu id e marca o motorista em viagem """
 
-    if not travel.cancelada:
-        travel = update_travel_by_id_ignore_none(travel.id, cancelada=True)
-        travel = TravelResponseSchema.model_validate(travel)
+    return await __transition_travel__(START_TRAVEL, driver, travelId)
 
-    return travel
+async def end_travel_by_id(driver: User, travelId: UUID) -> TravelResponseSchema:
+    """ Atualiza o estado de uma viagem para terminada pelo seu id, grava o fim e libera o motorista """
 
-def start_travel_by_id(driver: User, travelId: UUID) -> TravelResponseSchema:
-    """ Atualiza o estado de uma viagem para iniciada pelo seu id """
-
-    travel = find_travel_by_id(travelId)
-    travelValidator = TravelValidator(travel, driver)
-    
-    travelValidator.validate_start_travel()
-    
-    travel = update_travel_by_id_ignore_none(travel.id, realizado=TravelRealized.EM_PROGRESSO)
-    travel = TravelResponseSchema.model_validate(travel)
-    return travel
-
-def end_travel_by_id(driver: User, travelId: UUID) -> TravelResponseSchema:
-    """ Atualiza o estado de uma viagem para terminada pelo seu id """
-
-    travel = find_travel_by_id(travelId)
-    travelValidator = TravelValidator(travel, driver)
-    
-    travelValidator.validate_end_travel()
-    
-    travel = update_travel_by_id_ignore_none(travel.id, realizado=TravelRealized.REALIZADO)
-    travel = TravelResponseSchema.model_validate(travel)
-    return travel
+    return await __transition_travel__(END_TRAVEL, driver, travelId)
 
 """
     Deletar
@@ -28,9 +28,9 @@ from src.Service import SessionService
     Criar
 """
 
-def create(userSchema: UserCreateSchema) -> UserResponseFullSchema:
+async def create(userSchema: UserCreateSchema) -> UserResponseFullSchema:
     userModel = User(**userSchema.model_dump())
-    userModel.senha = SessionService.get_password_hash(str(userModel.senha))
+    userModel.senha = await SessionService.get_password_hash(str(userModel.senha))
 
     validatorResult = UserValidator().validate(userModel)
     
@@ -46,15 +46,18 @@ def create(userSchema: UserCreateSchema) -> UserResponseFullSchema:
     Ler
 """
 
-def find_all_page_dict(page: int = 0, pageSize: int = 25) -> list[UserResponseSchema]:
-    """ Busca todos usuários usando sistema de páginação """
+def find_all_page_dict(page: int = 0, pageSize: int = 25, cursor: str | None = None) -> tuple[list[UserResponseSchema], str | None]:
+    """ Busca todos usuários usando sistema de páginação, retorna também o cursor da próxima página """
     page = page or 1        # Transforma page em 1 se o valor for None ou 0
     pageSize = pageSize or 1
 
     pageSize = max(1, min(pageSize, 50))
     page = max(1, page)
 
-    return list(map(UserResponseSchema.model_validate, UserRepository.find_all_with_page(page, pageSize)))
+    users = UserRepository.find_all_with_page(page, pageSize, cursor)
+    nextCursor = UserRepository.USER_KEYSET.next_cursor(users, pageSize)
+
+    return (list(map(UserResponseSchema.model_validate, users)), nextCursor)
 
 def find_user_by_id(userId: UUID) -> UserResponseFullSchema | None:
     """ Busca um usuário pelo seu id """
@@ -0,0 +1,138 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+from typing import Any, Callable, Hashable
+
+class TTLCache:
+    """
+    Cache LRU em memória com tempo de vida (TTL) por entrada e tamanho máximo.
+    Seguro para uso entre threads.
+    """
+
+    def __init__(self, maxSize: int = 1024, ttl: float = 60) -> None:
+        self.maxSize = max(1, maxSize)
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        self.__entries__: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.__lock__ = Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """ Retorna o valor da chave ou `default` se não existir ou estiver expirado """
+        with self.__lock__:
+            entry = self.__entries__.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return default
+
+            (expiresAt, value) = entry
+
+            if expiresAt <= monotonic():
+                del self.__entries__[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self.__entries__.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """ Salva um valor, removendo o menos usado recentemente se o cache estiver cheio """
+        with self.__lock__:
+            self.__entries__[key] = (monotonic() + (self.ttl if ttl is None else ttl), value)
+            self.__entries__.move_to_end(key)
+
+            while len(self.__entries__) > self.maxSize:
+                self.__entries__.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """ Remove uma chave do cache """
+        with self.__lock__:
+            self.__entries__.pop(key, None)
+
+    def delete_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """ Remove todas entradas em que `predicate(chave, valor)` for verdadeiro """
+        with self.__lock__:
+            keys = [k for (k, (_, v)) in self.__entries__.items() if predicate(k, v)]
+
+            for k in keys:
+                del self.__entries__[k]
+
+            return len(keys)
+
+    def clear(self) -> None:
+        """ Remove todas entradas do cache """
+        with self.__lock__:
+            self.__entries__.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        """ Retorna os contadores do cache """
+        with self.__lock__:
+            lookups = self.hits + self.misses
+
+            return {
+                "tamanho": len(self.__entries__),
+                "tamanho_maximo": self.maxSize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0
+            }
+
+class ExpiringDict:
+    """
+    Dicionário em memória em que cada chave expira sozinha após o seu TTL.
+    Diferente do `TTLCache` nunca remove uma chave antes do prazo, por isso serve
+    para guardar revogações que não podem ser perdidas por falta de espaço.
+    """
+
+    def __init__(self) -> None:
+        self.__entries__: dict[Hashable, tuple[float, Any]] = {}
+        self.__lock__ = Lock()
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        """ Salva um valor que expira em `ttl` segundos """
+        with self.__lock__:
+            self.__purge__()
+            self.__entries__[key] = (monotonic() + ttl, value)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """ Retorna o valor da chave ou `default` se não existir ou estiver expirado """
+        with self.__lock__:
+            entry = self.__entries__.get(key)
+
+            if entry is None:
+                return default
+
+            (expiresAt, value) = entry
+
+            if expiresAt <= monotonic():
+                del self.__entries__[key]
+                return default
+
+            return value
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, None) is not None
+
+    def __len__(self) -> int:
+        with self.__lock__:
+            self.__purge__()
+            return len(self.__entries__)
+
+    def __purge__(self) -> None:
+        now = monotonic()
+        expired = [k for (k, (expiresAt, _)) in self.__entries__.items() if expiresAt <= now]
+
+        for k in expired:
+            del self.__entries__[k]
@@ -0,0 +1,67 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from functools import partial
+from threading import BoundedSemaphore, Lock
+
+from typing import Any, Callable, TypeVar
+
+from src.Error.Server.ServerBusyError import ServerBusy
+
+T = TypeVar("T")
+
+class BoundedExecutor:
+    """
+    Pool de threads com número fixo de workers e fila limitada.
+    Quando `maxWorkers + queueLimit` tarefas já estão em andamento novas tarefas
+    são recusadas com `ServerBusy` ao invés de se acumularem na memória.
+    """
+
+    def __init__(self, maxWorkers: int, queueLimit: int, name: str) -> None:
+        self.maxWorkers = max(1, maxWorkers)
+        self.queueLimit = max(0, queueLimit)
+        self.name = name
+
+        self.__executor__ = ThreadPoolExecutor(max_workers=self.maxWorkers, thread_name_prefix=name)
+        self.__capacity__ = BoundedSemaphore(self.maxWorkers + self.queueLimit)
+
+        self.__lock__ = Lock()
+        self.inFlight = 0
+        self.rejected = 0
+        self.completed = 0
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """ Executa `fn` em uma thread do pool sem bloquear o event loop """
+        if not self.__capacity__.acquire(blocking=False):
+            with self.__lock__:
+                self.rejected += 1
+            raise ServerBusy()
+
+        with self.__lock__:
+            self.inFlight += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            context = copy_context()
+            return await loop.run_in_executor(self.__executor__, partial(context.run, fn, *args, **kwargs))
+        finally:
+            with self.__lock__:
+                self.inFlight -= 1
+                self.completed += 1
+            self.__capacity__.release()
+
+    def stats(self) -> dict[str, int | str]:
+        """ Retorna os contadores do pool """
+        with self.__lock__:
+            return {
+                "nome": self.name,
+                "workers": self.maxWorkers,
+                "limite_fila": self.queueLimit,
+                "em_andamento": self.inFlight,
+                "recusadas": self.rejected,
+                "concluidas": self.completed
+            }
+
+    def shutdown(self) -> None:
+        """ Encerra o pool aguardando as tarefas em andamento """
+        self.__executor__.shutdown(wait=True)
@@ -0,0 +1,214 @@
+import ipaddress
+import sqlite3
+import threading
+from math import ceil, floor
+from time import time
+
+from limits import RateLimitItem, parse
+from limits.storage import Storage, SlidingWindowCounterSupport
+from limits.storage.base import TimestampedSlidingWindow
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+from starlette.requests import Request
+
+from src.Utils.env import get_env_var
+
+from src.Error.User.TooManyRequestsError import TooManyRequests
+
+class SqliteStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """
+    Armazena os contadores do rate limit em um arquivo SQLite, assim vários workers
+    do uvicorn na mesma máquina compartilham os mesmos contadores.
+
+    Uso: `sqlite:///caminho/relativo.db` ou `sqlite:////caminho/absoluto.db`
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    PURGE_EVERY = 1000
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, **options: float | str | bool) -> None:
+        self.path = uri.removeprefix("sqlite:///") or "ratelimit.db"
+        self.timeout = float(options.get("timeout", 5))
+
+        self.__local__ = threading.local()
+        self.__writes__ = 0
+
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+        self.__connection__().execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit (chave TEXT PRIMARY KEY, contador INTEGER NOT NULL, expira_em REAL NOT NULL)"
+        )
+
+    @property
+    def base_exceptions(self) -> type[Exception]:
+        return sqlite3.Error
+
+    def __connection__(self) -> sqlite3.Connection:
+        connection = getattr(self.__local__, "connection", None)
+
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self.__local__.connection = connection
+
+        return connection
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time()
+        connection = self.__connection__()
+
+        (count,) = connection.execute(
+            """
+            INSERT INTO rate_limit (chave, contador, expira_em) VALUES (?1, ?2, ?3 + ?4)
+            ON CONFLICT (chave) DO UPDATE SET
+                contador  = CASE WHEN expira_em <= ?3 THEN ?2 ELSE contador + ?2 END,
+                expira_em = CASE WHEN expira_em <= ?3 THEN ?3 + ?4 ELSE expira_em END
+            RETURNING contador
+            """,
+            (key, amount, now, expiry)
+        ).fetchone()
+
+        self.__writes__ += 1
+        if self.__writes__ % self.PURGE_EVERY == 0:
+            connection.execute("DELETE FROM rate_limit WHERE expira_em <= ?", (now,))
+
+        return int(count)
+
+    def decr(self, key: str, amount: int = 1) -> int:
+        row = self.__connection__().execute(
+            "UPDATE rate_limit SET contador = MAX(0, contador - ?) WHERE chave = ? AND expira_em > ? RETURNING contador",
+            (amount, key, time())
+        ).fetchone()
+
+        return int(row[0]) if row else 0
+
+    def get(self, key: str) -> int:
+        row = self.__connection__().execute(
+            "SELECT contador FROM rate_limit WHERE chave = ? AND expira_em > ?", (key, time())
+        ).fetchone()
+
+        return int(row[0]) if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        row = self.__connection__().execute(
+            "SELECT expira_em FROM rate_limit WHERE chave = ? AND expira_em > ?", (key, time())
+        ).fetchone()
+
+        return float(row[0]) if row else time()
+
+    def check(self) -> bool:
+        try:
+            self.__connection__().execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int | None:
+        return self.__connection__().execute("DELETE FROM rate_limit").rowcount
+
+    def clear(self, key: str) -> None:
+        self.__connection__().execute("DELETE FROM rate_limit WHERE chave = ?", (key,))
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+
+        now = time()
+        (previousKey, currentKey) = self.sliding_window_keys(key, expiry, now)
+        (previousCount, previousTtl, currentCount, _) = self.__sliding_window_info__(previousKey, currentKey, expiry, now)
+
+        if floor(previousCount * previousTtl / expiry + currentCount) + amount > limit:
+            return False
+
+        currentCount = self.incr(currentKey, 2 * expiry, amount)
+
+        if floor(previousCount * previousTtl / expiry + currentCount) > limit:
+            # Outro worker consumiu a última vaga entre a leitura e o incremento
+            self.decr(currentKey, amount)
+            return False
+
+        return True
+
+    def get_sliding_window(self, key: str, expiry: int) -> tuple[int, float, int, float]:
+        now = time()
+        (previousKey, currentKey) = self.sliding_window_keys(key, expiry, now)
+        return self.__sliding_window_info__(previousKey, currentKey, expiry, now)
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        (previousKey, currentKey) = self.sliding_window_keys(key, expiry, time())
+        self.clear(previousKey)
+        self.clear(currentKey)
+
+    def __sliding_window_info__(self, previousKey: str, currentKey: str, expiry: int, now: float) -> tuple[int, float, int, float]:
+        previousCount = self.get(previousKey)
+        currentCount = self.get(currentKey)
+
+        previousTtl = 0.0 if previousCount == 0 else (1 - (((now - expiry) / expiry) % 1)) * expiry
+        currentTtl = (1 - ((now / expiry) % 1)) * expiry + expiry
+
+        return (previousCount, previousTtl, currentCount, currentTtl)
+
+# memory:// para um único processo, sqlite:///ratelimit.db para compartilhar entre workers
+RATE_LIMIT_STORAGE = get_env_var("RATE_LIMIT_STORAGE", "memory://") or "memory://"
+
+LOGIN_IP_LIMIT = get_env_var("LOGIN_IP_LIMIT", "20/minute") or "20/minute"
+LOGIN_EMAIL_LIMIT = get_env_var("LOGIN_EMAIL_LIMIT", "5/minute") or "5/minute"
+REFRESH_IP_LIMIT = get_env_var("REFRESH_IP_LIMIT", "30/minute") or "30/minute"
+RESTORE_IP_LIMIT = get_env_var("RESTORE_IP_LIMIT", "5/minute") or "5/minute"
+RESTORE_EMAIL_LIMIT = get_env_var("RESTORE_EMAIL_LIMIT", "3/hour") or "3/hour"
+
+# IPs ou redes (CIDR) dos proxies reversos separados por vírgula, só deles o X-Forwarded-For é aceito
+TRUSTED_PROXIES = [
+    ipaddress.ip_network(proxy.strip(), strict=False)
+    for proxy in (get_env_var("TRUSTED_PROXIES", "") or "").split(",") if proxy.strip()
+]
+
+def is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+
+    return any(ip in network for network in TRUSTED_PROXIES)
+
+def get_client_ip(request: Request) -> str:
+    """
+    IP de quem fez a requisição. O X-Forwarded-For pode ser escrito pelo próprio cliente, então só é lido
+    quando a conexão vem de um proxy de `TRUSTED_PROXIES`: o cliente é o último endereço da lista que não
+    é um desses proxies. Sem proxies configurados vale o endereço da conexão.
+    """
+    address = get_remote_address(request)
+
+    if not is_trusted_proxy(address):
+        return address
+
+    forwarded = [hop.strip() for hop in request.headers.get("X-Forwarded-For", "").split(",") if hop.strip()]
+
+    for hop in reversed(forwarded):
+        if not is_trusted_proxy(hop):
+            return hop
+
+    return forwarded[0] if forwarded else address
+
+LIMITER = Limiter(
+    key_func=get_client_ip,
+    storage_uri=RATE_LIMIT_STORAGE,
+    strategy="sliding-window-counter"
+)
+
+def retry_after(item: RateLimitItem, *identifiers: str) -> int:
+    """ Segundos até o limite voltar a aceitar requisições """
+    stats = LIMITER.limiter.get_window_stats(item, *identifiers)
+    return max(1, ceil(stats.reset_time - time()))
+
+def hit_email_limit(scope: str, limit: str, email: str) -> None:
+    """ Consome uma requisição do limite por email, lança `TooManyRequests` se o limite foi atingido """
+    if not LIMITER.enabled:
+        return
+
+    item = parse(limit)
+    key = email.strip().lower()
+
+    if not LIMITER.limiter.hit(item, scope, key):
+        raise TooManyRequests(retryAfter=retry_after(item, scope, key))
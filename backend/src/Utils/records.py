@@ -0,0 +1,115 @@
+import csv
+import json
+
+from typing import AsyncIterator
+
+CSV_MEDIA_TYPES = {"text/csv", "application/csv"}
+NDJSON_MEDIA_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-lines"}
+
+# Tamanho máximo de uma linha ou de um registro do CSV (com as quebras de linha entre aspas)
+MAX_RECORD_BYTES = 64 * 1024
+RECORD_TOO_LARGE = f"O registro passa de {MAX_RECORD_BYTES // 1024} KiB"
+
+class SemicolonDialect(csv.excel):
+    """ CSV exportado por planilhas configuradas em português, que separam as colunas com ponto e vírgula """
+    delimiter = ";"
+
+def decode_line(line: bytes, number: int) -> str:
+    # O BOM que algumas planilhas gravam no começo do arquivo não faz parte do nome da primeira coluna
+    return line.decode("utf-8-sig" if number == 1 else "utf-8", errors="replace").rstrip("\r")
+
+async def read_lines(chunks: AsyncIterator[bytes], maxBytes: int = MAX_RECORD_BYTES) -> AsyncIterator[tuple[int, str | None]]:
+    """ Quebra o corpo recebido em pedaços em linhas numeradas a partir de 1, sem juntar o corpo inteiro.
+    Uma linha maior que `maxBytes` volta como None e é descartada enquanto chega, sem ficar na memória """
+    pending = b""
+    number = 0
+    skipping = False
+
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+
+        for line in lines:
+            number += 1
+            yield (number, None if skipping or len(line) > maxBytes else decode_line(line, number))
+            skipping = False
+
+        if len(pending) > maxBytes:
+            (pending, skipping) = (b"", True)
+
+    if pending or skipping:
+        number += 1
+        yield (number, None if skipping else decode_line(pending, number))
+
+async def read_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, dict | str]]:
+    """ Um objeto JSON por linha, linhas em branco são ignoradas. Linhas inválidas viram a mensagem de erro """
+    async for (number, line) in read_lines(chunks):
+        if line is None:
+            yield (number, RECORD_TOO_LARGE)
+            continue
+
+        if not line.strip():
+            continue
+
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield (number, "JSON inválido")
+            continue
+
+        yield (number, record if isinstance(record, dict) else "A linha não é um objeto JSON")
+
+async def read_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, dict | str]]:
+    """
+    CSV com cabeçalho na primeira linha, separado por vírgula ou ponto e vírgula.
+    Um campo entre aspas pode ter quebras de linha: o registro só termina quando as aspas fecham.
+    Um registro maior que `MAX_RECORD_BYTES` (aspas que nunca fecham) é rejeitado e a leitura
+    recomeça na linha seguinte. Campos vazios ficam de fora do registro, assim valem os valores padrão do schema.
+    """
+    header: list[str] | None = None
+    dialect = None
+    record = ""
+    size = 0
+    start = 0
+
+    async for (number, line) in read_lines(chunks):
+        if not record:
+            start = number
+
+        size += MAX_RECORD_BYTES + 1 if line is None else len(line.encode()) + 1
+
+        if size > MAX_RECORD_BYTES:
+            yield (start, RECORD_TOO_LARGE)
+            (record, size) = ("", 0)
+            continue
+
+        record = f"{record}\n{line}" if record else line
+
+        # Aspas escapadas são dobradas (""), então o registro está completo quando a contagem é par
+        if record.count('"') % 2:
+            continue
+
+        (text, record, size) = (record, "", 0)
+
+        if not text.strip():
+            continue
+
+        if header is None:
+            dialect = csv.excel if text.count(",") >= text.count(";") else SemicolonDialect
+            header = [name.strip() for name in next(csv.reader([text], dialect))]
+            continue
+
+        try:
+            values = next(csv.reader([text], dialect))
+        except csv.Error as error:
+            yield (start, f"CSV inválido: {error}")
+            continue
+
+        if len(values) != len(header):
+            yield (start, f"A linha tem {len(values)} colunas, o cabeçalho tem {len(header)}")
+            continue
+
+        yield (start, {name: value for (name, value) in zip(header, values) if value != ""})
+
+    if record:
+        yield (start, "Aspas sem fechamento no fim do arquivo")
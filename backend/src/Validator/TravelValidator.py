@@ -1,8 +1,8 @@
 from src.Validator.GenericValidator import unmask_uuid
 from src.Error.Base.ErrorListClass import ErrorListClass
 
-from src.Model.Travel import Travel
 from src.Model.User import User
+from src.Schema.Travel.TravelResponseSchema import TravelResponseSchema
 
 from fastapi import status
 
@@ -12,9 +12,11 @@ from src.Error.User.NotUserResourceError import NotUserResource
 from src.Error.Base.ErrorClass import ErrorClass
 
 class TravelValidator:
-    def __init__(self,  travel: Travel, driver: User) -> None:
+    """ Diz por que uma mudança de estado não pode acontecer, `user` é o motorista ou o paciente que pediu """
+
+    def __init__(self,  travel: TravelResponseSchema, user: User) -> None:
         self.errors = []
-        self.driver = driver
+        self.user = user
         self.travel = travel
 
     @property
@@ -31,6 +33,11 @@ class TravelValidator:
         self.is_travel_not_canceled()
         self.is_driver_assigned_to_travel()
         self.is_ambulance_assigned_to_travel()
+        self.is_travel_in_progress()
+
+    def validate_cancel_travel(self) -> None:
+        self.is_patient_travel()
+        self.is_travel_not_started()
 
     def __append_error__(self, error: dict[str, Exception]) -> None:
         self.errors.append(error)
@@ -40,9 +47,13 @@ class TravelValidator:
             raise ErrorClass("travel_canceled", "Não é possível iniciar a viagem pois a mesma foi cancelada.", status.HTTP_400_BAD_REQUEST)
 
     def is_driver_assigned_to_travel(self) -> None:
-        if self.driver.compare_uuid(str(self.travel.id)):
+        if self.travel.id_motorista != self.user.uuid_id:
             raise NotUserResource("O motorista não esta assinado a este transporte.")
 
+    def is_patient_travel(self) -> None:
+        if self.travel.id_paciente != self.user.uuid_id:
+            raise NotUserResource()
+
     def is_ambulance_assigned_to_travel(self) -> None:
         if self.travel.id_ambulancia is None:
             raise ErrorClass("no_ambulance_assigned", "Sem ambulancias assinadas a viagem.", status.HTTP_400_BAD_REQUEST)
@@ -50,6 +61,13 @@ class TravelValidator:
     def is_travel_not_realized(self) -> None:
         if self.travel.realizado == TravelRealized.EM_PROGRESSO:
             raise ErrorClass("travel_already_in_progress", "O transporte já foi iniciado.", status.HTTP_409_CONFLICT)
+
+        if self.travel.realizado == TravelRealized.REALIZADO:
+            raise ErrorClass("travel_already_realized", "O transporte já foi realizado.", status.HTTP_409_CONFLICT)
+
+    def is_travel_not_started(self) -> None:
+        if self.travel.realizado != TravelRealized.NAO_REALIZADO:
+            raise ErrorClass("travel_already_started", "Não é possível cancelar um transporte que já foi iniciado.", status.HTTP_409_CONFLICT)
         
     def is_travel_in_progress(self) -> None:
         if self.travel.realizado != TravelRealized.EM_PROGRESSO:
@@ -61,7 +79,7 @@ class TravelValidator:
             self.__append_error__({"travel_canceled": ErrorClass("travel_canceled", "Não é possível iniciar a viagem pois a mesma foi cancelada.", status.HTTP_400_BAD_REQUEST)})
 
     def __is_driver_assigned_to_travel__(self) -> None:
-        if self.driver.compare_uuid(self.travel.str_id):
+        if self.travel.id_motorista != self.user.uuid_id:
             self.__append_error__({"travel_canceled": NotUserResource("O motorista não esta assinado a este transporte.")})
 
     def __is_ambulance_assigned_to_travel__(self) -> None:
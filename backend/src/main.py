@@ -6,12 +6,19 @@ from src.Utils.env import get_env_var, get_env_var_not_none
 
 from src import Controller
 from src.DB import Migration
+from src.DB.Sweeper import SWEEPER
+from src.DB.Connection import DatabaseConnectionMiddleware, reap_idle_connections_forever
+from src.DB.QueryCounter import QueryCounterMiddleware
+from src.DB.SlowQueryLog import SLOW_QUERY_LOG, SLOW_QUERY_FLUSH_INTERVAL
+from src.DB.Pagination import NEXT_CURSOR_HEADER
+from src.DB.Executor import shutdown_executors
+from src.DB import db
 from src.Error import register_error_handlers
 
-from src.Repository.SessionRepository import delete_expired_sessions
-
 from src.Logging import Logging, Level
 from src.Service.ManagerService import generate_manager_token_list
+from src.Service.SessionService import calibrate_password_cost
+from src.Service.EmailService import EMAIL_DISPATCHER
 from src.Validator.GenericValidator import mask_uuid
 
 Debug = get_env_var("environment", "DEV") == "DEV"
@@ -19,35 +26,58 @@ Debug = get_env_var("environment", "DEV") == "DEV"
 app = Controller.initialize_controller()
 register_error_handlers(app)
 
-async def delete_expired_tokens() -> None:
-    while True:
-        await asyncio.sleep(120)
-
-        Logging.log("Deleting expired sessions", Level.DEBUG)
-        delete_expired_sessions()
+BACKGROUND_TASKS: set[asyncio.Task] = set()
 
 def main() -> None:
+    calibrate_password_cost()
+
     tokens = generate_manager_token_list(int(get_env_var("TOKENS", "5") or "5"))
 
     Logging.log(f"Tokens para gerente: {[mask_uuid(t.str_id) for t in tokens if not t.usado and t.fator_cargo == 2]}", Level.SENSITIVE)
 
-    if Debug:
-        asyncio.create_task(delete_expired_tokens())
-    
+    start_background_task(SWEEPER.run_forever())
+    start_background_task(reap_idle_connections_forever(db.obj, float(get_env_var("DB_IDLE_TIMEOUT", "60") or "60")))
+    start_background_task(SLOW_QUERY_LOG.flush_forever(SLOW_QUERY_FLUSH_INTERVAL))
+
+    if EMAIL_DISPATCHER.is_configured:
+        start_background_task(EMAIL_DISPATCHER.run_forever())
+    else:
+        Logging.log("Envio de emails desativado, configure MAILGUN_API_KEY e MAILGUN_SANDBOX", Level.WARN)
+
+def start_background_task(coroutine) -> None:
+    task = asyncio.create_task(coroutine)
+    BACKGROUND_TASKS.add(task)
+    task.add_done_callback(BACKGROUND_TASKS.discard)
+
+async def stop_background_tasks() -> None:
+    for task in list(BACKGROUND_TASKS):
+        task.cancel()
+
+    await EMAIL_DISPATCHER.close()
+
+    SLOW_QUERY_LOG.flush()
+
+    shutdown_executors()
 
 app.add_event_handler("startup", Migration.initialize_db)
 app.add_event_handler("startup", Controller.initialize_controller)
 app.add_event_handler("startup", main)
 
+app.add_event_handler("shutdown", stop_background_tasks)
 app.add_event_handler("shutdown", Migration.close_db)
 app.add_event_handler("shutdown", Migration.drop_test_db)
 
+app.add_middleware(DatabaseConnectionMiddleware, database=db)
+app.add_middleware(QueryCounterMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origin_regex=r"(https://.*\.tcc-sga\.pages\.dev|http://localhost:5173)",
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # O frontend lê o cursor da próxima página nas listagens
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 if not Debug:
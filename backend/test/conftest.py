@@ -1,13 +1,22 @@
+import os
 import pytest
 from peewee import SqliteDatabase
 from fastapi.testclient import TestClient
 
+# Custo mínimo do bcrypt para não calibrar nem pagar o custo de produção nos testes
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
 from src.DB import db
+from src.DB.Connection import use_request_connection_state
+from src.DB.QueryCounter import use_query_counter
+from src.DB.SlowQueryLog import use_slow_query_log
+from src.DB.sqlite import SQLITE_RETURNING
 from src.main import app
+from src.Utils.limiter import LIMITER
 
-from src.Model import User, Driver, Travel, UserSession, Ambulance, Equipment, Manager
+from src.Model import User, Driver, Travel, UserSession, Ambulance, Equipment, Manager, UpgradeToken, RestorePassword, EmailOutbox, SchemaMigration
 
-MODELS = [User.User, Driver.Driver, Travel.Travel, UserSession.Session, Ambulance.Ambulance, Equipment.Equipment, Manager.Manager]
+MODELS = [User.User, Driver.Driver, Travel.Travel, UserSession.Session, Ambulance.Ambulance, Equipment.Equipment, Manager.Manager, UpgradeToken.UpgradeToken, RestorePassword.RestorePassword, EmailOutbox.EmailOutbox, SchemaMigration.SchemaMigration]
 
 def pytest_configure(config):
     """
@@ -25,12 +34,14 @@ def client():
     Cria um novo TestClient do FastAPI para cada função de teste.
     """
     with TestClient(app) as c:
-        test_db = SqliteDatabase('database_test.db')
+        test_db = use_query_counter(use_slow_query_log(use_request_connection_state(SqliteDatabase('database_test.db', check_same_thread=False, returning_clause=SQLITE_RETURNING))))
     
         db.initialize(test_db)
         
         db.create_tables(MODELS)
 
+        LIMITER.reset()
+
         yield c
 
         db.drop_tables(MODELS)
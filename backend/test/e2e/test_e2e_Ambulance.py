@@ -0,0 +1,84 @@
+from fastapi.testclient import TestClient
+from utils import UserUtils
+from helpers import TestQueryHelper
+
+from src.Service.AmbulanceService import EQUIPMENT_NOT_FOUND
+
+def create_ambulance(client: TestClient, token: dict, plate: str) -> dict:
+    request = client.post("/ambulance/", headers=token, json={"status": 1, "placa": plate, "tipo": 0})
+    assert request.status_code == 200
+
+    ambulance = request.json()
+
+    equipment = client.post(f"/ambulance/add-equipment/{ambulance['id']}", headers=token, json={"equipamento": "Maca", "descricao": "Maca retrátil"})
+    assert equipment.status_code == 200
+
+    return ambulance
+
+def test_get_ambulances(client: TestClient):
+    managerToken = UserUtils.get_manager(client)
+    ambulance = create_ambulance(client, managerToken, "ABC1D23")
+
+    request = client.get("/ambulance/", headers=managerToken)
+    assert request.status_code == 200
+
+    (ambulanceResponse,) = request.json()
+    assert ambulanceResponse["id"] == ambulance["id"]
+    assert [e["equipamento"] for e in ambulanceResponse["equipamentos"]] == ["Maca"]
+    assert ambulanceResponse["motorista_id"] is None
+
+def test_get_ambulances_query_count_does_not_grow(client: TestClient):
+    managerToken = UserUtils.get_manager(client)
+    create_ambulance(client, managerToken, "ABC1D20")
+
+    single = client.get("/ambulance/", headers=managerToken)
+
+    for n in range(1, 8):
+        create_ambulance(client, managerToken, f"ABC1D2{n}")
+
+    several = client.get("/ambulance/", headers=managerToken)
+
+    assert len(several.json()) == 8
+    assert TestQueryHelper.query_count(several) == TestQueryHelper.query_count(single)
+    TestQueryHelper.assert_max_queries(several, 4)
+
+def test_get_ambulances_by_cursor(client: TestClient):
+    managerToken = UserUtils.get_manager(client)
+    created = {create_ambulance(client, managerToken, f"CUR1D2{n}")["id"] for n in range(5)}
+
+    seen = []
+    cursor = None
+
+    while True:
+        request = client.get("/ambulance/", headers=managerToken, params={"pageSize": 2, **({"cursor": cursor} if cursor else {})})
+        assert request.status_code == 200
+
+        seen += [ambulance["id"] for ambulance in request.json()]
+        cursor = request.headers.get("X-Next-Cursor")
+
+        if cursor is None:
+            break
+
+    assert set(seen) == created
+    assert len(seen) == len(created)
+    assert seen == sorted(seen)
+
+def test_get_ambulances_invalid_cursor(client: TestClient):
+    managerToken = UserUtils.get_manager(client)
+
+    request = client.get("/ambulance/", headers=managerToken, params={"cursor": "nao-e-um-cursor"})
+
+    assert request.status_code == 400
+    assert request.json()["erro"] == "invalid_cursor"
+
+def test_delete_equipment_not_found(client: TestClient):
+    token = UserUtils.get_manager(client)
+    ambulance = client.post("/ambulance/", headers=token, json={"status": 1, "placa": "DEL1A23", "tipo": 0}).json()
+    equipment = client.post(f"/ambulance/add-equipment/{ambulance['id']}", headers=token, json={"equipamento": "Maca", "descricao": "Maca retrátil"}).json()
+
+    assert client.delete(f"/ambulance/equipment/{equipment['id']}", headers=token).status_code == 204
+
+    request = client.delete(f"/ambulance/equipment/{equipment['id']}", headers=token)
+
+    assert request.status_code == 404
+    assert request.json() == EQUIPMENT_NOT_FOUND.jsonObject
@@ -1,8 +1,17 @@
 from fastapi.testclient import TestClient
 from datetime import datetime, timezone
+from uuid import UUID
+from time import sleep
+
+import jwt
 
 from helpers import TestUserHelper
 
+from src.Service import SessionService
+from src.Service import EmailService
+from src.Model.User import User
+from src.Model.EmailOutbox import EmailOutbox
+
 def _create_user_and_get_token(client: TestClient, email: str, password: str):
     user_data = TestUserHelper.generate_user(email, password)
 
@@ -40,3 +49,134 @@ def test_get_user_sessions(client: TestClient):
     valid_until_str = sessions["sessoes"][0]["valido_ate"]
     valid_until_dt = datetime.fromisoformat(valid_until_str)
     assert valid_until_dt > datetime.now(timezone.utc)
+
+def test_revoke_other_session(client: TestClient):
+    email = "auth.test.revoke@example.com"
+    password = "a_secure_password"
+    token = _create_user_and_get_token(client, email, password)
+
+    response = client.post("/token/", data={"username": email, "password": password})
+    assert response.status_code == 201
+    otherToken = response.json()["access_token"]
+
+    client.cookies.clear()
+
+    headers = {"Authorization": f"Bearer {token}"}
+    otherHeaders = {"Authorization": f"Bearer {otherToken}"}
+
+    otherSessionId = jwt.decode(otherToken, options={"verify_signature": False})["sub"]
+
+    response = client.post("/token/revoke", headers=headers, json={"id_sessao": str(UUID(otherSessionId))})
+    assert response.status_code == 204
+
+    assert client.get("/user/", headers=otherHeaders).status_code == 401
+    assert client.get("/user/", headers=headers).status_code == 200
+
+def test_logout_invalidates_session(client: TestClient):
+    email = "auth.test.logout@example.com"
+    password = "a_secure_password"
+    token = _create_user_and_get_token(client, email, password)
+
+    client.cookies.clear()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/user/", headers=headers).status_code == 200
+
+    response = client.post("/token/logout", headers=headers)
+    assert response.status_code == 204
+
+    assert client.get("/user/", headers=headers).status_code == 401
+
+def test_stateless_access_token(client: TestClient, monkeypatch):
+    monkeypatch.setattr(SessionService, "TOKEN_MODE", "stateless")
+
+    email = "auth.test.stateless@example.com"
+    password = "a_secure_password"
+    token = _create_user_and_get_token(client, email, password)
+
+    claims = jwt.decode(token, options={"verify_signature": False})
+    assert claims["typ"] == "access"
+    assert claims["cargo"] == 0
+    assert claims["exp"] > datetime.now(timezone.utc).timestamp()
+
+    client.cookies.clear()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.get("/user/", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == email
+
+    assert client.get("/monitoring/session-cache", headers=headers).status_code == 403
+
+    assert client.post("/token/logout", headers=headers).status_code == 204
+
+    assert client.get("/user/", headers=headers).status_code == 401
+
+def test_login_throttled_by_email(client: TestClient, monkeypatch):
+    email = "throttle@example.com"
+    user_data = TestUserHelper.generate_user(email, "Senha1234!")
+    TestUserHelper.register_user(client, user_data)
+
+    verifications = []
+    original_verify = SessionService.verify_password
+
+    async def counting_verify(plain: str, hashed: str) -> bool:
+        verifications.append(plain)
+        return await original_verify(plain, hashed)
+
+    monkeypatch.setattr(SessionService, "verify_password", counting_verify)
+    monkeypatch.setattr(SessionService, "LOGIN_EMAIL_LIMIT", "3/minute")
+
+    statuses = [client.post("/token/", data={"username": email, "password": "errada"}).status_code for _ in range(5)]
+
+    assert statuses == [401, 401, 401, 429, 429]
+    assert len(verifications) == 3
+
+    response = client.post("/token/", data={"username": email, "password": "errada"})
+    assert response.json()["erro"] == "too_many_requests"
+    assert int(response.headers["Retry-After"]) >= 1
+
+def test_login_rehashes_outdated_password(client: TestClient):
+    email = "rehash@example.com"
+    password = "Senha1234!"
+    user_data = TestUserHelper.generate_user(email, password)
+    userId = TestUserHelper.register_user(client, user_data)["id"].replace("-", "")
+
+    oldHash = User.get_by_id(userId).senha
+    currentRounds = SessionService.PWD_CONTEXT.handler("bcrypt").default_rounds
+
+    SessionService.PWD_CONTEXT.update(bcrypt__default_rounds=currentRounds + 1, bcrypt__min_rounds=currentRounds + 1)
+
+    try:
+        assert SessionService.PWD_CONTEXT.needs_update(oldHash)
+        assert client.post("/token/", data={"username": email, "password": password}).status_code == 201
+
+        for _ in range(50):
+            newHash = User.get_by_id(userId).senha
+            if newHash != oldHash:
+                break
+            sleep(0.05)
+
+        assert newHash != oldHash
+        assert not SessionService.PWD_CONTEXT.needs_update(newHash)
+        assert SessionService.PWD_CONTEXT.verify(password, newHash)
+    finally:
+        SessionService.PWD_CONTEXT.update(bcrypt__default_rounds=currentRounds, bcrypt__min_rounds=currentRounds)
+
+def test_send_restore_password_enqueues_email(client: TestClient, monkeypatch):
+    email = "restore@example.com"
+    TestUserHelper.register_user(client, TestUserHelper.generate_user(email, "Senha1234!"))
+
+    monkeypatch.setenv("FRONTEND_BASE_URL", "http://frontend.local")
+    monkeypatch.setenv("FRONTEND_RESTORE_ROUTE", "/restore")
+    monkeypatch.setattr(EmailService.EMAIL_DISPATCHER, "apiKey", "chave")
+    monkeypatch.setattr(EmailService.EMAIL_DISPATCHER, "sandbox", "sandbox")
+
+    response = client.post("/token/send-restore-password", json={"userEmail": email})
+
+    assert response.status_code == 200
+
+    queued = list(EmailOutbox.select().where(EmailOutbox.destinatario == email))
+    assert len(queued) == 1
+    assert queued[0].status == EmailOutbox.PENDING
+    assert "http://frontend.local/restore/" in queued[0].variaveis
@@ -1,6 +1,17 @@
+import json
+
 from fastapi.testclient import TestClient
+from peewee import IntegrityError
 from utils import UserUtils
-from helpers import TestTravelHelper
+from helpers import TestTravelHelper, TestQueryHelper
+
+from src.Model.Ambulance import Ambulance
+from src.Model.Driver import Driver
+from src.Model.Equipment import Equipment
+from src.Repository import TravelRepository
+from src.Schema.Travel.TravelRealizedEnum import TravelRealized
+from src.Utils.records import MAX_RECORD_BYTES, RECORD_TOO_LARGE
+from src.Validator.GenericValidator import mask_uuid, unmask_uuid
 
 def test_post_travel(client: TestClient):
     userToken = UserUtils.get_user(client)
@@ -46,3 +57,233 @@ def test_delete_travel_by_id(client: TestClient):
     assert deleteRequest.status_code == 200
 
     assert dict(deleteRequest.json()) == travelCanceledData
+
+def test_get_assigned_travels_by_cursor(client: TestClient):
+    userToken = UserUtils.get_user(client)
+
+    for _ in range(5):
+        assert client.post("/travel/", headers=userToken, json=TestTravelHelper.generate_travel()).status_code == 200
+
+    firstPage = client.get("/travel/assigned/", headers=userToken, params={"pageSize": 2})
+    cursor = firstPage.headers["X-Next-Cursor"]
+
+    secondPage = client.get("/travel/assigned/", headers=userToken, params={"pageSize": 2, "cursor": cursor})
+    offsetPage = client.get("/travel/assigned/", headers=userToken, params={"pageSize": 2, "page": 2})
+
+    assert [t["id"] for t in secondPage.json()] == [t["id"] for t in offsetPage.json()]
+
+    lastPage = client.get("/travel/assigned/", headers=userToken, params={"pageSize": 2, "cursor": secondPage.headers["X-Next-Cursor"]})
+
+    assert len(lastPage.json()) == 1
+    assert "X-Next-Cursor" not in lastPage.headers
+
+    ids = [t["id"] for page in (firstPage, secondPage, lastPage) for t in page.json()]
+    createdAt = [t["criado_em"] for page in (firstPage, secondPage, lastPage) for t in page.json()]
+
+    assert len(set(ids)) == 5
+    assert createdAt == sorted(createdAt, reverse=True)
+
+def test_get_assigned_travels_filters_in_sql(client: TestClient):
+    userToken = UserUtils.get_user(client)
+
+    travelIds = [client.post("/travel/", headers=userToken, json=TestTravelHelper.generate_travel()).json()["id"] for _ in range(3)]
+    assert client.post(f"/travel/cancel/{travelIds[-1]}", headers=userToken).status_code == 200
+
+    # A viagem cancelada é a mais recente, antes ela era removida da página já paginada
+    page = client.get("/travel/assigned/", headers=userToken, params={"pageSize": 2})
+    assert [t["id"] for t in page.json()] == travelIds[1::-1]
+
+    withCanceled = client.get("/travel/assigned/", headers=userToken, params={"canceled": True})
+    assert len(withCanceled.json()) == 3
+
+    notStarted = client.get("/travel/assigned/", headers=userToken, params={"realizado": [0, 1]})
+    finished = client.get("/travel/assigned/", headers=userToken, params={"realizado": 2})
+    asDriver = client.get("/travel/assigned/", headers=userToken, params={"papel": "motorista"})
+
+    assert len(notStarted.json()) == 2
+    assert finished.json() == []
+    assert asDriver.json() == []
+
+def test_travel_state_transitions(client: TestClient):
+    patientToken = UserUtils.get_user(client)
+    ambulance = Ambulance.create(status=0, placa="ABC1D23", tipo=0)
+    (driverToken, driverId) = UserUtils.get_driver(client, ambulance.id)
+    (otherDriverToken, _) = UserUtils.get_driver(client, ambulance.id)
+
+    # O cookie do último login teria prioridade sobre o header de cada requisição
+    client.cookies.clear()
+
+    travelId = client.post("/travel/", headers=patientToken, json=TestTravelHelper.generate_travel()).json()["id"]
+    TravelRepository.update_travel(unmask_uuid(travelId), id_motorista=driverId, id_ambulancia=ambulance.id)
+
+    assert client.post(f"/travel/start/{travelId}", headers=otherDriverToken).json()["erro"] == "not_user_resource"
+    assert client.post(f"/travel/end/{travelId}", headers=driverToken).json()["erro"] == "travel_not_in_progress"
+
+    started = client.post(f"/travel/start/{travelId}", headers=driverToken)
+    assert started.status_code == 200
+    assert started.json()["realizado"] == TravelRealized.EM_PROGRESSO
+    assert Driver.get_by_id(driverId).em_viagem
+
+    assert client.post(f"/travel/start/{travelId}", headers=driverToken).status_code == 409
+    assert client.post(f"/travel/cancel/{travelId}", headers=patientToken).json()["erro"] == "travel_already_started"
+
+    ended = client.post(f"/travel/end/{travelId}", headers=driverToken)
+    assert ended.status_code == 200
+    assert ended.json()["realizado"] == TravelRealized.REALIZADO
+    assert ended.json()["fim"] is not None
+    assert not Driver.get_by_id(driverId).em_viagem
+
+    assert client.post(f"/travel/end/{travelId}", headers=driverToken).json()["erro"] == "travel_not_in_progress"
+
+def test_canceled_travel_cannot_start(client: TestClient):
+    patientToken = UserUtils.get_user(client)
+    ambulance = Ambulance.create(status=0, placa="ABC1D23", tipo=0)
+    (driverToken, driverId) = UserUtils.get_driver(client, ambulance.id)
+
+    # O cookie do último login teria prioridade sobre o header de cada requisição
+    client.cookies.clear()
+
+    travelId = client.post("/travel/", headers=patientToken, json=TestTravelHelper.generate_travel()).json()["id"]
+    TravelRepository.update_travel(unmask_uuid(travelId), id_motorista=driverId, id_ambulancia=ambulance.id)
+
+    assert client.post(f"/travel/cancel/{travelId}", headers=driverToken).status_code == 403
+    assert client.post(f"/travel/cancel/{travelId}", headers=patientToken).json()["cancelada"]
+
+    # Cancelar de novo não é um erro, a viagem volta como está
+    assert client.post(f"/travel/cancel/{travelId}", headers=patientToken).status_code == 200
+    assert client.post(f"/travel/start/{travelId}", headers=driverToken).json()["erro"] == "travel_canceled"
+    assert not Driver.get_by_id(driverId).em_viagem
+
+def test_import_travels_csv(client: TestClient):
+    userToken = UserUtils.get_user(client)
+    managerToken = UserUtils.get_manager(client)
+
+    # O cookie do último login teria prioridade sobre o header de cada requisição
+    client.cookies.clear()
+    patient = client.get("/user/", headers=userToken).json()
+
+    fields = list(TestTravelHelper.generate_travel().keys())
+    # Uma linha por viagem: quebras de linha entre aspas mudariam o número das linhas com erro
+    travels = [{field: str(value).replace("\n", " ") for (field, value) in TestTravelHelper.generate_travel().items()} for _ in range(5)]
+    for travel in travels[:4]:
+        travel["cpf_paciente"] = patient["cpf"]
+    travels[2]["cpf_paciente"] = "123"
+
+    rows = [",".join(fields)] + [",".join(f'"{travel[field]}"' for field in fields) for travel in travels] + ["1,2"]
+    response = client.post("/travel/import/", headers={**managerToken, "Content-Type": "text/csv"}, content="\n".join(rows).encode())
+    errors = response.json()["erros"]
+
+    assert response.status_code == 200
+    assert response.json()["importadas"] == 3
+    assert [error["linha"] for error in errors] == [4, 6, 7]
+    assert errors[0]["erros"][0].startswith("cpf_paciente")
+    # Um CPF sem cadastro não vira viagem do gerente que importou
+    assert errors[1]["erros"] == [f"Nenhum usuário cadastrado com o CPF {travels[4]['cpf_paciente']}"]
+
+    # As viagens com o CPF de um usuário cadastrado aparecem para ele
+    assigned = client.get("/travel/assigned/", headers=userToken).json()
+    assert [travel["cpf_paciente"] for travel in assigned] == [patient["cpf"]] * 3
+    assert client.get("/travel/assigned/", headers=managerToken).json() == []
+
+def test_import_travels_ndjson(client: TestClient):
+    userToken = UserUtils.get_user(client)
+    managerToken = UserUtils.get_manager(client)
+    client.cookies.clear()
+    patient = client.get("/user/", headers=userToken).json()
+
+    body = "\n".join([json.dumps({**TestTravelHelper.generate_travel(), "cpf_paciente": patient["cpf"]}) for _ in range(3)] + ["{", ""])
+    response = client.post("/travel/import/", headers={**managerToken, "Content-Type": "application/x-ndjson"}, content=body.encode())
+
+    assert response.json()["importadas"] == 3
+    assert response.json()["erros"] == [{"linha": 4, "erros": ["JSON inválido"]}]
+
+    assert client.post("/travel/import/", headers={**managerToken, "Content-Type": "application/json"}, content=b"[]").status_code == 415
+    assert client.post("/travel/import/", headers={**userToken, "Content-Type": "application/x-ndjson"}, content=body.encode()).status_code == 403
+
+def test_get_assigned_travels_full(client: TestClient):
+    patientToken = UserUtils.get_user(client)
+    ambulance = Ambulance.create(status=0, placa="ABC1D23", tipo=0)
+    Equipment.create(id_ambulancia=ambulance.id, equipamento="Maca", descricao="Maca retrátil")
+    (driverToken, driverId) = UserUtils.get_driver(client, ambulance.id)
+
+    # O cookie do último login teria prioridade sobre o header de cada requisição
+    client.cookies.clear()
+
+    travelIds = [client.post("/travel/", headers=patientToken, json=TestTravelHelper.generate_travel()).json()["id"] for _ in range(4)]
+
+    single = client.get("/travel/assigned/full/", headers=patientToken, params={"pageSize": 1})
+
+    for travelId in travelIds[:3]:
+        TravelRepository.update_travel(unmask_uuid(travelId), id_motorista=driverId, id_ambulancia=ambulance.id)
+
+    several = client.get("/travel/assigned/full/", headers=patientToken)
+
+    assert TestQueryHelper.query_count(several) == TestQueryHelper.query_count(single) + 3
+    TestQueryHelper.assert_max_queries(several, 6)
+
+    travels = {travel["id"]: travel for travel in several.json()}
+    assigned = travels[travelIds[0]]
+
+    assert assigned["motorista"]["id"] == str(mask_uuid(driverId))
+    assert assigned["motorista"]["cnh"] == "00000000000"
+    assert assigned["ambulancia"]["placa"] == "ABC1D23"
+    assert [equipment["equipamento"] for equipment in assigned["ambulancia"]["equipamentos"]] == ["Maca"]
+    assert travels[travelIds[3]]["motorista"] is None and travels[travelIds[3]]["ambulancia"] is None
+
+    detail = client.get(f"/travel/{travelIds[0]}/full", headers=driverToken)
+
+    assert detail.status_code == 200
+    assert detail.json() == assigned
+
+def test_get_travel_full_only_for_its_patient_driver_or_manager(client: TestClient):
+    patientToken = UserUtils.get_user(client)
+    otherToken = UserUtils.get_user(client)
+    otherDriverToken = UserUtils.get_driver(client)[0]
+    managerToken = UserUtils.get_manager(client)
+    client.cookies.clear()
+
+    travelId = client.post("/travel/", headers=patientToken, json=TestTravelHelper.generate_travel()).json()["id"]
+
+    assert client.get(f"/travel/{travelId}/full", headers=patientToken).status_code == 200
+    assert client.get(f"/travel/{travelId}/full", headers=managerToken).status_code == 200
+
+    for token in (otherToken, otherDriverToken):
+        request = client.get(f"/travel/{travelId}/full", headers=token)
+
+        assert request.status_code == 403
+        assert "motorista" not in request.json()
+
+def test_import_travels_rejects_unclosed_quote_and_resyncs(client: TestClient):
+    managerToken = UserUtils.get_manager(client)
+    cpf = client.get("/user/", headers=managerToken).json()["cpf"]
+
+    fields = list(TestTravelHelper.generate_travel().keys())
+    # Uma linha por viagem: quebras de linha entre aspas mudariam onde a leitura recomeça
+    travels = [{field: str(value).replace("\n", " ") for (field, value) in {**TestTravelHelper.generate_travel(), "cpf_paciente": cpf}.items()} for _ in range(800)]
+    rows = [",".join(f'"{travel[field]}"' for field in fields) for travel in travels]
+    body = "\n".join([",".join(fields), '"aspas sem fechamento'] + rows)
+
+    assert len(body.encode()) > 2 * MAX_RECORD_BYTES
+
+    response = client.post("/travel/import/", headers={**managerToken, "Content-Type": "text/csv"}, content=body.encode())
+    result = response.json()
+
+    assert response.status_code == 200
+    assert result["erros"] == [{"linha": 2, "erros": [RECORD_TOO_LARGE]}]
+    # As linhas engolidas pelo registro sem fechamento ficam de fora, depois dele a leitura continua
+    assert 0 < result["importadas"] < 800
+
+def test_import_travels_reports_database_error_of_each_row(client: TestClient, monkeypatch):
+    managerToken = UserUtils.get_manager(client)
+
+    def failing_insert(*args):
+        raise IntegrityError("FOREIGN KEY constraint failed\nDETAIL: chave estrangeira")
+
+    monkeypatch.setattr(TravelRepository, "insert_travels", failing_insert)
+    monkeypatch.setattr(TravelRepository, "insert_travel", failing_insert)
+
+    cpf = client.get("/user/", headers=managerToken).json()["cpf"]
+    body = json.dumps({**TestTravelHelper.generate_travel(), "cpf_paciente": cpf})
+    response = client.post("/travel/import/", headers={**managerToken, "Content-Type": "application/x-ndjson"}, content=body.encode())
+
+    assert response.json()["erros"] == [{"linha": 1, "erros": ["Não foi possível gravar a viagem: FOREIGN KEY constraint failed"]}]
@@ -0,0 +1,15 @@
+from httpx import Response
+
+from src.DB.QueryCounter import QUERY_COUNT_HEADER, QUERY_TIME_HEADER
+
+def query_count(response: Response) -> int:
+    assert QUERY_COUNT_HEADER in response.headers, f"Resposta sem {QUERY_COUNT_HEADER}, os testes precisam rodar com environment = DEV"
+    return int(response.headers[QUERY_COUNT_HEADER])
+
+def query_time_ms(response: Response) -> float:
+    return float(response.headers[QUERY_TIME_HEADER])
+
+def assert_max_queries(response: Response, maximum: int) -> None:
+    """ Falha se a requisição fez mais de `maximum` consultas ao banco """
+    count = query_count(response)
+    assert count <= maximum, f"{response.request.method} {response.request.url.path} fez {count} consultas (máximo {maximum})"
@@ -0,0 +1,46 @@
+import asyncio
+import threading
+from types import ModuleType
+
+from fastapi.testclient import TestClient
+
+from src.DB import db
+from src.DB.Executor import executor_for, run_in_db
+from src.Model.User import User
+from src.Repository import UserRepository
+from src.Repository.AsyncRepository import AsyncRepository
+
+from helpers import TestUserHelper
+
+def test_async_repository_runs_off_loop(client: TestClient):
+    FakeRepository = ModuleType("FakeRepository")
+    FakeRepository.current_thread = lambda: threading.current_thread().name
+
+    async def main():
+        return (threading.current_thread().name, await AsyncRepository(FakeRepository).current_thread())
+
+    (loopThread, dbThread) = asyncio.run(main())
+
+    assert dbThread != loopThread
+    assert dbThread.startswith("db-")
+
+def test_async_repository_materializes_queries(client: TestClient):
+    TestUserHelper.register_user(client, TestUserHelper.generate_user())
+
+    result = asyncio.run(run_in_db(lambda: User.select()))
+
+    assert isinstance(result, list)
+    assert len(result) == 1
+
+def test_async_repository_reuses_database_executor(client: TestClient):
+    user = TestUserHelper.register_user(client, TestUserHelper.generate_user())
+    UserRepositoryAsync = AsyncRepository(UserRepository)
+
+    async def main():
+        return await asyncio.gather(*(UserRepositoryAsync.find_by_email(user["email"]) for _ in range(8)))
+
+    completed = executor_for(db.current()).stats()["concluidas"]
+    users = asyncio.run(main())
+
+    assert all(u is not None and u.email == user["email"] for u in users)
+    assert executor_for(db.current()).stats()["concluidas"] == completed + 8
@@ -0,0 +1,47 @@
+from time import sleep
+
+from src.Utils.cache import TTLCache
+
+def test_cache_hit_and_miss():
+    cache = TTLCache(maxSize=4, ttl=60)
+
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+def test_cache_evicts_least_recently_used():
+    cache = TTLCache(maxSize=2, ttl=60)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+def test_cache_expires_entries():
+    cache = TTLCache(maxSize=2, ttl=0.01)
+
+    cache.set("a", 1)
+    sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+def test_cache_delete_where():
+    cache = TTLCache(maxSize=8, ttl=60)
+
+    cache.set("s1", ("u1", "s1"))
+    cache.set("s2", ("u1", "s2"))
+    cache.set("s3", ("u2", "s3"))
+
+    assert cache.delete_where(lambda key, value: value[0] == "u1") == 2
+    assert cache.get("s3") == ("u2", "s3")
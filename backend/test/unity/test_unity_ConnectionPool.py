@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+from peewee import PostgresqlDatabase
+from playhouse.pool import MaxConnectionsExceeded
+
+from src.DB.Connection import MonitoredPooledPostgresqlDatabase
+
+class FakeConnection:
+    """ Conexão mínima do psycopg2 para testar o pool sem um servidor Postgres """
+    closed = 0
+
+    def get_transaction_status(self) -> int:
+        return 0
+
+    def close(self) -> None:
+        self.closed = 1
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(PostgresqlDatabase, "_connect", lambda self: FakeConnection())
+
+    database = MonitoredPooledPostgresqlDatabase("teste", max_connections=2, timeout=0.3)
+    database.server_version = (16, 0)
+
+    yield database
+
+    database.close_all()
+
+def test_pool_reuses_connections_and_counts(pool):
+    pool.connect()
+    pool.close()
+    pool.connect()
+
+    assert pool.stats()["criadas"] == 1
+    assert pool.stats()["em_uso"] == 1
+
+    pool.close()
+
+    assert pool.stats()["em_uso"] == 0
+    assert pool.stats()["disponiveis"] == 1
+
+def test_pool_counts_timeouts_when_exhausted(pool):
+    def hold() -> None:
+        pool.connect()
+
+    for _ in range(2):
+        thread = threading.Thread(target=hold)
+        thread.start()
+        thread.join()
+
+    with pytest.raises(MaxConnectionsExceeded):
+        pool.connect()
+
+    stats = pool.stats()
+    assert stats["em_uso"] == 2
+    assert stats["timeouts"] == 1
+    assert stats["aguardando"] == 0
+
+def test_pool_closes_idle_connections(pool):
+    pool.connect()
+    pool.close()
+
+    assert pool.close_idle_older_than(60) == 0
+    assert pool.close_idle_older_than(-1) == 1
+    assert pool.stats()["disponiveis"] == 0
+    assert pool.stats()["fechadas_ociosas"] == 1
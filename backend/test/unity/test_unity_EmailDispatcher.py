@@ -0,0 +1,101 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from src.Model.EmailOutbox import EmailOutbox
+from src.Repository import EmailOutboxRepository
+from src.Service.EmailService import EmailDispatcher, enqueue_email
+
+def make_dispatcher(handler, maxAttempts: int = 3) -> EmailDispatcher:
+    return EmailDispatcher("http://mailgun.local/v3", "chave", "sandbox", transport=httpx.MockTransport(handler), maxAttempts=maxAttempts)
+
+def test_dispatcher_sends_batch_over_one_client(client):
+    received = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received.append(request)
+        return httpx.Response(200, json={"message": "Queued"})
+
+    emails = [enqueue_email(f"user{i}@mail.com", "Assunto", "password-restore", {"USERNAME": f"user{i}"}) for i in range(3)]
+
+    dispatcher = make_dispatcher(handler)
+
+    async def run() -> int:
+        try:
+            return await dispatcher.dispatch_pending()
+        finally:
+            await dispatcher.close()
+
+    assert asyncio.run(run()) == 3
+    assert len(received) == 3
+    assert received[0].url.path == "/v3/sandbox.mailgun.org/messages"
+
+    body = dict(httpx.QueryParams(received[0].content.decode()))
+    assert body["template"] == "password-restore"
+    assert json.loads(body["h:X-Mailgun-Variables"])["USERNAME"].startswith("user")
+
+    for email in emails:
+        assert EmailOutboxRepository.find_email_by_id(email.str_id).status == EmailOutbox.SENT
+
+def test_dispatcher_retries_with_backoff_then_fails(client):
+    email = enqueue_email("user@mail.com", "Assunto", "password-restore", {})
+
+    dispatcher = make_dispatcher(lambda request: httpx.Response(503), maxAttempts=2)
+
+    assert asyncio.run(dispatcher.dispatch_pending()) == 0
+
+    retried = EmailOutboxRepository.find_email_by_id(email.str_id)
+    assert retried.status == EmailOutbox.PENDING
+    assert retried.tentativas == 1
+    assert "503" in retried.ultimo_erro
+
+    assert EmailOutboxRepository.find_due_emails(10) == []
+
+    EmailOutbox.update(proxima_tentativa="2000-01-01T00:00:00+00:00").where(EmailOutbox.id == email.str_id).execute()
+
+    assert asyncio.run(dispatcher.dispatch_pending()) == 0
+    assert EmailOutboxRepository.find_email_by_id(email.str_id).status == EmailOutbox.FAILED
+
+def test_dispatcher_does_not_retry_rejected_email(client):
+    email = enqueue_email("invalido", "Assunto", "password-restore", {})
+
+    dispatcher = make_dispatcher(lambda request: httpx.Response(400, json={"message": "to parameter is not a valid address"}))
+
+    asyncio.run(dispatcher.dispatch_pending())
+
+    assert EmailOutboxRepository.find_email_by_id(email.str_id).status == EmailOutbox.FAILED
+
+def test_workers_claim_disjoint_batches(client):
+    emails = [enqueue_email(f"user{i}@mail.com", "Assunto", "password-restore", {}) for i in range(5)]
+    leaseUntil = datetime.now(timezone.utc) + timedelta(minutes=2)
+
+    first = EmailOutboxRepository.claim_due_emails("a" * 32, 3, leaseUntil)
+    second = EmailOutboxRepository.claim_due_emails("b" * 32, 3, leaseUntil)
+
+    assert (len(first), len(second)) == (3, 2)
+    assert {email.str_id for email in first + second} == {email.str_id for email in emails}
+    assert EmailOutboxRepository.claim_due_emails("c" * 32, 3, leaseUntil) == []
+
+    # Resultado de um lote cuja reserva passou para outro worker é ignorado
+    EmailOutboxRepository.update_dispatch_results("b" * 32, [first[0].str_id], [], [])
+    assert EmailOutboxRepository.find_email_by_id(first[0].str_id).status == EmailOutbox.PENDING
+
+def test_concurrent_dispatchers_send_each_email_once(client):
+    received = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received.append(dict(httpx.QueryParams(request.content.decode()))["to"])
+        return httpx.Response(200, json={"message": "Queued"})
+
+    for i in range(6):
+        enqueue_email(f"user{i}@mail.com", "Assunto", "password-restore", {})
+
+    dispatchers = [make_dispatcher(handler) for _ in range(3)]
+
+    async def run() -> list[int]:
+        return await asyncio.gather(*(dispatcher.dispatch_pending() for dispatcher in dispatchers))
+
+    assert sum(asyncio.run(run())) == 6
+    assert sorted(received) == sorted(f"user{i}@mail.com" for i in range(6))
@@ -0,0 +1,33 @@
+import asyncio
+from threading import Event
+
+import pytest
+
+from src.Utils.executor import BoundedExecutor
+from src.Error.Server.ServerBusyError import ServerBusy
+
+def test_executor_runs_off_loop():
+    executor = BoundedExecutor(maxWorkers=1, queueLimit=0, name="test")
+
+    async def main():
+        return await executor.run(lambda a, b: a + b, 1, 2)
+
+    assert asyncio.run(main()) == 3
+    assert executor.stats()["concluidas"] == 1
+
+def test_executor_rejects_when_queue_is_full():
+    executor = BoundedExecutor(maxWorkers=1, queueLimit=0, name="test")
+    release = Event()
+
+    async def main():
+        blocked = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(ServerBusy):
+            await executor.run(lambda: None)
+
+        release.set()
+        await blocked
+
+    asyncio.run(main())
+    assert executor.stats()["recusadas"] == 1
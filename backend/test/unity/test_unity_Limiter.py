@@ -0,0 +1,49 @@
+from ipaddress import ip_network
+
+from limits import parse
+from limits.strategies import SlidingWindowCounterRateLimiter
+from limits.storage import storage_from_string
+
+from starlette.requests import Request
+
+from src.Utils import limiter
+from src.Utils.limiter import SqliteStorage
+
+def test_sqlite_storage_shares_counters_between_instances(tmp_path):
+    uri = f"sqlite:///{tmp_path / 'ratelimit.db'}"
+
+    first = storage_from_string(uri)
+    second = storage_from_string(uri)
+
+    assert isinstance(first, SqliteStorage)
+
+    assert first.incr("chave", 60) == 1
+    assert second.incr("chave", 60) == 2
+    assert first.get("chave") == 2
+
+    first.clear("chave")
+    assert second.get("chave") == 0
+
+def test_sqlite_storage_sliding_window_limit(tmp_path):
+    limiter = SlidingWindowCounterRateLimiter(storage_from_string(f"sqlite:///{tmp_path / 'ratelimit.db'}"))
+    item = parse("3/minute")
+
+    assert [limiter.hit(item, "login", "a@b.com") for _ in range(4)] == [True, True, True, False]
+    assert limiter.hit(item, "login", "outro@b.com")
+
+def make_request(client: str, forwarded: str | None = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "client": (client, 1234), "headers": headers})
+
+def test_forwarded_for_is_ignored_without_trusted_proxy(monkeypatch):
+    monkeypatch.setattr(limiter, "TRUSTED_PROXIES", [])
+
+    assert limiter.get_client_ip(make_request("203.0.113.7", "198.51.100.1")) == "203.0.113.7"
+
+def test_forwarded_for_from_trusted_proxy(monkeypatch):
+    monkeypatch.setattr(limiter, "TRUSTED_PROXIES", [ip_network("10.0.0.0/8")])
+
+    # O cliente pode escrever endereços no começo da lista, vale o último antes dos proxies
+    assert limiter.get_client_ip(make_request("10.0.0.2", "1.2.3.4, 198.51.100.1, 10.0.0.3")) == "198.51.100.1"
+    assert limiter.get_client_ip(make_request("10.0.0.2")) == "10.0.0.2"
+    assert limiter.get_client_ip(make_request("203.0.113.7", "198.51.100.1")) == "203.0.113.7"
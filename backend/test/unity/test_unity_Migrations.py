@@ -0,0 +1,108 @@
+import pytest
+from peewee import SqliteDatabase, PostgresqlDatabase
+
+from src.DB import db
+from src.DB.Migrations import MIGRATION_RUNNER
+from src.DB.Migrations.Runner import MigrationRunner, MigrationStep
+from src.DB.Migrations.Operations import CreateIndex, DropIndex
+from src.DB.Migration import MODELS
+from src.Model.SchemaMigration import SchemaMigration
+from src.Model.Travel import Travel
+from src.Model.User import User
+from src.Model.UserSession import Session
+
+from datetime import date, datetime, timedelta, timezone
+
+@pytest.fixture
+def empty_db(tmp_path):
+    previous = db.obj
+    database = SqliteDatabase(str(tmp_path / "migrations.db"))
+
+    db.initialize(database)
+
+    yield database
+
+    database.close()
+    db.initialize(previous)
+
+def index_names(database, table: str) -> set[str]:
+    return {index.name for index in database.get_indexes(table)}
+
+def test_plan_does_not_touch_database(empty_db):
+    plan = MIGRATION_RUNNER.plan()
+
+    assert [step["versao"] for step in plan] == [1, 2, 4, 5, 6, 7]
+    assert "CREATE TABLE IF NOT EXISTS usuario" in plan[0]["operacoes"][0]
+    assert any("transporte_id_paciente_id_criado_em" in operation for operation in plan[1]["operacoes"])
+    assert empty_db.get_tables() == []
+
+def test_migrate_records_versions_and_is_idempotent(empty_db):
+    report = MIGRATION_RUNNER.migrate()
+
+    assert [step["versao"] for step in report] == [1, 2, 4, 5, 6, 7]
+    assert report[0]["tempo_ms"] >= 0
+    assert set(model._meta.table_name for model in MODELS) <= set(empty_db.get_tables())
+    assert SchemaMigration.select().count() == 6
+
+    assert MIGRATION_RUNNER.migrate() == []
+    assert MIGRATION_RUNNER.plan() == []
+
+def test_new_versions_apply_in_order(empty_db):
+    MIGRATION_RUNNER.migrate()
+
+    index = CreateIndex(Travel, ["id_paciente", "inicio"])
+    runner = MigrationRunner(MIGRATION_RUNNER.steps + [MigrationStep(99, "indice de teste", lambda: [index])])
+
+    assert [step["versao"] for step in runner.plan()] == [99]
+
+    runner.migrate()
+    assert index.name in index_names(empty_db, "transporte")
+
+    index.run(empty_db)
+    DropIndex(index.name).run(empty_db)
+    DropIndex(index.name).run(empty_db)
+    assert index.name not in index_names(empty_db, "transporte")
+
+def test_query_indexes_replace_single_column_foreign_keys(empty_db):
+    MIGRATION_RUNNER.migrate()
+    indexes = index_names(empty_db, "transporte")
+
+    assert {"transporte_id_paciente_id_cancelada_criado_em_id", "transporte_id_motorista_id_cancelada_criado_em_id", "transporte_criado_em"} <= indexes
+    assert not {"travel_id_paciente_id", "travel_id_motorista_id", "transporte_id_paciente_id_criado_em", "transporte_id_motorista_id_criado_em"} & indexes
+
+def test_iso_text_timestamps_become_utc(empty_db):
+    MigrationRunner(MIGRATION_RUNNER.steps[:2]).migrate()
+
+    user = User.create(email="utc@mail.com", nome="UTC", senha="x", cpf="00000000000", telefone="000000000000", nascimento=date(1990, 1, 1))
+    now = datetime.now(timezone.utc)
+    legacy = {
+        "expirada": (now - timedelta(minutes=5)).isoformat(),
+        # 20 minutos no futuro em -03:00, o texto sozinho pareceria expirado
+        "valida": (now + timedelta(minutes=20)).astimezone(timezone(timedelta(hours=-3))).isoformat()
+    }
+
+    for (id, validUntil) in legacy.items():
+        empty_db.execute_sql(
+            'INSERT INTO "sessao" ("id", "usuario_id", "ip", "refresh", "valido_ate", "criado_em") VALUES (?, ?, ?, 0, ?, ?)',
+            (id, user.id, "127.0.0.1", validUntil, now.isoformat())
+        )
+
+    MIGRATION_RUNNER.migrate()
+
+    stored = dict(empty_db.execute_sql('SELECT "id", "valido_ate" FROM "sessao"').fetchall())
+    assert stored["valida"] == (now + timedelta(minutes=20)).strftime("%Y-%m-%d %H:%M:%S.%f")
+
+    assert [session.id for session in Session.select().where(Session.expired())] == ["expirada"]
+    assert Session.get_by_id("valida").valido_ate == now + timedelta(minutes=20)
+
+def test_versions_must_be_ordered():
+    with pytest.raises(ValueError):
+        MigrationRunner([MigrationStep(2, "b", list), MigrationStep(1, "a", list)])
+
+def test_postgres_index_is_built_concurrently():
+    postgres = PostgresqlDatabase("sga")
+    index = CreateIndex(Travel, ["id_paciente"], unique=False)
+
+    assert index.sql(postgres) == 'CREATE INDEX CONCURRENTLY IF NOT EXISTS "transporte_id_paciente_id" ON "transporte" ("id_paciente_id")'
+    assert not index.is_transactional(postgres)
+    assert DropIndex(index.name).sql(postgres).startswith("DROP INDEX CONCURRENTLY")
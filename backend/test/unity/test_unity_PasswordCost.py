@@ -0,0 +1,32 @@
+import asyncio
+
+from src.Logging import Level
+from src.Model.User import User
+from src.Repository import UserRepository
+from src.Service import SessionService
+from src.Service.SessionService import benchmark_bcrypt_rounds
+
+def test_benchmark_respects_bounds():
+    (rounds, _) = benchmark_bcrypt_rounds(targetMs=0, minRounds=4, maxRounds=6, samples=1)
+    assert rounds == 4
+
+    (rounds, estimatedMs) = benchmark_bcrypt_rounds(targetMs=10**9, minRounds=4, maxRounds=6, samples=1)
+    assert rounds == 6
+    assert estimatedMs > 0
+
+def test_background_rehash_logs_failures(client, monkeypatch):
+    logged = []
+
+    def failing_update(*args):
+        raise RuntimeError("banco indisponível")
+
+    monkeypatch.setattr(UserRepository, "update_password_hash", failing_update)
+    monkeypatch.setattr(SessionService.Logging, "log", lambda message, level: logged.append((message, level)))
+
+    async def run() -> None:
+        SessionService.rehash_password_in_background(User(id="0" * 32, senha="hash"), "Senha1234!")
+        await asyncio.gather(*SessionService.REHASH_TASKS, return_exceptions=True)
+
+    asyncio.run(run())
+
+    assert ("Falha ao refazer o hash da senha: RuntimeError('banco indisponível')", Level.ERROR) in logged
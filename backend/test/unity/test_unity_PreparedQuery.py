@@ -0,0 +1,59 @@
+from peewee import PostgresqlDatabase
+
+from src.DB import db
+from src.DB.Connection import MonitoredPooledPostgresqlDatabase
+from src.DB.PreparedQuery import execute_prepared
+from src.DB.QueryCounter import begin_query_count, end_query_count
+from src.Model.User import User
+from src.Repository import SessionRepository, UserRepository
+
+from helpers import TestUserHelper
+
+def test_prepared_query_matches_peewee_and_compiles_once(client):
+    userId = TestUserHelper.register_user(client, TestUserHelper.generate_user())["id"].replace("-", "")
+
+    user = UserRepository.find_by_id(userId)
+    compiled = UserRepository.FIND_BY_ID.compiled(db.obj)
+
+    assert user == User.get_by_id(userId)
+    assert UserRepository.find_by_id("0" * 32) is None
+    assert UserRepository.FIND_BY_ID.compiled(db.obj) is compiled
+
+def test_joined_prepared_query_loads_user_without_extra_query(client):
+    userData = TestUserHelper.generate_user()
+    TestUserHelper.register_user(client, userData)
+    TestUserHelper.authenticate_user(client, userData["email"], userData["senha"])
+
+    sessionId = SessionRepository.find_all()[-1].str_id
+
+    (stats, token) = begin_query_count()
+    try:
+        session = SessionRepository.find_session_with_user_by_session_id(sessionId)
+        email = session.usuario.email
+    finally:
+        end_query_count(token)
+
+    assert email == userData["email"]
+    assert stats.count == 1
+
+def test_postgres_statement_is_prepared_once_per_connection(monkeypatch):
+    database = MonitoredPooledPostgresqlDatabase("sga")
+    statements = []
+    connections = iter([object(), object()])
+    connection = next(connections)
+
+    monkeypatch.setattr(database, "connection", lambda: connection)
+    monkeypatch.setattr(database, "execute_sql", lambda sql, params=None: statements.append((sql, params)))
+
+    compiled = UserRepository.FIND_BY_ID.compiled(PostgresqlDatabase("sga"))
+
+    assert compiled.preparedSql.endswith('WHERE ("t1"."id" = $1) LIMIT $2')
+
+    execute_prepared(database, compiled, ["a", 1])
+    execute_prepared(database, compiled, ["b", 1])
+
+    connection = next(connections)
+    execute_prepared(database, compiled, ["c", 1])
+
+    assert [sql.split(" ")[0] for (sql, _) in statements] == ["PREPARE", "EXECUTE", "EXECUTE", "PREPARE", "EXECUTE"]
+    assert statements[1] == (f"EXECUTE {compiled.name}(%s, %s)", ["a", 1])
@@ -0,0 +1,38 @@
+from peewee import SqliteDatabase
+
+from src.DB import QueryCounter
+from src.DB.QueryCounter import QueryStats, begin_query_count, end_query_count, statement_shape, use_query_counter
+
+def test_statement_shape_ignores_parameter_list_length():
+    assert statement_shape('SELECT * FROM "t" WHERE "id" IN (?, ?, ?)') == statement_shape('SELECT * FROM "t" WHERE "id" IN (?)')
+    assert statement_shape("SELECT * FROM t WHERE id IN (%s, %s)") == "SELECT * FROM t WHERE id IN (%s, ...)"
+
+def test_counts_only_inside_a_request():
+    database = use_query_counter(SqliteDatabase(":memory:"))
+    database.execute_sql("SELECT 1")
+
+    (stats, token) = begin_query_count()
+    try:
+        database.execute_sql("SELECT 1")
+        database.execute_sql("SELECT 2")
+    finally:
+        end_query_count(token)
+
+    assert stats.count == 2
+    assert stats.elapsed_ms >= 0
+
+def test_repeated_statement_warns_once(monkeypatch):
+    warnings = []
+    monkeypatch.setattr(QueryCounter, "N_PLUS_ONE_THRESHOLD", 2)
+    monkeypatch.setattr(QueryCounter.Logging, "log", lambda message, level: warnings.append(message))
+
+    stats = QueryStats("GET /ambulance/")
+
+    for _ in range(5):
+        stats.record('SELECT * FROM "equipamento" WHERE "id_ambulancia_id" = ?', 0.001)
+
+    stats.record('SELECT * FROM "ambulance"', 0.001)
+
+    assert stats.count == 6
+    assert len(warnings) == 1
+    assert "GET /ambulance/" in warnings[0]
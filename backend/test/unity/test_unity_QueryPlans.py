@@ -0,0 +1,167 @@
+import os
+import re
+from types import SimpleNamespace
+from datetime import datetime, timezone
+
+import pytest
+from peewee import SqliteDatabase
+
+from src.DB import db, db_replicas
+from src.DB.Migrations import MIGRATION_RUNNER
+from src.DB.Sweeper import SWEEPER
+from src.Schema.Travel.TravelFilterSchema import TravelFilterSchema
+from src.Schema.Travel.TravelRealizedEnum import TravelRealized
+from src.Schema.Travel.TravelRoleEnum import TravelRole
+from src.Repository import TravelRepository, SessionRepository, RestorePasswordRepository, EmailOutboxRepository, ManagerRepository, AmbulanceRepository, UserRepository, DriverRepository
+
+# Linhas de viagens e sessões, QUERY_PLAN_ROWS=1000000 roda na escala de produção (~400MB e alguns segundos a mais)
+ROWS = int(os.environ.get("QUERY_PLAN_ROWS", "100000"))
+
+USERS = max(ROWS // 100, 10)
+SMALL = max(ROWS // 10, 10)
+AMBULANCES = max(ROWS // 1000, 10)
+
+# Chaves em hex com um prefixo por tabela, válidas como UUID também com DB_UUID_STORAGE=native
+USER_ID = "f%031d" % 7
+DRIVER_ID = "f%031d" % 8
+AMBULANCE_ID = "a%031d" % 3
+
+# "SCAN tabela" sem índice é uma leitura da tabela inteira (formatos antigo e novo do SQLite)
+FULL_SCAN = re.compile(r"^SCAN (TABLE )?\w+( AS \w+)?$")
+
+SEED = [
+    f"""INSERT INTO usuario (id, email, senha, nome, nascimento, cpf, telefone, cargo)
+        SELECT printf('f%031d', n), 'usuario' || n || '@mail.com', 'x', 'Usuario', '2000-01-01', printf('%011d', n), printf('%012d', n), n % 3
+        FROM seq WHERE n <= {USERS}""",
+    f"""INSERT INTO ambulance (id, status, placa, tipo)
+        SELECT printf('a%031d', n), 0, printf('A%07d', n), 0 FROM seq WHERE n <= {AMBULANCES}""",
+    f"""INSERT INTO motorista (id_id, id_ambulancia_id, em_viagem, cnh, vencimento)
+        SELECT printf('f%031d', n), printf('a%031d', n), 0, printf('%011d', n), '2030-01-01' FROM seq WHERE n <= {AMBULANCES}""",
+    f"""INSERT INTO equipamento (id, id_ambulancia_id, equipamento, descricao)
+        SELECT printf('e%031d', n), printf('a%031d', n % {AMBULANCES}), 'Maca', 'Maca' FROM seq WHERE n <= {SMALL}""",
+    f"""INSERT INTO transporte (id, realizado, inicio, id_paciente_id, cpf_paciente, estado_paciente, id_motorista_id, id_ambulancia_id,
+                               lat_inicio, long_inicio, end_inicio, lat_fim, long_fim, end_fim, cancelada, criado_em)
+        SELECT printf('c%031d', n), n % 3, datetime('2025-01-01', '+' || n || ' minutes'), printf('f%031d', n % {USERS}), '00000000000', 0,
+               CASE WHEN n % 4 = 0 THEN printf('f%031d', n % {AMBULANCES}) END, NULL, 0, 0, 'Rua', 0, 0, 'Rua', 0,
+               datetime('2025-01-01', '+' || n || ' seconds')
+        FROM seq WHERE n <= {ROWS}""",
+    f"""INSERT INTO sessao (id, usuario_id, ip, refresh, valido_ate, criado_em)
+        SELECT printf('d%031d', n), printf('f%031d', n % {USERS}), '127.0.0.1', n % 2,
+               CASE WHEN n % 100 = 0 THEN '2000-01-01T00:00:00+00:00' ELSE '2999-01-01T00:00:00+00:00' END, '2025-01-01T00:00:00+00:00'
+        FROM seq WHERE n <= {ROWS}""",
+    f"""INSERT INTO restaurar_senha (id, usuario_id, valido_ate)
+        SELECT printf('b%031d', n), printf('f%031d', n % {USERS}),
+               CASE WHEN n % 100 = 0 THEN '2000-01-01T00:00:00+00:00' ELSE '2999-01-01T00:00:00+00:00' END
+        FROM seq WHERE n <= {SMALL}""",
+    f"""INSERT INTO atualizar_token (id, fator_cargo, usado, usuario, criado_em, revogado_em)
+        SELECT printf('ab%030d', n), 1 + n % 2, n % 100 != 0, NULL, '2025-01-01',
+               CASE WHEN n % 100 != 0 THEN datetime('2025-01-01', '+' || (n % 365) || ' days') END
+        FROM seq WHERE n <= {SMALL}""",
+    f"""INSERT INTO email_saida (id, destinatario, assunto, template, variaveis, status, tentativas, proxima_tentativa, criado_em, enviado_em)
+        SELECT printf('ae%030d', n), 'usuario@mail.com', 'Assunto', 'template', '{{}}',
+               CASE WHEN n % 100 = 0 THEN 'pendente' ELSE 'enviado' END, 0, '2025-01-01T00:00:00+00:00', '2025-01-01T00:00:00+00:00',
+               CASE WHEN n % 100 != 0 THEN '2999-01-01T00:00:00+00:00' END
+        FROM seq WHERE n <= {SMALL}"""
+]
+
+@pytest.fixture(scope="module")
+def seeded_db(tmp_path_factory):
+    """ Banco com o esquema das migrações, populado em SQL puro e com estatísticas do ANALYZE """
+    previous = (db.obj, db_replicas.databases)
+    database = SqliteDatabase(str(tmp_path_factory.mktemp("plans") / "plans.db"), pragmas={"journal_mode": "off", "synchronous": 0})
+
+    db.initialize(database)
+    db_replicas.initialize([])
+
+    MIGRATION_RUNNER.migrate()
+
+    with database.atomic():
+        for statement in SEED:
+            database.execute_sql(f"WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < {ROWS}) {statement}")
+
+    database.execute_sql("ANALYZE")
+
+    yield database
+
+    database.close()
+    db.initialize(previous[0])
+    db_replicas.initialize(previous[1])
+
+def captured_queries(database: SqliteDatabase, monkeypatch, call) -> list[tuple[str, tuple]]:
+    """ Executa `call` e retorna o SQL e os parâmetros de cada consulta enviada ao banco """
+    queries = []
+    execute_sql = database.execute_sql
+
+    def recorder(sql, params=None, *args, **kwargs):
+        queries.append((sql, tuple(params or ())))
+        return execute_sql(sql, params, *args, **kwargs)
+
+    monkeypatch.setattr(database, "execute_sql", recorder)
+    call()
+    monkeypatch.undo()
+
+    return queries
+
+def query_plan(database: SqliteDatabase, sql: str, params: tuple) -> list[str]:
+    return [row[-1] for row in database.execute_sql(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
+
+user = SimpleNamespace(id=USER_ID)
+driver = SimpleNamespace(id=DRIVER_ID)
+
+DRIVER_HOME_FILTER = TravelFilterSchema(papel=TravelRole.MOTORISTA, realizado=[TravelRealized.NAO_REALIZADO, TravelRealized.EM_PROGRESSO])
+PATIENT_HISTORY_FILTER = TravelFilterSchema(papel=TravelRole.PACIENTE, inicio_de=datetime(2025, 1, 1), inicio_ate=datetime(2025, 2, 1))
+
+TRAVEL_CURSOR = TravelRepository.TRAVEL_KEYSET.cursor(SimpleNamespace(__data__={"criado_em": datetime(2025, 1, 1, tzinfo=timezone.utc), "id": "c%031d" % 10}))
+
+# Leituras da tabela inteira por definição ficam de fora: count_token, UserRepository.count,
+# SessionRepository.find_all e ManagerRepository.find_all_tokens
+REPOSITORY_CALLS = {
+    "viagens do paciente": lambda: TravelRepository.find_assigned_travels(user, 1, 15),
+    "viagens do motorista": lambda: TravelRepository.find_assigned_travels(driver, 2, 15),
+    "viagens recentes": lambda: TravelRepository.find_all_travels(15, 3),
+    "viagens do paciente por cursor": lambda: TravelRepository.find_assigned_travels(user, 1, 15, TRAVEL_CURSOR),
+    "viagens recentes por cursor": lambda: TravelRepository.find_all_travels(15, 0, TRAVEL_CURSOR),
+    "viagens filtradas do motorista": lambda: TravelRepository.find_travels(driver, DRIVER_HOME_FILTER, 1, 15),
+    "viagens filtradas do paciente": lambda: TravelRepository.find_travels(user, PATIENT_HISTORY_FILTER, 1, 15, TRAVEL_CURSOR),
+    "viagem por id": lambda: TravelRepository.find_travel_by_id("c%031d" % 10),
+    "viagens com ambulância": lambda: TravelRepository.find_travels(user, TravelFilterSchema(), 1, 15, TRAVEL_CURSOR, joined=True),
+    "viagem com ambulância por id": lambda: TravelRepository.find_travel_joined_by_id("c%031d" % 10),
+    "motoristas com usuário": lambda: DriverRepository.find_drivers_by_ids([DRIVER_ID]),
+    "sessões do usuário": lambda: SessionRepository.find_all_by_user(user),
+    "sessão com usuário": lambda: SessionRepository.find_session_with_user_by_session_id("d%031d" % 10),
+    "deletar sessões do usuário": lambda: SessionRepository.delete_all_user_tokens_by_id(DRIVER_ID),
+    "deletar sessões expiradas": SessionRepository.delete_expired_sessions,
+    "deletar códigos do usuário": lambda: RestorePasswordRepository.delete_all_user_restore_codes(USER_ID),
+    "emails pendentes": lambda: EmailOutboxRepository.find_due_emails(50),
+    "tokens livres": lambda: ManagerRepository.find_unused_tokens_by_role(2),
+    "ambulâncias": lambda: AmbulanceRepository.find_ambulances_by_page(2, 10),
+    "ambulâncias por cursor": lambda: AmbulanceRepository.find_ambulances_by_page(0, 10, AmbulanceRepository.AMBULANCE_KEYSET.cursor(SimpleNamespace(__data__={"id": AMBULANCE_ID}))),
+    "motorista da ambulância": lambda: AmbulanceRepository.find_driver_by_ambulance_id(AMBULANCE_ID),
+    "equipamentos da ambulância": lambda: AmbulanceRepository.find_ambulance_equipments_by_id(AMBULANCE_ID),
+    "usuário por email": lambda: UserRepository.find_by_email("usuario7@mail.com"),
+    "usuário por cpf": lambda: UserRepository.exists_by_cpf("%011d" % 7),
+    "usuários": lambda: UserRepository.find_all_with_page(2, 25),
+    "usuários por cursor": lambda: UserRepository.find_all_with_page(0, 25, UserRepository.USER_KEYSET.cursor(SimpleNamespace(__data__={"id": USER_ID}))),
+    **{f"sweep {target.name}": (lambda target=target: SWEEPER.sweep_target(target)) for target in SWEEPER.targets}
+}
+
+@pytest.mark.parametrize("name", REPOSITORY_CALLS)
+def test_repository_queries_use_indexes(seeded_db, monkeypatch, name):
+    queries = captured_queries(seeded_db, monkeypatch, REPOSITORY_CALLS[name])
+
+    assert queries
+
+    for (sql, params) in queries:
+        plan = query_plan(seeded_db, sql, params)
+        scans = [step for step in plan if FULL_SCAN.match(step)]
+
+        assert not scans, f"{name}: {sql}\n" + "\n".join(plan)
+
+def test_filtered_travels_are_ordered_by_the_index(seeded_db, monkeypatch):
+    """ A tela inicial do motorista não deve ordenar as viagens em uma B-tree temporária """
+    queries = captured_queries(seeded_db, monkeypatch, lambda: TravelRepository.find_travels(driver, TravelFilterSchema(papel=TravelRole.MOTORISTA), 1, 15))
+
+    for (sql, params) in queries:
+        plan = query_plan(seeded_db, sql, params)
+
+        assert not [step for step in plan if "TEMP B-TREE" in step], "\n".join(plan)
@@ -0,0 +1,101 @@
+import asyncio
+import shutil
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from src.DB import db, db_replicas, sqlite
+from src.DB.Migration import MODELS
+from src.DB.Routing import begin_routing, end_routing, bind_writer
+from src.Model.User import User
+from src.Model.Travel import Travel
+from src.Schema.Travel.TravelRealizedEnum import TravelRealized
+from src.Repository import UserRepository
+from src.Service import TravelService
+
+from helpers import TestUserHelper
+
+def replica_connection(primary, replica) -> SimpleNamespace:
+    return SimpleNamespace(sqliteMode="default", sqlitePath=str(primary), replicas=[str(replica)])
+
+@pytest.fixture
+def replicated(client, tmp_path):
+    """ Principal e réplica em dois arquivos, a réplica é uma cópia do principal logo após criar as tabelas """
+    previous = (db.obj, db_replicas.databases)
+    database = sqlite.Database(replica_connection(tmp_path / "primary.db", tmp_path / "replica.db"))
+
+    db.initialize(database.db)
+    db.create_tables(MODELS)
+    db.close()
+
+    shutil.copy(tmp_path / "primary.db", tmp_path / "replica.db")
+    db_replicas.initialize(database.replicas)
+
+    yield database
+
+    for replica in database.replicas:
+        replica.close()
+
+    db.initialize(previous[0])
+    db_replicas.initialize(previous[1])
+
+def insert_user(email: str) -> User:
+    return UserRepository.create(User(**{**TestUserHelper.generate_user(email), "senha": "x"}))
+
+def test_find_functions_read_from_replica(replicated):
+    insert_user("primario@mail.com")
+
+    assert User.select().where(User.email == "primario@mail.com").exists()
+    assert UserRepository.find_by_email("primario@mail.com") is None
+    assert UserRepository.count() == 0
+
+def test_transaction_reads_from_primary(replicated):
+    with db.atomic():
+        insert_user("transacao@mail.com")
+
+        assert UserRepository.find_by_email("transacao@mail.com") is not None
+
+def test_read_your_writes_window(replicated):
+    token = begin_routing(db_replicas.choose(), "10.0.0.1")
+    try:
+        bind_writer("usuario-1")
+        insert_user("escrita@mail.com")
+
+        assert UserRepository.find_by_email("escrita@mail.com") is not None
+    finally:
+        end_routing(token)
+
+    token = begin_routing(db_replicas.choose())
+    try:
+        bind_writer("usuario-1")
+        assert UserRepository.find_by_email("escrita@mail.com") is not None
+    finally:
+        end_routing(token)
+
+    token = begin_routing(db_replicas.choose(), "10.0.0.2")
+    try:
+        bind_writer("usuario-2")
+        assert UserRepository.find_by_email("escrita@mail.com") is None
+    finally:
+        end_routing(token)
+
+def test_login_right_after_register_reads_from_primary(replicated, client):
+    userData = TestUserHelper.generate_user()
+    TestUserHelper.register_user(client, userData)
+
+    headers = TestUserHelper.authenticate_user(client, userData["email"], userData["senha"])
+
+    assert "Authorization" in headers
+
+def test_failed_transition_reads_travel_from_primary(replicated):
+    """ A viagem ainda não chegou na réplica: o erro da transição é escolhido pelo estado no principal """
+    user = insert_user("transicao@mail.com")
+    travel = Travel.create(
+        inicio=datetime(2025, 1, 1), id_paciente=user.id, cpf_paciente=user.cpf, realizado=TravelRealized.NAO_REALIZADO, cancelada=True,
+        lat_inicio=0, long_inicio=0, end_inicio="A", lat_fim=0, long_fim=0, end_fim="B"
+    )
+
+    canceled = asyncio.run(TravelService.cancel_travel_by_id(user, travel.id))
+
+    assert canceled.cancelada
@@ -0,0 +1,53 @@
+import pytest
+from datetime import date
+from peewee import SqliteDatabase
+
+from src.DB import db
+from src.DB.QueryCounter import begin_query_count, end_query_count, use_query_counter
+from src.DB.sqlite import SQLITE_RETURNING
+from src.Model.User import User
+from src.Model.Ambulance import Ambulance
+from src.Model.Equipment import Equipment
+from src.Repository import UserRepository, AmbulanceRepository
+
+@pytest.fixture(params=[SQLITE_RETURNING, False], ids=["returning", "select"])
+def returning_db(request):
+    previous = db.obj
+    database = use_query_counter(SqliteDatabase(":memory:", returning_clause=request.param))
+
+    db.initialize(database)
+    db.create_tables([User, Ambulance, Equipment])
+
+    yield database
+
+    database.close()
+    db.initialize(previous)
+
+def count_queries(fn):
+    (stats, token) = begin_query_count()
+    try:
+        result = fn()
+    finally:
+        end_query_count(token)
+
+    return (result, stats.count)
+
+def test_writes_return_the_stored_row(returning_db):
+    single = 1 if returning_db.returning_clause else 2
+
+    (user, queries) = count_queries(lambda: UserRepository.create(User(email="r@mail.com", nome="R", senha="x", cpf="00000000000", telefone="000000000000", nascimento=date(1990, 1, 1))))
+    assert queries == single
+    assert user.nome == "R" and user.cargo == 0
+
+    (user, queries) = count_queries(lambda: UserRepository.update_user_by_id(user.id, nome="Novo"))
+    assert queries == single
+    assert (user.nome, user.email) == ("Novo", "r@mail.com")
+
+    assert UserRepository.update_user_by_id("0" * 32, nome="Ninguém") is None
+
+def test_delete_uses_affected_rows(returning_db):
+    ambulance = AmbulanceRepository.create_ambulance(Ambulance(status=0, placa="ABC1D23", tipo=0))
+
+    (deleted, queries) = count_queries(lambda: AmbulanceRepository.delete_ambulance(ambulance.id))
+    assert (deleted, queries) == (True, 1)
+    assert AmbulanceRepository.delete_ambulance(ambulance.id) is False
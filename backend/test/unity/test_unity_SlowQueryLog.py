@@ -0,0 +1,68 @@
+import json
+
+from src.DB import db
+from src.DB.SlowQueryLog import SlowQueryLog, use_slow_query_log, mask_parameters, MASK
+from src.Repository import UserRepository
+
+from utils import UserUtils
+
+def test_masks_every_column_not_listed_as_loggable():
+    insert = 'INSERT INTO "usuario" ("id", "email", "senha", "cpf", "cargo") VALUES (?, ?, ?, ?, ?)'
+    assert mask_parameters(insert, ["1", "a@mail.com", "hash", "12345678901", 0]) == ["1", MASK, MASK, MASK, 0]
+
+    select = 'SELECT 1 FROM "usuario" AS "t1" WHERE (("t1"."cpf" IN (?, ?)) AND ("t1"."id" = ?)) LIMIT ?'
+    assert mask_parameters(select, ["12345678901", "10987654321", "1", 1]) == [MASK, MASK, "1", 1]
+
+    assert mask_parameters('EXECUTE find_user(%s, %s)', ["a@mail.com", 10]) == [MASK, 10]
+
+def test_masks_every_parameter_of_secret_tables():
+    restore = 'SELECT "t1"."id" FROM "restaurar_senha" AS "t1" WHERE ("t1"."id" = ?) LIMIT ?'
+    assert mask_parameters(restore, ["codigo", 1]) == [MASK, MASK]
+
+    outbox = 'INSERT INTO "email_saida" ("id", "destinatario", "variaveis", "tentativas") VALUES (?, ?, ?, ?)'
+    assert mask_parameters(outbox, ["1", "a@mail.com", '{"RESTORE_CODE": "codigo"}', 0]) == [MASK] * 4
+
+def test_failed_explain_keeps_the_transaction_usable(client, tmp_path):
+    log = SlowQueryLog(thresholdMs=0, size=10, path=str(tmp_path / "slow.jsonl"))
+    database = db.obj
+
+    def failing_explain(sql, params=None, *args, **kwargs):
+        if sql.startswith("EXPLAIN"):
+            raise RuntimeError("sem plano")
+        return database.execute_sql(sql, params, *args, **kwargs)
+
+    with database.atomic() as transaction:
+        log.record(database, failing_explain, 'SELECT 1 FROM "usuario" AS "t1" WHERE ("t1"."id" = ?)', ["1"], 1)
+
+        assert database.execute_sql("SELECT 1").fetchone() == (1,)
+        transaction.rollback()
+
+    assert log.recent()[0]["plano"] == "Falha no EXPLAIN: sem plano"
+
+def test_records_origin_and_explains_each_shape_once(client, tmp_path):
+    log = SlowQueryLog(thresholdMs=0, size=10, path=str(tmp_path / "slow.jsonl"))
+    use_slow_query_log(db.obj, log)
+
+    UserRepository.exists_by_cpf("12345678901")
+    UserRepository.exists_by_cpf("10987654321")
+
+    (last, first) = log.recent()
+
+    assert last["origem"] == first["origem"] == "UserRepository.exists_by_cpf"
+    assert last["parametros"] == [MASK, 1]
+    assert len(log.plans) == 1
+    assert any(step.startswith("SEARCH") for step in first["plano"])
+
+    assert log.flush() == 2
+    assert log.flush() == 0
+    assert [json.loads(line)["sql"] for line in open(tmp_path / "slow.jsonl")] == [first["sql"], last["sql"]]
+
+def test_slow_queries_endpoint_is_manager_only(client):
+    userToken = UserUtils.get_user(client)
+    assert client.get("/monitoring/slow-queries", headers=userToken).status_code == 403
+
+    managerToken = UserUtils.get_manager(client)
+    request = client.get("/monitoring/slow-queries", headers=managerToken)
+
+    assert request.status_code == 200
+    assert isinstance(request.json(), list)
@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+import pytest
+from peewee import OperationalError
+
+from src.DB import db, db_replicas, sqlite
+from src.DB.Migration import MODELS
+from src.DB.Routing import read_only
+from src.Model.User import User
+
+from helpers import TestUserHelper
+
+def tuned_connection(path) -> SimpleNamespace:
+    return SimpleNamespace(
+        sqliteMode="tuned",
+        sqlitePath=str(path),
+        sqliteBusyTimeout=2000,
+        sqliteCacheSizeKb=8192,
+        sqliteMmapSize=1048576,
+        sqliteReadConnections=2,
+        sqliteWriteConnections=2
+    )
+
+@pytest.fixture
+def tuned(client, tmp_path):
+    previous = (db.obj, db_replicas.databases)
+    database = sqlite.Database(tuned_connection(tmp_path / "tuned.db"))
+
+    db.initialize(database.db)
+    db_replicas.initialize(database.replicas)
+    db.create_tables(MODELS)
+
+    yield database
+
+    for pool in (database.db, database.read_db):
+        pool.close()
+        pool.close_all()
+
+    db.initialize(previous[0])
+    db_replicas.initialize(previous[1])
+
+def test_tuned_mode_pragmas(tuned):
+    with tuned.db.connection_context():
+        assert tuned.db.execute_sql("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert tuned.db.execute_sql("PRAGMA synchronous").fetchone()[0] == 1
+        assert tuned.db.execute_sql("PRAGMA foreign_keys").fetchone()[0] == 1
+        assert tuned.db.execute_sql("PRAGMA busy_timeout").fetchone()[0] == 2000
+
+def test_read_only_context_uses_read_pool(tuned):
+    assert db.current() is tuned.db
+
+    with read_only():
+        assert db.current() is tuned.read_db
+
+        with pytest.raises(OperationalError):
+            db.execute_sql("DELETE FROM usuario")
+
+def test_get_requests_read_from_read_pool(tuned, client):
+    userData = TestUserHelper.generate_user()
+    TestUserHelper.register_user(client, userData)
+    headers = TestUserHelper.authenticate_user(client, userData["email"], userData["senha"])
+    client.cookies.clear()
+
+    readsBefore = len(tuned.read_db._in_use) + len(tuned.read_db._connections)
+
+    response = client.get("/user/", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["email"] == userData["email"]
+    assert len(tuned.read_db._in_use) == 0
+    assert len(tuned.read_db._connections) >= max(readsBefore, 1)
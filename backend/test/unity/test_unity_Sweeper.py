@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone
+
+from src.DB.Sweeper import Sweeper, SweepTarget
+from src.Model import Fields
+from src.Model.User import User
+from src.Model.UserSession import Session
+from src.Model.RestorePassword import RestorePassword
+from src.Model.UpgradeToken import UpgradeToken
+
+from helpers import TestUserHelper
+
+def register_user_id(client) -> str:
+    return TestUserHelper.register_user(client, TestUserHelper.generate_user())["id"].replace("-", "")
+
+def iso(delta: timedelta) -> str:
+    return (datetime.now(timezone.utc) + delta).isoformat()
+
+def create_sessions(userId: str, expired: int, valid: int) -> None:
+    Session.bulk_create(
+        [Session(usuario=userId, ip="127.0.0.1", valido_ate=iso(timedelta(minutes=-5))) for _ in range(expired)] +
+        [Session(usuario=userId, ip="127.0.0.1", valido_ate=iso(timedelta(minutes=5))) for _ in range(valid)]
+    )
+
+def test_sweep_deletes_only_expired_rows_in_batches(client):
+    userId = register_user_id(client)
+
+    create_sessions(userId, expired=7, valid=2)
+
+    sweeper = Sweeper([SweepTarget("sessao", Session, Session.expired)], batchSize=3)
+
+    assert sweeper.sweep_target(sweeper.targets[0]) == 7
+    assert Session.select().where(Session.usuario == userId).count() >= 2
+    assert Session.select().where(Session.expired()).count() == 0
+
+def test_sweep_stops_when_a_batch_deletes_nothing(client, monkeypatch):
+    userId = register_user_id(client)
+
+    create_sessions(userId, expired=2, valid=0)
+
+    # Chaves gravadas em texto lidas no modo native: o DELETE do lote não encontra nenhuma linha
+    monkeypatch.setattr(Fields, "UUID_STORAGE", Fields.UUID_NATIVE)
+
+    sweeper = Sweeper([SweepTarget("sessao", Session, Session.expired)], batchSize=1)
+
+    assert sweeper.sweep_target(sweeper.targets[0]) == 0
+
+def test_sweep_reports_every_target(client):
+    userId = register_user_id(client)
+    user = User.get_by_id(userId)
+
+    tokenCount = UpgradeToken.select().count()
+
+    RestorePassword.create(usuario=user, valido_ate=iso(timedelta(minutes=-1)))
+    RestorePassword.create(usuario=user)
+
+    UpgradeToken.create(usado=True, revogado_em=datetime.now() - timedelta(days=60))
+    UpgradeToken.create(usado=True, revogado_em=datetime.now())
+    UpgradeToken.create()
+
+    sweeper = Sweeper([
+        SweepTarget("restaurar_senha", RestorePassword, RestorePassword.expired),
+        SweepTarget("atualizar_token", UpgradeToken, lambda: UpgradeToken.used_before(timedelta(days=30)))
+    ])
+
+    report = sweeper.sweep()
+
+    assert report["restaurar_senha"]["linhas"] == 1
+    assert report["atualizar_token"]["linhas"] == 1
+    assert report["atualizar_token"]["tempo_ms"] >= 0
+    assert sweeper.lastReport == report
+
+    assert RestorePassword.select().count() == 1
+    assert UpgradeToken.select().count() == tokenCount + 2
@@ -0,0 +1,91 @@
+import pytest
+from datetime import date, datetime
+from peewee import SqliteDatabase, PostgresqlDatabase
+
+from src.DB import db
+from src.DB.Migrations import MIGRATION_RUNNER, V0003_NativeUUIDKeys
+from src.DB.Migrations.Runner import MigrationRunner, MigrationStep
+from src.Model import Fields
+from src.Model.User import User
+from src.Model.Driver import Driver
+from src.Model.Travel import Travel
+from src.Model.Ambulance import Ambulance
+from src.Model.Equipment import Equipment
+from src.Model.UserSession import Session
+from src.Repository import UserRepository, TravelRepository
+
+NATIVE_STEP = MigrationStep(V0003_NativeUUIDKeys.VERSION, V0003_NativeUUIDKeys.NAME, V0003_NativeUUIDKeys.operations)
+
+@pytest.fixture
+def text_db(tmp_path):
+    """ Banco com o esquema e as linhas no formato texto, como antes da conversão """
+    previous = db.obj
+    database = SqliteDatabase(str(tmp_path / "uuid.db"), pragmas={"foreign_keys": 1})
+
+    db.initialize(database)
+    MIGRATION_RUNNER.migrate()
+
+    yield database
+
+    database.close()
+    db.initialize(previous)
+
+def seed() -> dict[str, str]:
+    user = User.create(email="uuid@mail.com", nome="UUID", senha="x", cpf="00000000000", telefone="000000000000", nascimento=date(1990, 1, 1))
+    ambulance = Ambulance.create(status=0, placa="ABC1D23", tipo=0)
+    Driver.create(id=user.id, id_ambulancia=ambulance.id, cnh="00000000000", vencimento=date(2030, 1, 1))
+    equipment = Equipment.create(id_ambulancia=ambulance.id, equipamento="Maca", descricao="Maca")
+    session = Session.create(usuario=user.id, ip="127.0.0.1")
+    travel = Travel.create(
+        inicio=datetime(2025, 1, 1), id_paciente=user.id, cpf_paciente="00000000000", id_motorista=user.id, id_ambulancia=ambulance.id,
+        lat_inicio=0, long_inicio=0, end_inicio="A", lat_fim=0, long_fim=0, end_fim="B"
+    )
+
+    return {"user": user.id, "ambulance": ambulance.id, "equipment": equipment.id, "session": session.id, "travel": travel.id}
+
+def test_text_storage_is_default():
+    assert not Fields.uses_native_uuid()
+    assert Travel.id.field_type == "VARCHAR"
+    assert V0003_NativeUUIDKeys.VERSION not in [step.version for step in MIGRATION_RUNNER.steps]
+
+def test_convert_existing_rows_to_blob(text_db, monkeypatch):
+    ids = seed()
+    indexes = {index.name for index in text_db.get_indexes("transporte")}
+
+    monkeypatch.setattr(Fields, "UUID_STORAGE", Fields.UUID_NATIVE)
+    MigrationRunner(sorted(MIGRATION_RUNNER.steps + [NATIVE_STEP], key=lambda step: step.version)).migrate()
+
+    for (table, column) in [("usuario", "id"), ("transporte", "id_paciente_id"), ("transporte", "id_motorista_id"), ("sessao", "usuario_id"), ("equipamento", "id_ambulancia_id")]:
+        (storedType, length) = text_db.execute_sql(f'SELECT typeof("{column}"), length("{column}") FROM "{table}"').fetchone()
+        assert (storedType, length) == ("blob", 16)
+
+    travel = TravelRepository.find_travel_by_id(ids["travel"])
+    assert travel.id == ids["travel"]
+    assert travel.id_paciente.id == ids["user"]
+    assert travel.id_motorista.id_ambulancia.id == ids["ambulance"]
+
+    assert UserRepository.find_by_id(ids["user"]).id == ids["user"]
+    assert [equipment.id for equipment in Ambulance.get_by_id(ids["ambulance"]).equipamentos] == [ids["equipment"]]
+    assert Session.get_by_id(ids["session"]).usuario_id == ids["user"]
+    assert UserRepository.find_by_id("nao-e-um-uuid") is None
+
+    assert indexes <= {index.name for index in text_db.get_indexes("transporte")}
+    assert text_db.execute_sql("PRAGMA foreign_key_check").fetchall() == []
+    assert text_db.execute_sql("PRAGMA foreign_keys").fetchone()[0] == 1
+
+    # Já convertido: rodar de novo não recria nada
+    assert NATIVE_STEP.operations()[0].pending(text_db) == {}
+
+def test_native_storage_on_postgres(monkeypatch):
+    monkeypatch.setattr(Fields, "UUID_STORAGE", Fields.UUID_NATIVE)
+    previous = db.obj
+    db.initialize(PostgresqlDatabase("sga"))
+
+    try:
+        assert User.id.field_type == "UUID"
+        assert Travel.id_paciente.field_type == "UUID"
+        assert User.id.db_value("0f8fad5bd9cb469fa16570867728950e") == "0f8fad5bd9cb469fa16570867728950e"
+        assert User.id.python_value("0f8fad5b-d9cb-469f-a165-70867728950e") == "0f8fad5bd9cb469fa16570867728950e"
+        assert User.id.python_value("nao-e-um-uuid") == "nao-e-um-uuid"
+    finally:
+        db.initialize(previous)
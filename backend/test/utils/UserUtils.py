@@ -1,7 +1,35 @@
 from fastapi.testclient import TestClient
 from helpers import TestUserHelper
 
+from datetime import date
+
+from src.Model.Driver import Driver
+from src.Repository import UserRepository
+from src.Schema.User.UserRoleEnum import UserRole
+from src.Validator.GenericValidator import unmask_uuid
+
 def get_user(client: TestClient) -> dict:
     userData = TestUserHelper.generate_user()
     TestUserHelper.register_user(client, userData)
     return TestUserHelper.authenticate_user(client, userData["email"], userData["senha"])
+
+def get_manager(client: TestClient) -> dict:
+    userData = TestUserHelper.generate_user()
+    user = TestUserHelper.register_user(client, userData)
+
+    userId = unmask_uuid(user["id"])
+    UserRepository.update_user_by_id(userId, cargo=UserRole.MANAGER)
+    UserRepository.create_role_by_user_id(userId, UserRole.MANAGER)
+
+    return TestUserHelper.authenticate_user(client, userData["email"], userData["senha"])
+
+def get_driver(client: TestClient, ambulanceId: str | None = None) -> tuple[dict, str]:
+    """ Motorista autenticado e o seu ID """
+    userData = TestUserHelper.generate_user()
+    user = TestUserHelper.register_user(client, userData)
+
+    userId = unmask_uuid(user["id"])
+    UserRepository.update_user_by_id(userId, cargo=UserRole.DRIVER)
+    Driver.create(id=userId, id_ambulancia=ambulanceId, cnh="00000000000", vencimento=date(2030, 1, 1))
+
+    return (TestUserHelper.authenticate_user(client, userData["email"], userData["senha"]), userId)